@@ -0,0 +1,174 @@
+"""
+Raw listing-page archive for replay and backfill
+
+With an archive configured, each listing page is stored gzip-compressed as
+it is fetched:
+
+    <archive>/<YYYY-MM-DD>/<source key>/<HHMMSS.ffffff>-<query hash>-p<page>.html.gz
+
+A page whose body is identical to the last one stored for the same search
+is not stored again. `main.py --replay` streams the archived pages through
+the current extractors, so jobs missed while a selector was broken can be
+recovered once it is fixed, even though the listings have expired on the
+site. Day directories older than the retention period are deleted.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import os
+import shutil
+import logging
+from collections import OrderedDict, deque
+from concurrent.futures import Executor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SUFFIX = '.html.gz'
+_TIME_FORMAT = '%H%M%S.%f'
+
+
+class ArchivedPage(NamedTuple):
+    key: str  # source key, as in SCRAPERS
+    fetched_at: datetime
+    path: str
+
+
+def read_page(path: str) -> bytes:
+    """Raw body of an archived page"""
+    with open(path, 'rb') as f:
+        return gzip.decompress(f.read())
+
+
+class PageArchive:
+    """Directory of compressed listing pages"""
+
+    def __init__(self, directory: str, compress_level: int = 6, max_searches: int = 4096):
+        self.directory = directory
+        self.compress_level = compress_level
+        # Digest of the last body stored per (source key, query, page), least recently fetched first;
+        # bounded because the queries change with the keywords
+        self._last: 'OrderedDict[Tuple[str, str, int], bytes]' = OrderedDict()
+        self.max_searches = max_searches
+
+    def store(self, key: str, query: Optional[str], page: int, fetched_at: datetime, content: bytes) -> Optional[str]:
+        """Archive one page; returns its path, or None if it is unchanged since the last fetch"""
+        digest = hashlib.blake2b(content, digest_size=16).digest()
+        search = (key, query or '', page)
+        if self._last.get(search) == digest:
+            self._last.move_to_end(search)
+            return None
+        query_hash = hashlib.blake2b((query or '').encode('utf-8'), digest_size=4).hexdigest()
+        directory = os.path.join(self.directory, fetched_at.strftime('%Y-%m-%d'), key)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{fetched_at.strftime(_TIME_FORMAT)}-{query_hash}-p{page}{SUFFIX}")
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(gzip.compress(content, self.compress_level, mtime=0))
+        os.replace(temp_path, path)
+        self._last[search] = digest
+        self._last.move_to_end(search)
+        while len(self._last) > self.max_searches:
+            self._last.popitem(last=False)
+        return path
+
+    async def store_async(self, key: str, query: Optional[str], page: int, fetched_at: datetime, content: bytes):
+        """store() in a thread so compression and disk writes stay off the event loop; errors are logged"""
+        try:
+            await asyncio.to_thread(self.store, key, query, page, fetched_at, content)
+        except Exception as e:
+            logger.error("Could not archive %s page: %s", key, e)
+
+    def iter_pages(self, since: datetime = None, until: datetime = None,
+                   sources: Iterable[str] = None) -> Iterator[ArchivedPage]:
+        """Archived pages in fetch order, optionally limited to a time range and to some source keys"""
+        sources = set(sources) if sources else None
+        try:
+            days = sorted(os.listdir(self.directory))
+        except FileNotFoundError:
+            return
+        for day in days:
+            try:
+                day_start = datetime.strptime(day, '%Y-%m-%d')
+            except ValueError:
+                continue
+            if (since and day_start + timedelta(days=1) <= since) or (until and day_start > until):
+                continue
+            pages = []
+            for key in sorted(os.listdir(os.path.join(self.directory, day))):
+                if sources is not None and key not in sources:
+                    continue
+                directory = os.path.join(self.directory, day, key)
+                for name in os.listdir(directory):
+                    if not name.endswith(SUFFIX):
+                        continue
+                    try:
+                        fetched_at = datetime.combine(day_start, datetime.strptime(name.split('-')[0], _TIME_FORMAT).time())
+                    except ValueError:
+                        continue
+                    if (since and fetched_at < since) or (until and fetched_at > until):
+                        continue
+                    pages.append(ArchivedPage(key, fetched_at, os.path.join(directory, name)))
+            pages.sort(key=lambda page: page.fetched_at)
+            yield from pages
+
+    def prune(self, retention_days: float) -> int:
+        """Delete day directories older than retention_days; returns how many were deleted"""
+        cutoff = (datetime.now() - timedelta(days=retention_days)).strftime('%Y-%m-%d')
+        deleted = 0
+        try:
+            days = os.listdir(self.directory)
+        except FileNotFoundError:
+            return 0
+        for day in days:
+            if len(day) == 10 and day < cutoff:
+                shutil.rmtree(os.path.join(self.directory, day), ignore_errors=True)
+                deleted += 1
+        return deleted
+
+
+def _completed(in_flight: deque, keep: int) -> Iterator[Tuple[ArchivedPage, object]]:
+    """Results of the oldest in-flight pages until only `keep` are left"""
+    while len(in_flight) > keep:
+        page, future = in_flight.popleft()
+        try:
+            yield page, future.result()
+        except Exception as e:
+            logger.error("Cannot replay %s: %s", page.path, e)
+
+
+def replay_pages(pages: Iterable[ArchivedPage], parse: Callable, pool: Optional[Executor] = None,
+                 window: int = 64) -> Iterator[Tuple[ArchivedPage, object]]:
+    """(page, parse(page.key, page.path)) for each page, in order
+
+    With a pool, up to `window` pages are parsed in parallel while earlier
+    results are consumed. Pages that fail to parse are logged and skipped.
+    """
+    if pool is None:
+        for page in pages:
+            try:
+                yield page, parse(page.key, page.path)
+            except Exception as e:
+                logger.error("Cannot replay %s: %s", page.path, e)
+        return
+    in_flight: deque = deque()
+    for page in pages:
+        in_flight.append((page, pool.submit(parse, page.key, page.path)))
+        yield from _completed(in_flight, window - 1)
+    yield from _completed(in_flight, 0)
+
+
+_archives: Dict[str, PageArchive] = {}
+
+
+def get_archive(directory: str) -> Optional[PageArchive]:
+    """The process-wide archive for directory (None if no directory is configured)"""
+    if not directory:
+        return None
+    key = os.path.abspath(directory)
+    archive = _archives.get(key)
+    if archive is None:
+        archive = _archives[key] = PageArchive(directory)
+    return archive
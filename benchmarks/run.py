@@ -0,0 +1,649 @@
+"""
+Offline benchmark suite for the job tracker
+
+Replays the recorded LinkedIn/Internshala/Naukri/Indeed pages in
+benchmarks/fixtures through a local HTTP stub and delivers email to a local
+SMTP sink, so runs are repeatable and need no network or mailbox.
+
+Results are written as JSON to benchmarks/results/<label>.json (label
+defaults to the current git commit) so versions can be compared.
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --only cycle,parse --cycles 3
+    python -m benchmarks.run --sizes 100,1000,10000 --label my-change
+    python -m benchmarks.run --compare benchmarks/results/abc1234.json
+    python -m benchmarks.run --only startup --import-budget 0.2
+    python -m benchmarks.run --only storage --storage-sizes 1000,100000
+    python -m benchmarks.run --only soak --soak-cycles 5000
+
+The startup benchmark exits with status 1 when importing main takes longer
+than the import-time budget, and the soak benchmark when resident memory
+grows by more than the soak budget.
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import logging
+import os
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.stubs import FixtureServer, SMTPSink, load_fixtures  # noqa: E402
+
+RESULTS_DIR = os.path.join(REPO_ROOT, 'benchmarks', 'results')
+BENCHMARKS = ['startup', 'cycle', 'parse', 'ingest', 'storage', 'scoring', 'replay', 'soak']
+DEFAULT_SIZES = [10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+DEFAULT_STORAGE_SIZES = [10 ** 3, 10 ** 4, 10 ** 5]
+DEFAULT_SCORING_SIZES = [10 ** 2, 10 ** 3, 10 ** 4]
+DEFAULT_IMPORT_BUDGET = 0.25
+DEFAULT_SOAK_BUDGET_MB = 8.0
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process now, in MB (the peak where /proc is not available)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+    return round(pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024), 1)
+
+
+def summarize(samples: List[float]) -> Dict:
+    """Summary statistics (seconds) for a list of timings"""
+    if not samples:
+        return {'n': 0}
+    return {
+        'n': len(samples),
+        'mean': round(statistics.fmean(samples), 6),
+        'p50': round(statistics.median(samples), 6),
+        'min': round(min(samples), 6),
+        'max': round(max(samples), 6),
+    }
+
+
+def git_label() -> str:
+    """Short hash of the current commit, or a timestamp outside a git checkout"""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return datetime.now().strftime('%Y%m%d-%H%M%S')
+
+
+def point_scrapers_at(base_url: str):
+    """Send every scraper's requests to the fixture server instead of the real site"""
+    from job_scraper import SCRAPERS
+    for key, scraper_class in SCRAPERS.items():
+        scraper_class.base_url = f"{base_url}/{key}"
+
+
+@contextlib.contextmanager
+def stage_timer(targets: List[tuple], timings: Dict[str, List[float]]):
+    """Temporarily wrap (owner, attribute, stage) callables so each call's duration is recorded"""
+    originals = []
+    for owner, name, stage in targets:
+        original = getattr(owner, name)
+        originals.append((owner, name, original))
+
+        def timed(*args, __original=original, __stage=stage, **kwargs):
+            start = time.perf_counter()
+            try:
+                return __original(*args, **kwargs)
+            finally:
+                timings.setdefault(__stage, []).append(time.perf_counter() - start)
+
+        setattr(owner, name, timed)
+    try:
+        yield timings
+    finally:
+        for owner, name, original in originals:
+            setattr(owner, name, original)
+
+
+def bench_cycle(cycles: int, request_delay: float, parse_workers: int, latency: float) -> Dict:
+    """End-to-end check_and_notify against the fixture server and SMTP sink
+
+    Each cycle runs against an empty database so every cycle scrapes, filters,
+    ingests and emails a full set of jobs.
+    """
+    import job_scraper
+    import main
+    from database import JobDatabase
+    from email_notifier import EmailNotifier
+
+    server = FixtureServer(latency=latency).start()
+    sink = SMTPSink().start()
+    point_scrapers_at(server.url)
+    os.environ.pop('SENDGRID_API_KEY', None)
+    main.EMAIL_CONFIG.update({
+        'smtp_server': '127.0.0.1',
+        'smtp_port': sink.port,
+        'sender_email': 'bench@localhost',
+        'sender_password': 'bench',
+        'recipient_email': 'bench@localhost',
+        'use_tls': False,
+    })
+    main.SCRAPING_CONFIG.update({
+        'request_delay_seconds': request_delay,
+        'parse_workers': parse_workers,
+    })
+
+    cycle_times = []
+    stage_times: Dict[str, List[float]] = {}
+    jobs_per_cycle = []
+    cwd = os.getcwd()
+    targets = [
+        (job_scraper, 'scrape_all_jobs', 'scrape'),
+        (main, 'filter_jobs', 'filter'),
+        (JobDatabase, 'add_jobs', 'db_ingest'),
+        (EmailNotifier, 'send_email', 'email'),
+    ]
+    try:
+        with stage_timer(targets, stage_times):
+            for _ in range(cycles):
+                workdir = tempfile.mkdtemp(prefix='jobtracker-bench-')
+                os.chdir(workdir)
+                try:
+                    start = time.perf_counter()
+                    main.check_and_notify()
+                    # Emails go out on a background thread; the cycle ends when they are sent
+                    main.wait_for_email()
+                    cycle_times.append(time.perf_counter() - start)
+                    jobs_per_cycle.append(JobDatabase().get_stats()['total_jobs'])
+                finally:
+                    os.chdir(cwd)
+                    shutil.rmtree(workdir, ignore_errors=True)
+    finally:
+        server.stop()
+        sink.stop()
+
+    return {
+        'cycle_seconds': summarize(cycle_times),
+        'stages': {stage: summarize(times) for stage, times in stage_times.items()},
+        'jobs_per_cycle': jobs_per_cycle[-1] if jobs_per_cycle else 0,
+        'http_requests': server.requests,
+        'bytes_downloaded': server.bytes_sent,
+        'emails_sent': len(sink.messages),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def parse_importtime(stderr: str) -> Dict[str, tuple]:
+    """Module -> (self, cumulative) import seconds from `python -X importtime` output"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us) / 1e6, int(cumulative_us) / 1e6)
+    return modules
+
+
+def bench_startup(repeat: int, budget: float) -> Dict:
+    """Time to import main in a fresh interpreter, as paid by every cron-style `main.py --once`"""
+    env = dict(os.environ, LOG_FILE='')
+    import_times, process_times = [], []
+    modules = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import main'],
+            cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+        )
+        process_times.append(time.perf_counter() - start)
+        modules = parse_importtime(completed.stderr)
+        import_times.append(modules['main'][1])
+
+    slowest = sorted(modules.items(), key=lambda item: -item[1][0])[:10]
+    import_seconds = statistics.median(import_times)
+    return {
+        'import_main_seconds': summarize(import_times),
+        'process_seconds': summarize(process_times),
+        'modules_loaded': len(modules),
+        'slowest_imports': {name: round(self_seconds, 4) for name, (self_seconds, _) in slowest},
+        'budget_seconds': budget,
+        'within_budget': import_seconds <= budget,
+    }
+
+
+def bench_parse(repeat: int, parse_workers: int) -> Dict:
+    """Card extraction throughput per source, inline and through the parse pool
+
+    'fingerprinted' repeats the inline run with the page's fingerprint from a
+    previous fetch, as if only the top two cards were new.
+    """
+    from job_scraper import SCRAPERS, get_parse_pool, parse_listing
+
+    fixtures = load_fixtures()
+    results = {'inline': {}, 'fingerprinted': {}, 'pool': {}}
+
+    for key, content in fixtures.items():
+        if key not in SCRAPERS:
+            continue
+        extract = SCRAPERS[key].extract
+        cards = len(extract(content)[0])
+        start = time.perf_counter()
+        for _ in range(repeat):
+            extract(content)
+        elapsed = time.perf_counter() - start
+        results['inline'][key] = {
+            'pages_per_sec': round(repeat / elapsed, 1),
+            'jobs_per_sec': round(repeat * cards / elapsed, 1),
+            'page_bytes': len(content),
+        }
+
+        seen = frozenset(extract(content).card_ids[2:])
+        start = time.perf_counter()
+        for _ in range(repeat):
+            extracted = extract(content, seen)
+        elapsed = time.perf_counter() - start
+        results['fingerprinted'][key] = {
+            'pages_per_sec': round(repeat / elapsed, 1),
+            'cards_extracted': len(extracted.rows),
+            'cards_skipped': extracted.skipped,
+        }
+
+    if parse_workers > 0:
+        pool = get_parse_pool(parse_workers)
+        pages = [(key, content) for key, content in fixtures.items() if key in SCRAPERS] * repeat
+        start = time.perf_counter()
+        jobs = sum(len(result.rows) for result in pool.map(parse_listing, *zip(*pages)))
+        elapsed = time.perf_counter() - start
+        results['pool'] = {
+            'workers': parse_workers,
+            'pages_per_sec': round(len(pages) / elapsed, 1),
+            'jobs_per_sec': round(jobs / elapsed, 1),
+        }
+
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+
+def bench_replay(pages: int, parse_workers: int) -> Dict:
+    """Archive `pages` fixture pages, then replay them into an empty database
+
+    Measures archive writes (gzip) and `main.py --replay` throughput, inline
+    and through the parse pool. Every fixture page repeats the same jobs, so
+    most of the replay is dedup against the database.
+    """
+    import main
+    from archive import PageArchive
+    from job_scraper import SCRAPERS
+
+    fixtures = [(key, content) for key, content in load_fixtures().items() if key in SCRAPERS]
+    workdir = tempfile.mkdtemp(prefix='jobtracker-bench-')
+    cwd = os.getcwd()
+    saved = dict(main.ARCHIVE_CONFIG), dict(main.SCRAPING_CONFIG)
+    results = {'pages': pages}
+    try:
+        os.chdir(workdir)
+        archive = PageArchive(os.path.join(workdir, 'archive'))
+        fetched_at = datetime.now()
+        raw = 0
+        start = time.perf_counter()
+        for i in range(pages):
+            key, content = fixtures[i % len(fixtures)]
+            archive.store(key, f"query {i}", 0, fetched_at + timedelta(microseconds=i), content)
+            raw += len(content)
+        elapsed = time.perf_counter() - start
+        stored = sum(os.path.getsize(page.path) for page in archive.iter_pages())
+        results['archive'] = {
+            'pages_per_sec': round(pages / elapsed, 1),
+            'compression_ratio': round(raw / stored, 1),
+        }
+
+        main.ARCHIVE_CONFIG.update({'path': archive.directory, 'replay_notify': False})
+        for mode, workers in (('inline', 0), ('pool', parse_workers)):
+            if mode == 'pool' and parse_workers <= 0:
+                continue
+            main.SCRAPING_CONFIG['parse_workers'] = workers
+            for name in os.listdir(workdir):
+                if name.startswith('jobs.'):
+                    os.remove(os.path.join(workdir, name))
+            results[mode] = main.replay_archive()
+    finally:
+        main.ARCHIVE_CONFIG.clear()
+        main.ARCHIVE_CONFIG.update(saved[0])
+        main.SCRAPING_CONFIG.clear()
+        main.SCRAPING_CONFIG.update(saved[1])
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+
+def bench_soak(cycles: int, budget_mb: float) -> Dict:
+    """Many simulated cycles in one process; resident memory must stay flat
+
+    Each cycle parses one fixture page with the reused scraper, gives its
+    jobs URLs unique to the cycle, filters and stores them, archives the
+    page, streams the unnotified backlog through the digest policy and
+    caches details for the new jobs. Every tenth cycle a capped digest is
+    "sent" (marked notified), so a backlog builds up in between. RSS is
+    sampled after a warm-up; the run fails when it grows by more than
+    budget_mb, which would mean something is kept per cycle.
+    """
+    import main
+    from archive import PageArchive
+    from digest import DigestPolicy
+    from enrichment import DetailCache
+    from job_scraper import SCRAPERS, get_scraper, run_sync
+    from models import JobDetails
+
+    fixtures = [(key, content) for key, content in load_fixtures().items() if key in SCRAPERS]
+    workdir = tempfile.mkdtemp(prefix='jobtracker-bench-')
+    policy = DigestPolicy(max_delay_minutes=0, max_batch_size=10 ** 9)
+    cache = DetailCache(max_size=500)
+    warmup = max(cycles // 10, 20)
+    samples = []
+    stored = notified = 0
+    start = time.perf_counter()
+    try:
+        db = main.open_database(os.path.join(workdir, 'jobs.db'))
+        archive = PageArchive(os.path.join(workdir, 'archive'), max_searches=256)
+        for cycle in range(cycles):
+            key, content = fixtures[cycle % len(fixtures)]
+            scraper = get_scraper(key)
+            scraper.reset()
+            fetched_at = datetime.now()
+            result = run_sync(scraper.parse_async(content, fetched_at))
+            jobs = scraper.to_jobs([(title, company, f"{url}#soak-{cycle}") for title, company, url in result.rows],
+                                   fetched_at)
+            new_jobs = db.add_jobs(main.filter_jobs(jobs))
+            stored += len(new_jobs)
+            archive.store(key, f"query {cycle}", 0, fetched_at, content)
+            for job in new_jobs:
+                cache.put(job.url, JobDetails(location='Remote'))
+            pending = policy.summarize(db.iter_unnotified_jobs())
+            if cycle % 10 == 9 and policy.decide(pending)[0]:
+                batch = db.get_unnotified_jobs(limit=200)
+                db.mark_many_as_notified([job.id for job in batch])
+                notified += len(batch)
+            del result, jobs, new_jobs
+            if cycle + 1 >= warmup and (cycle + 1 - warmup) % max((cycles - warmup) // 20, 1) == 0:
+                gc.collect()
+                samples.append(current_rss_mb())
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        samples.append(current_rss_mb())
+    finally:
+        main._databases.pop(os.path.abspath(os.path.join(workdir, 'jobs.db')), None)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    growth = round(samples[-1] - samples[0], 1)
+    return {
+        'cycles': cycles,
+        'cycles_per_sec': round(cycles / elapsed, 1),
+        'jobs_stored': stored,
+        'jobs_notified': notified,
+        'backlog': pending.count,
+        'rss_after_warmup_mb': samples[0],
+        'rss_end_mb': samples[-1],
+        'rss_max_mb': max(samples),
+        'rss_growth_mb': growth,
+        'budget_mb': budget_mb,
+        'within_budget': growth <= budget_mb,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def make_jobs(count: int, prefix: str = 'https://example.com/jobs/') -> list:
+    """Synthetic jobs with unique URLs"""
+    from models import Job
+    scraped_at = datetime.now()
+    return [
+        Job(f"Software Engineer {i}", f"Company {i % 500}", f"{prefix}{i}", 'Benchmark', scraped_at)
+        for i in range(count)
+    ]
+
+
+def bench_ingest(sizes: List[int]) -> Dict:
+    """JobDatabase ingest throughput for new jobs and for already-seen (duplicate) jobs"""
+    from database import JobDatabase
+
+    results = {}
+    for size in sizes:
+        jobs = make_jobs(size)
+        workdir = tempfile.mkdtemp(prefix='jobtracker-bench-')
+        try:
+            db = JobDatabase(os.path.join(workdir, 'jobs.db'))
+
+            start = time.perf_counter()
+            new_jobs = db.add_jobs(jobs)
+            insert_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            duplicates = db.add_jobs(jobs)
+            dedup_seconds = time.perf_counter() - start
+
+            results[str(size)] = {
+                'new': len(new_jobs),
+                'insert_seconds': round(insert_seconds, 4),
+                'insert_jobs_per_sec': round(size / insert_seconds, 1),
+                'dedup_seconds': round(dedup_seconds, 4),
+                'dedup_jobs_per_sec': round(size / dedup_seconds, 1),
+                'duplicates_accepted': len(duplicates),
+                'peak_rss_mb': peak_rss_mb(),
+            }
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        del jobs
+    return results
+
+
+def bench_storage(sizes: List[int]) -> Dict:
+    """Every storage backend on the same workload: ingest, dedup, exists-many, mark-notified, stats, search, reopen"""
+    import storage
+
+    results = {}
+    for kind in storage.BACKENDS:
+        results[kind] = {}
+        for size in sizes:
+            jobs = make_jobs(size)
+            probe = [job.url for job in jobs[::2]] + [f"https://example.com/missing/{i}" for i in range(size // 2)]
+            workdir = tempfile.mkdtemp(prefix='jobtracker-bench-')
+            timings = {}
+
+            def timed(name, fn):
+                start = time.perf_counter()
+                value = fn()
+                timings[name] = round(time.perf_counter() - start, 4)
+                return value
+
+            try:
+                db_path = os.path.join(workdir, 'jobs.db')
+                backend = storage.get_backend(kind, db_path)
+                new_jobs = timed('insert_seconds', lambda: backend.add_jobs(jobs))
+                timed('dedup_seconds', lambda: backend.add_jobs(make_jobs(size)))
+                found = timed('exists_many_seconds', lambda: backend.exists_many(probe))
+                timed('mark_notified_seconds',
+                      lambda: backend.mark_notified_many([job.id for job in new_jobs[:size // 2]]))
+                timed('stats_seconds', backend.get_stats)
+                timed('unnotified_seconds', backend.get_unnotified_jobs)
+                timed('search_seconds', lambda: backend.search('Company 42', limit=50))
+                backend.close()
+                # Startup cost: the log backend replays its file, SQLite just opens it
+                storage._backends.clear()
+                timed('reopen_seconds', lambda: storage.get_backend(kind, db_path).close())
+                storage._backends.clear()
+
+                results[kind][str(size)] = dict(
+                    timings,
+                    insert_jobs_per_sec=round(size / max(timings['insert_seconds'], 1e-9), 1),
+                    exists_found=len(found),
+                    peak_rss_mb=peak_rss_mb(),
+                )
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+            del jobs
+    return results
+
+
+def make_titles(count: int, fixtures: Dict[str, bytes]) -> List[str]:
+    """count job titles drawn from the recorded listing pages, varied so most are distinct"""
+    import random
+    from job_scraper import SCRAPERS
+
+    base = [title for key, content in fixtures.items() if key in SCRAPERS
+            for title, _, _ in SCRAPERS[key].extract(content).rows]
+    rng = random.Random(42)
+    levels = ['', 'Senior ', 'Junior ', 'Lead ', 'Associate ', 'Trainee ']
+    return [f"{rng.choice(levels)}{rng.choice(base)} {i % 97}" for i in range(count)]
+
+
+def bench_scoring(sizes: List[int], repeat: int) -> Dict:
+    """Relevance scoring throughput: whole batches of titles scored against the JOB_KEYWORDS profile"""
+    from scoring import RelevanceScorer
+
+    keywords = ['new grad', 'fresher', 'entry level', 'internship', 'trainee', 'graduate', 'junior', 'associate']
+    start = time.perf_counter()
+    scorer = RelevanceScorer(keywords)
+    results = {'profile_seconds': round(time.perf_counter() - start, 6)}
+    fixtures = load_fixtures()
+    for size in sizes:
+        titles = make_titles(size, fixtures)
+        scorer.score(titles)
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            scorer.score(titles)
+            samples.append(time.perf_counter() - start)
+        stats = summarize(samples)
+        results[str(size)] = {
+            'score_seconds': stats,
+            'titles_per_sec': round(size / stats['p50'], 1),
+        }
+    results['peak_rss_mb'] = peak_rss_mb()
+    return results
+
+
+def compare(current: Dict, baseline: Dict, prefix: str = '') -> List[str]:
+    """Lines describing the relative change of every numeric metric present in both results"""
+    lines = []
+    for key, value in current.items():
+        if key not in baseline:
+            continue
+        name = f"{prefix}{key}"
+        other = baseline[key]
+        if isinstance(value, dict) and isinstance(other, dict):
+            lines.extend(compare(value, other, f"{name}."))
+        elif isinstance(value, (int, float)) and isinstance(other, (int, float)) and other:
+            change = (value - other) / other * 100
+            lines.append(f"{name}: {other} -> {value} ({change:+.1f}%)")
+    return lines
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description='Offline job tracker benchmarks')
+    parser.add_argument('--only', help=f"comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument('--cycles', type=int, default=5, help='check_and_notify cycles to time')
+    parser.add_argument('--repeat', type=int, default=20, help='times each fixture is parsed')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='comma-separated job counts for the ingest benchmark')
+    parser.add_argument('--storage-sizes', default=','.join(str(s) for s in DEFAULT_STORAGE_SIZES),
+                        help='comma-separated job counts for the storage backend benchmark')
+    parser.add_argument('--scoring-sizes', default=','.join(str(s) for s in DEFAULT_SCORING_SIZES),
+                        help='comma-separated batch sizes (titles) for the scoring benchmark')
+    parser.add_argument('--parse-workers', type=int, default=2)
+    parser.add_argument('--replay-pages', type=int, default=400, help='archived pages replayed')
+    parser.add_argument('--soak-cycles', type=int, default=2000, help='simulated cycles in the soak benchmark')
+    parser.add_argument('--soak-budget', type=float, default=DEFAULT_SOAK_BUDGET_MB,
+                        help='RSS growth (MB) allowed after the soak warm-up before exiting with status 1')
+    parser.add_argument('--import-budget', type=float, default=DEFAULT_IMPORT_BUDGET,
+                        help='maximum seconds to import main in a fresh interpreter')
+    parser.add_argument('--request-delay', type=float, default=0.0,
+                        help='politeness delay per request during the cycle benchmark')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='simulated network latency per response from the fixture server')
+    parser.add_argument('--label', help='name for the results file (default: git commit)')
+    parser.add_argument('--output', help='results path (default: benchmarks/results/<label>.json)')
+    parser.add_argument('--compare', help='previous results JSON to compare against')
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    selected = args.only.split(',') if args.only else BENCHMARKS
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    storage_sizes = [int(s) for s in args.storage_sizes.split(',') if s]
+    scoring_sizes = [int(s) for s in args.scoring_sizes.split(',') if s]
+
+    label = args.label or git_label()
+    results = {
+        'label': label,
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'results': {},
+    }
+
+    runners: Dict[str, Callable[[], Dict]] = {
+        'startup': lambda: bench_startup(max(args.repeat // 4, 3), args.import_budget),
+        'cycle': lambda: bench_cycle(args.cycles, args.request_delay, args.parse_workers, args.latency),
+        'parse': lambda: bench_parse(args.repeat, args.parse_workers),
+        'ingest': lambda: bench_ingest(sizes),
+        'storage': lambda: bench_storage(storage_sizes),
+        'scoring': lambda: bench_scoring(scoring_sizes, args.repeat),
+        'replay': lambda: bench_replay(args.replay_pages, args.parse_workers),
+        'soak': lambda: bench_soak(args.soak_cycles, args.soak_budget),
+    }
+    for name in selected:
+        print(f"Running {name} benchmark...", flush=True)
+        results['results'][name] = runners[name]()
+    results['peak_rss_mb'] = peak_rss_mb()
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{label}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results['results'], indent=2))
+    print(f"Results written to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nChange vs {baseline.get('label', args.compare)}:")
+        for line in compare(results['results'], baseline.get('results', {})):
+            print(f"  {line}")
+
+    failed = False
+    startup = results['results'].get('startup')
+    if startup and not startup['within_budget']:
+        print(f"\nImport-time budget exceeded: importing main took "
+              f"{startup['import_main_seconds']['p50']}s (budget {startup['budget_seconds']}s)")
+        failed = True
+    soak = results['results'].get('soak')
+    if soak and not soak['within_budget']:
+        print(f"\nSoak budget exceeded: RSS grew {soak['rss_growth_mb']} MB over {soak['cycles']} cycles "
+              f"(budget {soak['budget_mb']} MB)")
+        failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
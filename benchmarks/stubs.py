@@ -0,0 +1,159 @@
+"""
+Local stand-ins for the outside world used by the benchmarks:
+an HTTP server that replays recorded listing pages and an SMTP sink
+"""
+
+import base64
+import os
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def load_fixtures(directory: str = FIXTURES_DIR) -> Dict[str, bytes]:
+    """Load every <name>.html fixture, keyed by name (linkedin, naukri, ...)"""
+    fixtures = {}
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.html'):
+            with open(os.path.join(directory, filename), 'rb') as f:
+                fixtures[filename[:-5]] = f.read()
+    return fixtures
+
+
+class FixtureServer:
+    """HTTP server that answers GET /<name>... with the recorded page <name>.html
+
+    latency adds a fixed delay per response to mimic a real network.
+    """
+
+    def __init__(self, fixtures: Dict[str, bytes] = None, latency: float = 0.0):
+        self.fixtures = fixtures if fixtures is not None else load_fixtures()
+        self.latency = latency
+        self.requests = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                name = self.path.lstrip('/').split('?')[0].split('/')[0]
+                body = stub.fixtures.get(name)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with stub._lock:
+                    stub.requests += 1
+                    stub.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._handler = Handler
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'FixtureServer':
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='fixture-server', daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class SMTPSink:
+    """Minimal SMTP server that accepts any login and message and keeps the raw messages
+
+    Speaks just enough of RFC 5321 (EHLO, AUTH, MAIL, RCPT, DATA, RSET, NOOP, QUIT)
+    for smtplib.SMTP without STARTTLS.
+    """
+
+    def __init__(self):
+        self.messages: List[bytes] = []
+        self._lock = threading.Lock()
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str):
+                self.wfile.write(line.encode() + b'\r\n')
+
+            def handle(self):
+                self.reply('220 localhost SMTP sink ready')
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode(errors='replace').strip()
+                    verb = command.split(' ', 1)[0].upper()
+                    if verb in ('EHLO', 'HELO'):
+                        self.wfile.write(b'250-localhost\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n')
+                    elif verb == 'AUTH':
+                        parts = command.split()
+                        if len(parts) >= 2 and parts[1].upper() == 'LOGIN':
+                            self.reply('334 ' + base64.b64encode(b'Username:').decode())
+                            self.rfile.readline()
+                            self.reply('334 ' + base64.b64encode(b'Password:').decode())
+                            self.rfile.readline()
+                        self.reply('235 Authentication successful')
+                    elif verb in ('MAIL', 'RCPT', 'RSET', 'NOOP'):
+                        self.reply('250 OK')
+                    elif verb == 'DATA':
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        data = []
+                        while True:
+                            chunk = self.rfile.readline()
+                            if not chunk or chunk == b'.\r\n':
+                                break
+                            data.append(chunk)
+                        with sink._lock:
+                            sink.messages.append(b''.join(data))
+                        self.reply('250 OK queued')
+                    elif verb == 'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    else:
+                        self.reply('502 Command not implemented')
+
+        self._handler = Handler
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    def start(self) -> 'SMTPSink':
+        self._server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), self._handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='smtp-sink', daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,167 @@
+"""
+Per-source circuit breakers
+
+When a site blocks us or changes its markup, every keyword request still
+costs a fetch plus the politeness delay and returns nothing. Each source
+gets a breaker that counts consecutive failed requests (non-200 responses,
+timeouts, errors, and listing pages without a single job card) across
+cycles:
+
+- closed: requests go through; failure_threshold failures in a row open it
+- open: requests for the source are skipped without fetching or sleeping
+  until the next probe time
+- half-open: at probe time one request goes through. Success closes the
+  breaker; failure opens it again with the probe interval doubled (up to
+  max_probe_interval), so a source that stays broken is retried less and
+  less often. A probe cancelled before it finishes, or without an outcome
+  after probe_timeout, counts as a failure, so the breaker never waits on
+  it forever
+
+Breaker state lives in memory, for the life of the process.
+"""
+
+import time
+import logging
+from typing import Callable, Dict, Optional
+
+import metrics
+from health import state as health_state
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """A request was skipped because its source's breaker is open"""
+
+
+class CircuitBreaker:
+    """Failure counter and open/half-open/closed state for one source"""
+
+    def __init__(self, source: str, failure_threshold: int = 5, probe_interval: float = 1800,
+                 max_probe_interval: float = 21600, clock: Callable[[], float] = time.monotonic,
+                 probe_timeout: float = 300):
+        self.source = source
+        self.failure_threshold = failure_threshold
+        self.base_probe_interval = probe_interval
+        self.max_probe_interval = max_probe_interval
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.probe_interval = probe_interval
+        self.next_probe: Optional[float] = None
+        self.probe_timeout = probe_timeout
+        self.probe_deadline: Optional[float] = None
+
+    def available(self) -> bool:
+        """Whether a request could go through now (does not claim the half-open probe)"""
+        if self.state == CLOSED:
+            return True
+        self._expire_probe()
+        return self.state == OPEN and self.clock() >= self.next_probe
+
+    def allow(self) -> bool:
+        """Whether to make a request now; the first caller after the probe time becomes the probe
+
+        Each refused request counts once in BREAKER_SKIPPED.
+        """
+        if self.state == CLOSED:
+            return True
+        self._expire_probe()
+        if self.state == OPEN and self.clock() >= self.next_probe:
+            self.probe_deadline = self.clock() + self.probe_timeout
+            self._set_state(HALF_OPEN)
+            return True
+        metrics.BREAKER_SKIPPED.inc(self.source)
+        return False
+
+    def abandon(self):
+        """A request allowed through ended without an outcome (it was cancelled)
+
+        A probe counts as failed; any other request is not counted.
+        """
+        if self.state == HALF_OPEN:
+            self.record_failure('probe cancelled')
+
+    def _expire_probe(self):
+        if self.state == HALF_OPEN and self.clock() >= self.probe_deadline:
+            self.record_failure('probe got no outcome')
+
+    def record_success(self):
+        self.failures = 0
+        if self.state != CLOSED:
+            self.probe_interval = self.base_probe_interval
+            self.next_probe = None
+            self._set_state(CLOSED)
+
+    def record_failure(self, error: str):
+        self.failures += 1
+        self.last_error = error
+        if self.state == HALF_OPEN:
+            self.probe_interval = min(self.probe_interval * 2, self.max_probe_interval)
+            self._open()
+        elif self.state == CLOSED and self.failures >= self.failure_threshold:
+            self._open()
+
+    def _open(self):
+        self.next_probe = self.clock() + self.probe_interval
+        self._set_state(OPEN)
+
+    def _set_state(self, state: str):
+        previous, self.state = self.state, state
+        metrics.BREAKER_OPEN.set(0 if state == CLOSED else 1, self.source)
+        metrics.BREAKER_TRANSITIONS.inc(self.source, state)
+        health_state.source_circuit(self.source, state, self.failures,
+                                    self.probe_interval if state == OPEN else None)
+        if state == OPEN:
+            logger.warning("Circuit for %s opened after %d failed request(s) (last: %s), next probe in %.0f min",
+                           self.source, self.failures, self.last_error, self.probe_interval / 60)
+        elif state == CLOSED:
+            logger.info("Circuit for %s closed, source recovered", self.source)
+        elif previous == OPEN:
+            logger.info("Probing %s", self.source)
+
+
+class BreakerRegistry:
+    """One CircuitBreaker per source, created on first use"""
+
+    def __init__(self, failure_threshold: int = 5, probe_interval: float = 1800,
+                 max_probe_interval: float = 21600):
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.configure(failure_threshold, probe_interval, max_probe_interval)
+
+    def configure(self, failure_threshold: int, probe_interval: float, max_probe_interval: float):
+        """Change the settings of this registry and of breakers already created"""
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+        self.max_probe_interval = max(max_probe_interval, probe_interval)
+        for breaker in self.breakers.values():
+            breaker.failure_threshold = failure_threshold
+            breaker.base_probe_interval = probe_interval
+            breaker.max_probe_interval = self.max_probe_interval
+
+    def get(self, source: str) -> CircuitBreaker:
+        breaker = self.breakers.get(source)
+        if breaker is None:
+            breaker = self.breakers[source] = CircuitBreaker(
+                source, self.failure_threshold, self.probe_interval, self.max_probe_interval
+            )
+        return breaker
+
+
+_registry: Optional[BreakerRegistry] = None
+
+
+def get_breakers(failure_threshold: int = 5, probe_minutes: float = 30,
+                 max_probe_minutes: float = 360) -> BreakerRegistry:
+    """The process-wide breakers, kept across cycles"""
+    global _registry
+    if _registry is None:
+        _registry = BreakerRegistry(failure_threshold, probe_minutes * 60, max_probe_minutes * 60)
+    else:
+        _registry.configure(failure_threshold, probe_minutes * 60, max_probe_minutes * 60)
+    return _registry
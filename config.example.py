@@ -37,12 +37,35 @@ SCRAPING_CONFIG = {
         'internshala': True,
         'naukri': True,
         'indeed': True
-    }
+    },
+    # Requests to the same site that may be in flight at once
+    'per_host_concurrency': 2,
+    # Pause after each request to a site (seconds)
+    'request_delay_seconds': 2,
+    'request_timeout_seconds': 10,
+    # Cancel any scraper still running after this long (seconds)
+    'cycle_timeout_seconds': 600,
+    # Processes used to parse HTML (None = one per core up to 4, 0 = parse in the main process)
+    'parse_workers': None,
+    # Stop reading a listing page at the first job seen on its previous fetch
+    'page_fingerprints': True,
+    # Plan searches from past results: combine overlapping keywords into OR
+    # queries and search keywords that find nothing new less often
+    'query_planner': True,
+    # Trip a site after this many failed requests in a row (non-200, timeout, page without job cards):
+    # it is skipped and probed with one request every breaker_probe_minutes, doubling up to
+    # breaker_max_probe_minutes while it keeps failing
+    'circuit_breaker': True,
+    'breaker_failures': 5,
+    'breaker_probe_minutes': 30,
+    'breaker_max_probe_minutes': 360,
 }
 
 # Filter Configuration
 FILTER_CONFIG = {
     'min_jobs_for_email': int(os.getenv('MIN_JOBS_FOR_EMAIL', '1')),
+    # Most jobs in one email; the rest of a large backlog waits for the next one (0 = no limit)
+    'max_jobs_per_email': int(os.getenv('MAX_JOBS_PER_EMAIL', '500')),
     'exclude_keywords': [
         'senior',
         'lead',
@@ -51,6 +74,99 @@ FILTER_CONFIG = {
         'vp',
         '5+ years',
         '10+ years'
-    ]
+    ],
+    # Filters on job details, applied only when ENRICHMENT_CONFIG['enabled'] is True.
+    # A detail that could not be read never excludes a job.
+    'max_experience_years': None,  # e.g. 1: drop jobs asking for more than 1 year
+    'locations': [],  # e.g. ['Bangalore', 'Pune']: keep only these (remote jobs always pass)
+    'max_age_days': None,  # e.g. 3: drop jobs posted more than 3 days ago
+    # Email jobs (and list unnotified ones) in order of how well their titles match
+    # JOB_KEYWORDS, instead of scrape order. Needs numpy.
+    'rank_jobs': True,
 }
 
+
+# Notification Channels
+# Optional real-time webhook: every new job is POSTed as JSON the moment it is found
+NOTIFIER_CONFIG = {
+    'webhook_url': os.getenv('WEBHOOK_URL', ''),
+    'webhook_timeout': int(os.getenv('WEBHOOK_TIMEOUT', '10')),
+}
+
+# Monitoring
+# Set metrics_port (or METRICS_PORT) to serve Prometheus metrics at http://<host>:<port>/metrics
+# Set health_port (or HEALTH_PORT) to serve /health, /ready and /status for liveness/readiness probes
+MONITORING_CONFIG = {
+    'metrics_port': int(os.getenv('METRICS_PORT', '0')),
+    'metrics_host': os.getenv('METRICS_HOST', '127.0.0.1'),
+    'health_port': int(os.getenv('HEALTH_PORT', '0')),
+    'health_host': os.getenv('HEALTH_HOST', '0.0.0.0'),
+    'health_stale_seconds': float(os.getenv('HEALTH_STALE_SECONDS', '0')),  # 0: cycle timeout + 5 min
+}
+
+# Profiling
+# `python main.py --profile [N]` profiles N cycles and exits; in a running worker,
+# `kill -USR1 <pid>` profiles the next cycle. Output goes to output_dir as
+# collapsed stacks (.folded, for flamegraph.pl/speedscope) and a per-stage summary (.txt).
+PROFILING_CONFIG = {
+    'output_dir': os.getenv('PROFILE_DIR', 'profiles'),
+    'mode': os.getenv('PROFILE_MODE', 'sample'),  # 'sample' or 'deterministic' (adds cProfile .pstats)
+    'interval_ms': float(os.getenv('PROFILE_INTERVAL_MS', '5')),
+    'cycles': int(os.getenv('PROFILE_CYCLES', '0')),  # profile the first N cycles after startup
+}
+
+# Distributed Mode
+# `python main.py --coordinator` queues one task per (source, keyword, page) every
+# check interval; `python main.py --worker [linkedin,indeed]` processes them. All
+# processes must share db_path (a local file or a shared volume).
+WORK_QUEUE_CONFIG = {
+    'db_path': os.getenv('WORK_QUEUE_DB', 'jobs.db'),
+    'lease_seconds': 120,  # a task held longer than this by a worker is handed to another
+    'max_attempts': 3,
+    'poll_seconds': 2,
+    'pages_per_query': 1,  # results pages per search (LinkedIn and Indeed)
+    'busy_timeout_seconds': 60,  # how long a process waits for another's write lock before the write fails
+}
+
+# Seen-jobs Snapshot
+# A compact binary file of every seen job (URL hash + notified flag). When jobs.db
+# starts empty after a redeploy, jobs the snapshot marks as emailed are not stored or
+# emailed again. `python main.py --export-snapshot [path]` writes one,
+# `python main.py --import-snapshot path` merges one into `path` below.
+SNAPSHOT_CONFIG = {
+    'path': os.getenv('SNAPSHOT_PATH', ''),  # e.g. '/data/seen.snap' on a persistent volume
+    'auto': os.getenv('SNAPSHOT_AUTO', 'false').lower() == 'true',  # rewrite it after every cycle
+}
+
+# Page Archive
+# Keep every fetched listing page (gzip) so jobs missed while a scraper was broken can be
+# recovered after fixing it with `python main.py --replay [since]`
+ARCHIVE_CONFIG = {
+    'path': os.getenv('PAGE_ARCHIVE_DIR', ''),  # e.g. '/data/pages'; empty = no archive
+    'retention_days': 14,
+    'replay_notify': True,  # email jobs found by a replay (False: store them as already notified)
+}
+
+# Detail Enrichment
+# Fetch the detail page of every new job (never of already-seen ones) to read experience,
+# location and posting time for the detail filters in FILTER_CONFIG. New jobs are pushed to
+# webhooks once they have passed those filters.
+ENRICHMENT_CONFIG = {
+    'enabled': os.getenv('ENRICH_DETAILS', 'false').lower() == 'true',
+    'concurrency': 4,  # detail pages fetched at once
+    'per_host_concurrency': 1,
+    'request_delay_seconds': 1,
+    'cache_size': 5000,  # parsed detail pages kept in memory, by canonical URL
+}
+
+# Digest Batching
+# With max_delay_minutes > 0, new jobs wait in the database and are emailed together
+# when a priority job arrives, max_batch_size jobs are waiting, or the oldest has
+# waited max_delay_minutes. 0 emails every cycle's new jobs, as before.
+DIGEST_CONFIG = {
+    'max_delay_minutes': 0,  # e.g. 120: at most one ordinary digest every 2 hours
+    'max_batch_size': 50,
+    'max_emails_per_hour': 0,  # 0 = no cap
+    'priority_keywords': [],  # e.g. ['new grad 2026']: matching titles are emailed at once
+    'priority_companies': [],  # e.g. ['Google', 'Microsoft']
+}
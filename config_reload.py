@@ -0,0 +1,109 @@
+"""
+Hot reload of settings from config.py or a TOML/JSON file
+
+ConfigWatcher checks the file's modification time when polled (main.py
+polls between cycles) and, when it has changed, loads the whole file into a
+new set of settings. Nothing is returned unless the file loads and
+validates, so a half-saved edit or a typo leaves the running settings as
+they are until the next save.
+
+config.py is executed as Python. A .toml or .json file holds the same names
+at the top level and only needs the settings it changes:
+
+    JOB_KEYWORDS = ["new grad", "intern"]
+
+    [FILTER_CONFIG]
+    exclude_keywords = ["senior", "lead"]
+
+Each section in the file is merged key by key over the settings the
+process started with, so deleting a key from the file restores its
+startup value.
+"""
+
+import copy
+import json
+import os
+import runpy
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('.py', '.toml', '.json')
+
+
+class ConfigError(ValueError):
+    """The config file cannot be used"""
+
+
+def load_config_file(path: str, names: Iterable[str]) -> Dict[str, Any]:
+    """The sections among `names` defined in the file at path"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.py':
+        values = runpy.run_path(path)
+    elif extension == '.json':
+        with open(path, encoding='utf-8') as f:
+            values = json.load(f)
+    elif extension == '.toml':
+        import tomllib
+        with open(path, 'rb') as f:
+            values = tomllib.load(f)
+    else:
+        raise ConfigError(f"unsupported config file type {extension or path!r} (use one of {', '.join(FORMATS)})")
+    if not isinstance(values, dict):
+        raise ConfigError("the top level must be a table of settings")
+    return {name: values[name] for name in names if name in values}
+
+
+def validate(sections: Dict[str, Any], baseline: Dict[str, Any]):
+    """Raise ConfigError unless every section has the type of its startup value"""
+    for name, value in sections.items():
+        if name == 'JOB_KEYWORDS':
+            if not (isinstance(value, list) and value and all(isinstance(k, str) and k.strip() for k in value)):
+                raise ConfigError("JOB_KEYWORDS must be a non-empty list of keywords")
+        elif isinstance(baseline[name], dict) and not isinstance(value, dict):
+            raise ConfigError(f"{name} must be a table of settings")
+
+
+def merge(baseline: Dict[str, Any], sections: Dict[str, Any]) -> Dict[str, Any]:
+    """baseline with each of `sections` merged over it (dict sections key by key, others replaced)"""
+    merged = {}
+    for name, base in baseline.items():
+        if name not in sections:
+            merged[name] = copy.deepcopy(base)
+        elif isinstance(base, dict):
+            merged[name] = {**copy.deepcopy(base), **sections[name]}
+        else:
+            merged[name] = sections[name]
+    return merged
+
+
+class ConfigWatcher:
+    """Reloads one config file when it changes"""
+
+    def __init__(self, path: str, baseline: Dict[str, Any], loaded: bool = False):
+        """baseline: the startup value of every reloadable section; loaded: the file's current content is already in effect"""
+        self.path = path
+        self.baseline = copy.deepcopy(baseline)
+        self._stamp = self._stat() if loaded else None
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def poll(self) -> Optional[Dict[str, Any]]:
+        """New settings (every reloadable section) if the file changed and is valid, else None"""
+        stamp = self._stat()
+        if stamp is None or stamp == self._stamp:
+            return None
+        self._stamp = stamp
+        try:
+            sections = load_config_file(self.path, self.baseline)
+            validate(sections, self.baseline)
+        except Exception as e:
+            logger.error("Not reloading %s, keeping the current settings: %s", self.path, e)
+            return None
+        return merge(self.baseline, sections)
@@ -2,146 +2,163 @@
 Database module for storing and tracking job listings
 """
 
-import sqlite3
-import json
+import heapq
+import os
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Set, Tuple, Union
 import logging
 
-logging.basicConfig(level=logging.INFO)
+from models import Job
+from snapshot import Snapshot, open_snapshot
+from storage import StorageBackend, get_backend
+
 logger = logging.getLogger(__name__)
 
+# Jobs read per query when paging through unnotified jobs
+UNNOTIFIED_PAGE = 500
+
 
 class JobDatabase:
-    """SQLite database for tracking job listings"""
+    """Tracks job listings in a pluggable storage backend (see storage.py)
+    
+    backend is 'sqlite' (default), 'memory' or 'log', or a StorageBackend
+    instance; it defaults to the STORAGE_BACKEND environment variable.
+    
+    snapshot_path names an optional seen-jobs snapshot (see snapshot.py):
+    jobs it records as notified count as already stored, so a fresh
+    database does not ingest or email them again.
     
-    def __init__(self, db_path: str = "jobs.db"):
+    With a scorer (see scoring.RelevanceScorer), get_unnotified_jobs returns
+    the most relevant jobs first.
+    """
+    
+    def __init__(self, db_path: str = "jobs.db", backend: Union[str, StorageBackend] = None,
+                 snapshot_path: str = None, scorer=None):
         self.db_path = db_path
-        self.init_database()
+        if not isinstance(backend, StorageBackend):
+            backend = get_backend(backend or os.getenv('STORAGE_BACKEND', 'sqlite'), db_path)
+        self.backend = backend
+        self.snapshot_path = snapshot_path
+        self.scorer = scorer
     
-    def init_database(self):
-        """Initialize the database with required tables"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS jobs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                company TEXT,
-                url TEXT UNIQUE NOT NULL,
-                source TEXT,
-                scraped_at TEXT,
-                notified INTEGER DEFAULT 0,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_url ON jobs(url)
-        ''')
-        
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_notified ON jobs(notified)
-        ''')
-        
-        conn.commit()
-        conn.close()
-        logger.info("Database initialized")
+    @property
+    def snapshot(self) -> Optional[Snapshot]:
+        # Looked up on each use, so a snapshot rewritten by another process is picked up
+        return open_snapshot(self.snapshot_path) if self.snapshot_path else None
     
     def job_exists(self, url: str) -> bool:
         """Check if a job with the given URL already exists"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT COUNT(*) FROM jobs WHERE url = ?', (url,))
-        count = cursor.fetchone()[0]
-        
-        conn.close()
-        return count > 0
+        return bool(self.exists_many([url]))
+    
+    def exists_many(self, urls: Iterable[str]) -> Set[str]:
+        """The subset of urls that are already stored (or notified according to the snapshot)"""
+        urls = list(urls)
+        found = self.backend.exists_many(urls)
+        snapshot = self.snapshot
+        if snapshot is not None:
+            found.update(url for url in urls if snapshot.is_notified(url))
+        return found
     
-    def add_job(self, job: Dict) -> bool:
+    def iter_seen(self) -> Iterator[Tuple[str, bool]]:
+        """(url, notified) for every stored job"""
+        return self.backend.iter_seen()
+    
+    def add_job(self, job: Job) -> bool:
         """Add a new job to the database. Returns True if job was new, False if it already existed"""
-        if self.job_exists(job['url']):
-            return False
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return len(self.add_jobs([job])) == 1
+    
+    def add_jobs(self, jobs: List[Job], on_new: Optional[Callable[[Job], None]] = None,
+                 fingerprints: Dict[Tuple[str, str], List[str]] = None) -> List[Job]:
+        """Add multiple jobs and return only the new ones
+        
+        Jobs are deduplicated by URL. If on_new is given it is called with
+        each new job as soon as the batch is stored (never for a batch that
+        failed), so push channels don't wait for the rest of the cycle.
+        Page fingerprints are saved together with the jobs, so a page is
+        only remembered as seen once its jobs are stored.
+        """
+        snapshot = self.snapshot
+        if snapshot is not None:
+            jobs = [job for job in jobs if not snapshot.is_notified(job.url)]
+        return self.backend.add_jobs(jobs, on_new=on_new, fingerprints=fingerprints)
+    
+    def get_fingerprints(self) -> Dict[Tuple[str, str], List[str]]:
+        """Card ids seen on each (source, keyword) listing page at its last fetch"""
+        return self.backend.get_fingerprints()
+    
+    def record_query_results(self, results: Dict[Tuple[str, str], List[str]], retention_days: int = 30):
+        """Store the new job URLs each (source, query) search returned this cycle
         
-        try:
-            cursor.execute('''
-                INSERT INTO jobs (title, company, url, source, scraped_at, notified)
-                VALUES (?, ?, ?, ?, ?, 0)
-            ''', (
-                job.get('title', ''),
-                job.get('company', 'Unknown'),
-                job.get('url', ''),
-                job.get('source', 'Unknown'),
-                job.get('scraped_at', datetime.now().isoformat())
-            ))
-            conn.commit()
-            conn.close()
-            return True
-        except sqlite3.IntegrityError:
-            conn.close()
-            return False
-        except Exception as e:
-            logger.error(f"Error adding job to database: {e}")
-            conn.close()
-            return False
-    
-    def add_jobs(self, jobs: List[Dict]) -> List[Dict]:
-        """Add multiple jobs and return only the new ones"""
-        new_jobs = []
-        for job in jobs:
-            if self.add_job(job):
-                new_jobs.append(job)
-        return new_jobs
+        History older than retention_days is deleted.
+        """
+        self.backend.record_query_results(results, retention_days)
+    
+    def get_query_history(self, source: str, since: datetime) -> Dict[str, Dict]:
+        """Per query of a source since `since`: runs, cards, the set of URLs found and the last run time"""
+        return self.backend.get_query_history(source, since)
     
     def mark_as_notified(self, job_id: int):
         """Mark a job as notified"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('UPDATE jobs SET notified = 1 WHERE id = ?', (job_id,))
-        conn.commit()
-        conn.close()
-    
-    def get_unnotified_jobs(self) -> List[Dict]:
-        """Get all jobs that haven't been notified yet"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT * FROM jobs WHERE notified = 0 ORDER BY created_at DESC
-        ''')
-        
-        rows = cursor.fetchall()
-        jobs = [dict(row) for row in rows]
-        
-        conn.close()
-        return jobs
+        self.backend.mark_notified_many([job_id])
+    
+    def mark_many_as_notified(self, job_ids: List[int]):
+        """Mark several jobs as notified in one transaction"""
+        self.backend.mark_notified_many(job_ids)
+    
+    def get_unnotified_jobs(self, limit: int = None) -> List[Job]:
+        """Get jobs that haven't been notified yet, most relevant (or without a scorer, newest) first
+        
+        With limit, only the first `limit` of them. Ranking then reads the
+        backlog a page at a time and keeps the best `limit` jobs so far, so
+        memory stays bounded however many jobs are waiting. A backlog larger
+        than one page is read twice: first for the document frequencies of
+        the whole backlog, then to score every page with them, so the
+        result is the same as ranking the whole backlog at once.
+        """
+        if self.scorer is None:
+            return self.backend.get_unnotified_jobs(limit=limit)
+        if limit is None:
+            return self.scorer.rank(self.backend.get_unnotified_jobs())
+        page_size = max(limit, UNNOTIFIED_PAGE)
+        df, total = None, 0
+        for page in self.iter_unnotified_pages(page_size):
+            if total == 0 and len(page) < page_size:
+                return self.scorer.rank(page)[:limit]
+            page_df = self.scorer.document_frequencies([job.title for job in page])
+            df = page_df if df is None else df + page_df
+            total += len(page)
+        # (score, -position, job): ties keep newest-first order, and jobs themselves are never compared
+        best: List[Tuple[float, int, Job]] = []
+        position = 0
+        for page in self.iter_unnotified_pages(page_size):
+            scores = self.scorer.score([job.title for job in page], df, total)
+            best = heapq.nlargest(limit, best + [(float(score), -(position + i), job)
+                                                 for i, (score, job) in enumerate(zip(scores, page))])
+            position += len(page)
+        return [job for _, _, job in best]
+    
+    def iter_unnotified_pages(self, page_size: int = None) -> Iterator[List[Job]]:
+        """Unnotified jobs, newest first, in pages of at most page_size read one query at a time"""
+        page_size = page_size or UNNOTIFIED_PAGE
+        before_id = None
+        while True:
+            page = self.backend.get_unnotified_jobs(limit=page_size, before_id=before_id)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            before_id = page[-1].id
+    
+    def iter_unnotified_jobs(self, page_size: int = None) -> Iterator[Job]:
+        """Every unnotified job, newest first, without loading the whole backlog"""
+        for page in self.iter_unnotified_pages(page_size):
+            yield from page
+    
+    def search(self, text: str, source: str = None, limit: int = 50) -> List[Job]:
+        """Newest jobs whose title or company contains text"""
+        return self.backend.search(text, source=source, limit=limit)
     
     def get_stats(self) -> Dict:
         """Get database statistics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT COUNT(*) FROM jobs')
-        total = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM jobs WHERE notified = 0')
-        unnotified = cursor.fetchone()[0]
-        
-        cursor.execute('SELECT COUNT(*) FROM jobs WHERE notified = 1')
-        notified = cursor.fetchone()[0]
-        
-        conn.close()
-        
-        return {
-            'total_jobs': total,
-            'unnotified_jobs': unnotified,
-            'notified_jobs': notified
-        }
+        return self.backend.get_stats()
 
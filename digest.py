@@ -0,0 +1,143 @@
+"""
+Adaptive batching of the email digest
+
+Instead of one email per cycle, new jobs wait in the database (unnotified)
+and are sent together when one of these happens:
+
+- a pending job matches a priority keyword or company: send now
+- max_batch_size jobs are pending: send now
+- the oldest pending job has waited max_delay_minutes: send now, which
+  bounds the time to notify
+
+With max_delay_minutes = 0 every cycle's jobs are sent at once (if there
+are at least min_jobs of them), as without batching.
+
+Emails are capped at max_emails_per_hour; while the cap is reached jobs
+keep waiting, and go out in the next allowed email. The cap is counted in
+memory, so it holds for a long-running process, not across --once runs.
+
+After a failed send (SMTP or SendGrid down), pending jobs wait
+FAILURE_BACKOFF before the next attempt, doubling with each failure in a
+row up to MAX_FAILURE_BACKOFF, so an outage is not retried every minute.
+"""
+
+import logging
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Iterable, NamedTuple, Optional, Tuple, Union
+
+from models import Job
+
+logger = logging.getLogger(__name__)
+
+FAILURE_BACKOFF = timedelta(minutes=2)
+MAX_FAILURE_BACKOFF = timedelta(minutes=60)
+
+
+class Pending(NamedTuple):
+    """What decide() needs to know about the pending jobs"""
+    count: int
+    priority: bool
+    oldest: Optional[datetime]
+
+
+def _scraped_at(job: Job) -> Optional[datetime]:
+    # Stored jobs carry the scrape time as an ISO string
+    scraped_at = job.scraped_at
+    if isinstance(scraped_at, str):
+        try:
+            return datetime.fromisoformat(scraped_at)
+        except ValueError:
+            return None
+    return scraped_at
+
+
+class DigestPolicy:
+    """Decides when pending jobs are emailed"""
+
+    def __init__(self, max_delay_minutes: float = 60, max_batch_size: int = 50, max_emails_per_hour: int = 0,
+                 priority_keywords: Iterable[str] = (), priority_companies: Iterable[str] = (),
+                 min_jobs: int = 1):
+        self.max_delay = timedelta(minutes=max_delay_minutes)
+        self.max_batch_size = max_batch_size
+        self.max_emails_per_hour = max_emails_per_hour
+        self.priority_keywords = [keyword.lower() for keyword in priority_keywords]
+        self.priority_companies = [company.lower() for company in priority_companies]
+        self.min_jobs = min_jobs
+        # Times of the emails sent in the last hour
+        self._sends: deque = deque()
+        # Failed sends in a row, and when the next attempt is allowed
+        self._failures = 0
+        self._retry_at: Optional[datetime] = None
+
+    def is_priority(self, job: Job) -> bool:
+        title = job.title.lower()
+        company = (job.company or '').lower()
+        return (any(keyword in title for keyword in self.priority_keywords)
+                or any(name in company for name in self.priority_companies))
+
+    def sends_last_hour(self, now: datetime = None) -> int:
+        cutoff = (now or datetime.now()) - timedelta(hours=1)
+        while self._sends and self._sends[0] <= cutoff:
+            self._sends.popleft()
+        return len(self._sends)
+
+    @staticmethod
+    def oldest(jobs: Iterable[Job]) -> Optional[datetime]:
+        """Earliest scrape time among jobs"""
+        return min(filter(None, map(_scraped_at, jobs)), default=None)
+
+    def summarize(self, jobs: Iterable[Job]) -> Pending:
+        """Count, priority match and oldest scrape time of jobs, in one pass so they can stream from the database"""
+        count = 0
+        priority = False
+        oldest = None
+        for job in jobs:
+            count += 1
+            priority = priority or self.is_priority(job)
+            scraped_at = _scraped_at(job)
+            if scraped_at is not None and (oldest is None or scraped_at < oldest):
+                oldest = scraped_at
+        return Pending(count, priority, oldest)
+
+    def decide(self, pending: Union[Iterable[Job], Pending], now: datetime = None) -> Tuple[bool, str]:
+        """(send now?, reason) for the jobs waiting to be emailed, or for their summarize()"""
+        now = now or datetime.now()
+        if not isinstance(pending, Pending):
+            pending = self.summarize(pending)
+        if not pending.count:
+            return False, 'empty'
+        if self._retry_at is not None and now < self._retry_at:
+            return False, 'backoff'
+        if self.max_emails_per_hour and self.sends_last_hour(now) >= self.max_emails_per_hour:
+            return False, 'hourly cap'
+        if pending.priority:
+            return True, 'priority'
+        if pending.count >= self.max_batch_size:
+            return True, 'size'
+        if not self.max_delay:
+            # No coalescing: every cycle's jobs go out, as long as there are min_jobs of them
+            return (True, 'cycle') if pending.count >= self.min_jobs else (False, 'below minimum')
+        oldest = pending.oldest
+        if oldest is not None and now - oldest >= self.max_delay:
+            return True, 'latency'
+        return False, 'coalescing'
+
+    def record_send(self, now: datetime = None):
+        self._sends.append(now or datetime.now())
+        self._failures = 0
+        self._retry_at = None
+
+    def record_failure(self, now: datetime = None):
+        """A send failed: hold pending jobs for a backoff that doubles with each failure in a row"""
+        self._failures += 1
+        backoff = min(FAILURE_BACKOFF * 2 ** (self._failures - 1), MAX_FAILURE_BACKOFF)
+        self._retry_at = (now or datetime.now()) + backoff
+        logger.warning("Digest email failed (%d in a row), next attempt in %.0f min",
+                       self._failures, backoff.total_seconds() / 60)
+
+    def carry_over(self, previous: 'DigestPolicy'):
+        """Continue the send history and failure backoff of the policy this one replaces after a config reload"""
+        self._sends = previous._sends
+        self._failures = previous._failures
+        self._retry_at = previous._retry_at
@@ -3,32 +3,152 @@ Email notification module for sending job alerts
 Supports both SMTP and SendGrid API
 """
 
+import contextvars
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Dict, Optional
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable, List, Dict, Optional, Set, Tuple
 import logging
+import threading
+import time
 from datetime import datetime
 import os
 
-logging.basicConfig(level=logging.INFO)
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+from models import Job
+from notifier import Notifier
+
 logger = logging.getLogger(__name__)
 
+DEFAULT_SENDGRID_API_URL = 'https://api.sendgrid.com/v3/mail/send'
+
+
+class SendGridClient:
+    """Long-lived SendGrid v3 HTTP API client
+    
+    Keeps one requests.Session (and its keep-alive connection pool) for the
+    life of the process instead of opening a new HTTPS connection per email.
+    The API URL (default: the SENDGRID_API_URL environment variable) can be
+    pointed at a local stub server for testing.
+    """
+    
+    def __init__(self, api_key: str, api_url: str = None, timeout: int = 15, pool_size: int = 4):
+        self.api_key = api_key
+        self.api_url = api_url or os.getenv('SENDGRID_API_URL', DEFAULT_SENDGRID_API_URL)
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json'
+        })
+    
+    def build_payload(self, from_email: str, recipients: List[str], subject: str,
+                      text_content: str, html_content: str) -> Dict:
+        """Build a mail/send payload with one personalization per recipient"""
+        return {
+            'personalizations': [{'to': [{'email': r}]} for r in recipients],
+            'from': {'email': from_email},
+            'subject': subject,
+            'content': [
+                {'type': 'text/plain', 'value': text_content},
+                {'type': 'text/html', 'value': html_content}
+            ]
+        }
+    
+    def send(self, from_email: str, recipients: List[str], subject: str,
+             text_content: str, html_content: str) -> Tuple[int, str]:
+        """Send one message to all recipients in a single API request. Returns (status_code, body)"""
+        payload = self.build_payload(from_email, recipients, subject, text_content, html_content)
+        response = self.session.post(self.api_url, json=payload, timeout=self.timeout)
+        return response.status_code, response.text
+    
+    def close(self):
+        """Close the underlying connection pool"""
+        self.session.close()
+
+
+_sendgrid_clients: Dict[Tuple[str, str], SendGridClient] = {}
+_send_executor: Optional[ThreadPoolExecutor] = None
+_pending_sends: Set[Future] = set()
+_lock = threading.Lock()
+
+
+def get_sendgrid_client(api_key: str, api_url: str = None) -> SendGridClient:
+    """Return the shared SendGrid client for this API key, creating it on first use"""
+    key = (api_key, api_url or os.getenv('SENDGRID_API_URL', DEFAULT_SENDGRID_API_URL))
+    with _lock:
+        client = _sendgrid_clients.get(key)
+        if client is None:
+            client = SendGridClient(api_key, key[1])
+            _sendgrid_clients[key] = client
+        return client
+
 
-class EmailNotifier:
+def submit_send(fn: Callable, *args) -> Future:
+    """Run fn(*args) on the background email thread without blocking the caller
+
+    Sends run one at a time, in the order they were submitted, so emails
+    (and their retries) never hold up the scheduler thread. fn runs in a
+    copy of the caller's context, so its log lines keep the cycle id. An
+    exception in fn is logged and the Future's result is False.
+    """
+    global _send_executor
+    context = contextvars.copy_context()
+
+    def run():
+        try:
+            return context.run(fn, *args)
+        except Exception as e:
+            logger.error("Error sending email in the background: %s", e, exc_info=True)
+            return False
+
+    with _lock:
+        if _send_executor is None:
+            _send_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='email-send')
+        future = _send_executor.submit(run)
+        _pending_sends.add(future)
+    future.add_done_callback(_pending_sends.discard)
+    return future
+
+
+def sends_pending() -> bool:
+    """Whether a background send is queued or running"""
+    return bool(_pending_sends)
+
+
+def wait_for_sends(timeout: float = None) -> bool:
+    """Block until every background send has finished; False if timeout passed first"""
+    with _lock:
+        pending = list(_pending_sends)
+    if not pending:
+        return True
+    return not wait(pending, timeout=timeout).not_done
+
+
+class EmailNotifier(Notifier):
     """Handles sending email notifications for new job listings"""
     
-    def __init__(self, smtp_server: str = None, smtp_port: int = None, email: str = None, password: str = None, sendgrid_api_key: str = None):
+    def __init__(self, smtp_server: str = None, smtp_port: int = None, email: str = None, password: str = None, sendgrid_api_key: str = None, recipient: str = None, use_tls: bool = True):
         self.smtp_server = smtp_server
         self.smtp_port = smtp_port
         self.email = email
         self.password = password
+        self.recipient = recipient
+        # Only disable for local relays/test sinks; credentials are sent in the clear
+        self.use_tls = use_tls
         self.sendgrid_api_key = sendgrid_api_key or os.getenv('SENDGRID_API_KEY')
         
         # Check if SendGrid should be used
         self.use_sendgrid = os.getenv('USE_SENDGRID', 'false').lower() == 'true' or self.sendgrid_api_key is not None
     
-    def create_email_body(self, jobs: List[Dict]) -> str:
+    def create_email_body(self, jobs: List[Job]) -> str:
         """Create HTML email body with job listings"""
         html = f"""
         <!DOCTYPE html>
@@ -56,11 +176,11 @@ class EmailNotifier:
         for job in jobs:
             html += f"""
             <div class="job-container">
-                <div class="job-title">{job.get('title', 'N/A')}</div>
-                <div class="job-company">Company: {job.get('company', 'Unknown')}</div>
-                <div class="job-source">{job.get('source', 'Unknown')}</div>
+                <div class="job-title">{job.title or 'N/A'}</div>
+                <div class="job-company">Company: {job.company}</div>
+                <div class="job-source">{job.source}</div>
                 <div style="margin-top: 10px;">
-                    <a href="{job.get('url', '#')}" class="job-link" target="_blank">View Job →</a>
+                    <a href="{job.url or '#'}" class="job-link" target="_blank">View Job →</a>
                 </div>
             </div>
             """
@@ -76,61 +196,56 @@ class EmailNotifier:
         
         return html
     
-    def send_email_via_sendgrid(self, recipient: str, jobs: List[Dict], subject: str) -> bool:
+    def create_text_body(self, jobs: List[Job]) -> str:
+        """Create plain text email body with job listings"""
+        text = f"Found {len(jobs)} new job listing(s):\n\n"
+        for job in jobs:
+            text += f"{job.title or 'N/A'} at {job.company}\n"
+            text += f"Link: {job.url}\n\n"
+        return text
+    
+    def send_email_via_sendgrid(self, recipient: str, jobs: List[Job], subject: str) -> bool:
         """Send email using SendGrid API"""
         try:
-            from sendgrid import SendGridAPIClient
-            from sendgrid.helpers.mail import Mail, Content
-            
             if not self.sendgrid_api_key:
                 logger.error("❌ SendGrid API key not found")
                 return False
             
             logger.info("Sending email via SendGrid API...")
             
-            # Create email content
-            html_content = self.create_email_body(jobs)
-            
-            text_content = f"Found {len(jobs)} new job listing(s):\n\n"
-            for job in jobs:
-                text_content += f"{job.get('title', 'N/A')} at {job.get('company', 'Unknown')}\n"
-                text_content += f"Link: {job.get('url', '')}\n\n"
-            
             from_email_address = self.email or os.getenv('SENDER_EMAIL', 'noreply@example.com')
             if not from_email_address:
                 logger.error("❌ No sender email configured for SendGrid")
                 return False
             
-            # Create SendGrid message (html + plain text)
-            message = Mail(
+            # One request for all recipients, each gets its own personalization
+            recipients = [r.strip() for r in recipient.split(',') if r.strip()]
+            client = get_sendgrid_client(self.sendgrid_api_key)
+            status_code, body = client.send(
                 from_email=from_email_address,
-                to_emails=recipient,
+                recipients=recipients,
                 subject=subject,
-                html_content=html_content
+                text_content=self.create_text_body(jobs),
+                html_content=self.create_email_body(jobs)
             )
-            # Add plain text version for email clients that don't support HTML
-            message.add_content(Content("text/plain", text_content))
             
-            # Send email
-            sg = SendGridAPIClient(self.sendgrid_api_key)
-            response = sg.send(message)
-            
-            if response.status_code in [200, 202]:
+            if status_code in [200, 202]:
                 logger.info(f"✅ Email sent successfully via SendGrid to {recipient} with {len(jobs)} jobs")
                 return True
             else:
-                logger.error(f"❌ SendGrid API error: Status {response.status_code}")
-                logger.error(f"Response: {response.body}")
+                logger.error(f"❌ SendGrid API error: Status {status_code}")
+                logger.error(f"Response: {body}")
                 return False
                 
-        except ImportError:
-            logger.error("❌ SendGrid package not installed. Run: pip install sendgrid")
-            return False
         except Exception as e:
             logger.error(f"❌ Error sending email via SendGrid: {e}")
             return False
     
-    def send_email(self, recipient: str, jobs: List[Dict], subject: str = None, retries: int = 3):
+    def notify(self, jobs: List[Job]) -> bool:
+        """Send one digest email with all jobs to the configured recipient"""
+        return self.send_email(self.recipient, jobs)
+    
+    def send_email(self, recipient: str, jobs: List[Job], subject: str = None, retries: int = 3):
         """Send email notification with job listings"""
         if not jobs:
             logger.info("No jobs to send, skipping email")
@@ -142,13 +257,16 @@ class EmailNotifier:
         # Try SendGrid first if configured
         if self.use_sendgrid:
             logger.info("Using SendGrid API for email delivery...")
-            success = self.send_email_via_sendgrid(recipient, jobs, subject)
+            with metrics.EMAIL_SEND_SECONDS.time('sendgrid'):
+                success = self.send_email_via_sendgrid(recipient, jobs, subject)
+            metrics.EMAIL_ATTEMPTS.inc('sendgrid', 'success' if success else 'error')
             if success:
                 return True
             else:
                 logger.warning("SendGrid failed, falling back to SMTP...")
         
         # Fall back to SMTP if SendGrid not available or failed
+        smtp_start = time.perf_counter()
         
         # Try multiple SMTP methods
         smtp_methods = [
@@ -156,6 +274,12 @@ class EmailNotifier:
             {'port': 465, 'use_tls': False, 'use_ssl': True},
             {'port': 25, 'use_tls': True, 'use_ssl': False},
         ]
+        # Try the configured port first
+        if self.smtp_port and self.smtp_port not in (587, 465, 25):
+            smtp_methods.insert(0, {'port': self.smtp_port, 'use_tls': True, 'use_ssl': False})
+        smtp_methods.sort(key=lambda m: m['port'] != self.smtp_port)
+        if not self.use_tls:
+            smtp_methods = [dict(m, use_tls=False, use_ssl=False) for m in smtp_methods]
         
         for attempt in range(retries):
             for method in smtp_methods:
@@ -168,11 +292,7 @@ class EmailNotifier:
                     msg['To'] = recipient
                     
                     # Create both plain text and HTML versions
-                    text = f"Found {len(jobs)} new job listing(s):\n\n"
-                    for job in jobs:
-                        text += f"{job.get('title', 'N/A')} at {job.get('company', 'Unknown')}\n"
-                        text += f"Link: {job.get('url', '')}\n\n"
-                    
+                    text = self.create_text_body(jobs)
                     html = self.create_email_body(jobs)
                     
                     part1 = MIMEText(text, 'plain')
@@ -194,17 +314,22 @@ class EmailNotifier:
                     server.send_message(msg)
                     server.quit()
                     
+                    metrics.EMAIL_ATTEMPTS.inc('smtp', 'success')
+                    metrics.EMAIL_SEND_SECONDS.observe(time.perf_counter() - smtp_start, 'smtp')
                     logger.info(f"✅ Email sent successfully to {recipient} with {len(jobs)} jobs")
                     return True
                     
                 except smtplib.SMTPConnectError as e:
+                    metrics.EMAIL_ATTEMPTS.inc('smtp', 'error')
                     logger.warning(f"Connection error on port {method['port']}: {e}")
                     continue
                 except smtplib.SMTPAuthenticationError as e:
+                    metrics.EMAIL_ATTEMPTS.inc('smtp', 'auth_error')
                     logger.error(f"❌ Authentication failed: {e}")
                     logger.error("   Check your email and App Password in Railway environment variables")
                     return False
                 except OSError as e:
+                    metrics.EMAIL_ATTEMPTS.inc('smtp', 'error')
                     error_msg = str(e).lower()
                     if 'network is unreachable' in error_msg or '101' in error_msg:
                         logger.warning(f"Network unreachable on port {method['port']}: {e}")
@@ -214,15 +339,16 @@ class EmailNotifier:
                         logger.warning(f"Network error on port {method['port']}: {e}")
                         continue
                 except Exception as e:
+                    metrics.EMAIL_ATTEMPTS.inc('smtp', 'error')
                     logger.warning(f"Error on port {method['port']}: {type(e).__name__}: {e}")
                     continue
             
             if attempt < retries - 1:
                 wait_time = (attempt + 1) * 5  # Wait 5, 10, 15 seconds
                 logger.info(f"Waiting {wait_time} seconds before retry...")
-                import time
                 time.sleep(wait_time)
         
+        metrics.EMAIL_SEND_SECONDS.observe(time.perf_counter() - smtp_start, 'smtp')
         logger.error(f"❌ Failed to send email after {retries} attempts")
         logger.error("   Possible issues:")
         logger.error("   1. Railway is blocking SMTP connections (port 587/465)")
@@ -233,13 +359,12 @@ class EmailNotifier:
     
     def send_test_email(self, recipient: str):
         """Send a test email to verify configuration"""
-        test_jobs = [{
-            'title': 'Test Job Listing',
-            'company': 'Test Company',
-            'url': 'https://example.com',
-            'source': 'Test Source',
-            'scraped_at': datetime.now().isoformat()
-        }]
+        test_jobs = [Job(
+            title='Test Job Listing',
+            company='Test Company',
+            url='https://example.com',
+            source='Test Source'
+        )]
         
         return self.send_email(recipient, test_jobs, "🧪 Test Email - Job Scraper")
 
@@ -0,0 +1,158 @@
+"""
+Job-detail enrichment
+
+Listing cards only carry title, company and URL. This optional stage fetches
+the detail page of each job the database accepted as new, so its cost grows
+with new jobs rather than with everything scraped, and reads experience,
+location and posting time into job.details for filtering.
+
+Detail fetches share the scrapers' event loop, session, per-host limits and
+parse pool, with a cap on fetches in flight. Parsed details are cached by
+canonical URL (tracking parameters removed) in a bounded LRU cache that
+lives for the process, so a job that reappears under another link is not
+fetched again.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import metrics
+from models import Job, JobDetails
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that identify a job rather than track a click (Indeed's jk, LinkedIn's currentJobId)
+ID_PARAMS = frozenset({'jk', 'vjk', 'currentJobId', 'jobId', 'id'})
+
+
+def canonical_url(url: str) -> str:
+    """Job URL without tracking parameters, fragment, trailing slash or case differences in the host"""
+    parts = urlsplit(url)
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query) if k in ID_PARAMS))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), query, ''))
+
+
+class DetailCache:
+    """Least-recently-used JobDetails keyed by canonical URL"""
+
+    def __init__(self, max_size: int = 5000):
+        self.max_size = max_size
+        self._entries: 'OrderedDict[str, JobDetails]' = OrderedDict()
+
+    def get(self, url: str) -> Optional[JobDetails]:
+        key = canonical_url(url)
+        details = self._entries.get(key)
+        if details is not None:
+            self._entries.move_to_end(key)
+        return details
+
+    def put(self, url: str, details: JobDetails):
+        key = canonical_url(url)
+        self._entries[key] = details
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_cache: Optional[DetailCache] = None
+
+
+def get_detail_cache(max_size: int = 5000) -> DetailCache:
+    """The process-wide detail cache, kept across cycles"""
+    global _cache
+    if _cache is None:
+        _cache = DetailCache(max_size)
+    _cache.max_size = max_size
+    return _cache
+
+
+async def enrich_jobs_async(jobs: List[Job], concurrency: int = 4, per_host_concurrency: int = 1,
+                            request_delay: float = 1, request_timeout: float = 10,
+                            parse_workers: int = None, cache: DetailCache = None, session=None) -> int:
+    """Set job.details for each job from its detail page (or the cache)
+
+    At most `concurrency` detail pages are fetched at once, and at most
+    per_host_concurrency per site. Jobs whose page cannot be fetched keep
+    details=None. Returns the number of jobs enriched.
+    """
+    from job_scraper import (HostLimiter, SCRAPERS, default_parse_workers, get_parse_pool,
+                             get_scraper, get_session, parse_details)
+
+    scrapers = {scraper.source: scraper for scraper in map(get_scraper, SCRAPERS)}
+    cache = cache if cache is not None else get_detail_cache()
+    session = session or await get_session()
+    pool = get_parse_pool(default_parse_workers() if parse_workers is None else parse_workers)
+    limiter = HostLimiter(per_host_concurrency, request_delay)
+    in_flight = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+
+    async def enrich(job: Job) -> bool:
+        details = cache.get(job.url)
+        if details is not None:
+            job.details = details
+            metrics.ENRICHED_JOBS.inc(job.source, 'cached')
+            return True
+        scraper = scrapers.get(job.source)
+        if scraper is None or not job.url:
+            return False
+        try:
+            async with in_flight:
+                content = await scraper.fetch_detail(session, job.url, limiter, request_timeout)
+            if content is None:
+                metrics.ENRICHED_JOBS.inc(job.source, 'failed')
+                return False
+            fetched_at = datetime.now()
+            if pool is None:
+                details = scraper.extract_details(content, fetched_at)
+            else:
+                details = await loop.run_in_executor(pool, parse_details, scraper.key, content, fetched_at)
+        except Exception as e:
+            metrics.ENRICHED_JOBS.inc(job.source, 'failed')
+            logger.warning("Could not fetch details of %s job %s: %s", job.source, job.url, e)
+            return False
+        cache.put(job.url, details)
+        job.details = details
+        metrics.ENRICHED_JOBS.inc(job.source, 'fetched')
+        return True
+
+    results = await asyncio.gather(*[enrich(job) for job in jobs])
+    return sum(results)
+
+
+def enrich_jobs(jobs: List[Job], **kwargs) -> int:
+    """Synchronous wrapper around enrich_jobs_async"""
+    if not jobs:
+        return 0
+    from job_scraper import run_sync
+    return run_sync(enrich_jobs_async(jobs, **kwargs))
+
+
+def passes_detail_filters(job: Job, max_experience_years: float = None, locations: List[str] = None,
+                          max_age_days: float = None, now: datetime = None) -> bool:
+    """Whether a job's details fit the filters; facts that are unknown never exclude a job
+
+    - max_experience_years: drop jobs asking for more years than this at minimum
+    - locations: keep only jobs whose location contains one of these (or is Remote)
+    - max_age_days: drop jobs posted longer ago than this
+    """
+    details = job.details
+    if details is None:
+        return True
+    if max_experience_years is not None and details.experience_min is not None \
+            and details.experience_min > max_experience_years:
+        return False
+    if locations and details.location:
+        location = details.location.lower()
+        if 'remote' not in location and not any(place.lower() in location for place in locations):
+            return False
+    if max_age_days is not None and details.posted_at is not None:
+        if details.posted_at < (now or datetime.now()) - timedelta(days=max_age_days):
+            return False
+    return True
@@ -0,0 +1,197 @@
+"""
+Health and readiness endpoints with live pipeline state
+
+The pipeline records what it is doing into `state` as it runs (cycle
+start/end and stage timings, per-source successes and errors, queue depth,
+database stats). The HTTP server only reads that in-memory state, so a
+probe never touches the database or the network:
+
+- /health  200 while the main loop is alive (it has ticked recently)
+- /ready   200 once a cycle has completed and the last one succeeded
+- /status  everything above as JSON
+- /metrics Prometheus metrics, when they are enabled
+"""
+
+import json
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat(timespec='seconds') if timestamp else None
+
+
+class PipelineState:
+    """Thread-safe snapshot of what the pipeline did last"""
+
+    def __init__(self, stale_after: float = 900):
+        self.stale_after = stale_after
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._heartbeat = self.started_at
+        self._cycle: Dict = {}
+        self._last_cycle: Dict = {}
+        self._sources: Dict[str, Dict] = {}
+        self._queue: Dict = {}
+        self._stats: Dict = {}
+
+    def heartbeat(self):
+        """Called from the main loop; /health fails when it stops"""
+        self._heartbeat = time.time()
+
+    def cycle_started(self, cycle_id: str = None):
+        with self._lock:
+            self._heartbeat = time.time()
+            self._cycle = {'cycle_id': cycle_id, 'started_at': self._heartbeat, 'stages': {}}
+
+    def stage_finished(self, stage: str, seconds: float):
+        with self._lock:
+            if self._cycle:
+                self._cycle['stages'][stage] = round(seconds, 3)
+
+    def cycle_finished(self, ok: bool, new_jobs: int = None, error: str = None):
+        with self._lock:
+            now = time.time()
+            self._heartbeat = now
+            cycle = self._cycle or {'started_at': now, 'stages': {}}
+            cycle.update(finished_at=now, seconds=round(now - cycle['started_at'], 3),
+                         result='ok' if ok else 'error', new_jobs=new_jobs, error=error)
+            self._last_cycle = cycle
+            self._cycle = {}
+
+    def source_succeeded(self, source: str, jobs: int = 0):
+        with self._lock:
+            entry = self._sources.setdefault(source, {})
+            entry['last_success'] = time.time()
+            entry['last_jobs'] = jobs
+
+    def source_failed(self, source: str, error: str):
+        with self._lock:
+            entry = self._sources.setdefault(source, {})
+            entry['last_error'] = time.time()
+            entry['last_error_message'] = error[:300]
+            entry['errors'] = entry.get('errors', 0) + 1
+
+    def source_circuit(self, source: str, circuit: str, failures: int, retry_in: float = None):
+        with self._lock:
+            entry = self._sources.setdefault(source, {})
+            entry['circuit'] = circuit
+            entry['consecutive_failures'] = failures
+            entry['next_probe'] = time.time() + retry_in if retry_in is not None else None
+
+    def set_queue(self, **depths):
+        with self._lock:
+            self._queue.update(depths)
+
+    def set_stats(self, stats: Dict):
+        with self._lock:
+            self._stats = dict(stats)
+
+    def alive(self) -> bool:
+        return time.time() - self._heartbeat < self.stale_after
+
+    def ready(self) -> bool:
+        return self._last_cycle.get('result') == 'ok'
+
+    def status(self) -> Dict:
+        with self._lock:
+            last = dict(self._last_cycle)
+            current = dict(self._cycle)
+            sources = {name: dict(entry) for name, entry in self._sources.items()}
+            queue = dict(self._queue)
+            stats = dict(self._stats)
+        for cycle in (last, current):
+            for key in ('started_at', 'finished_at'):
+                if key in cycle:
+                    cycle[key] = _iso(cycle[key])
+        for entry in sources.values():
+            for key in ('last_success', 'last_error', 'next_probe'):
+                if key in entry:
+                    entry[key] = _iso(entry[key])
+        return {
+            'alive': self.alive(),
+            'ready': self.ready(),
+            'started_at': _iso(self.started_at),
+            'uptime_seconds': round(time.time() - self.started_at),
+            'last_heartbeat': _iso(self._heartbeat),
+            'current_cycle': current or None,
+            'last_cycle': last or None,
+            'sources': sources,
+            'queue': queue,
+            'database': stats,
+        }
+
+
+state = PipelineState()
+
+
+def health_handler():
+    """Request handler class for the health endpoints (http.server is only imported when serving)"""
+    from http.server import BaseHTTPRequestHandler
+
+    class HealthHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            path = self.path.split('?')[0]
+            if path == '/health':
+                alive = state.alive()
+                self.reply(200 if alive else 503, {'status': 'ok' if alive else 'stalled'})
+            elif path == '/ready':
+                ready = state.ready()
+                self.reply(200 if ready else 503, {'status': 'ready' if ready else 'not ready'})
+            elif path in ('/status', '/'):
+                self.reply(200, state.status())
+            elif path == '/metrics' and metrics.is_enabled():
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self.send_error(404)
+
+        def reply(self, code: int, payload: Dict):
+            body = json.dumps(payload).encode()
+            self.send_response(code)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Cache-Control', 'no-store')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return HealthHandler
+
+
+_server = None
+
+
+def start_health_server(port: int, host: str = '0.0.0.0', stale_after: float = None):
+    """Serve /health, /ready and /status on http://host:port from a daemon thread"""
+    global _server
+    if stale_after:
+        state.stale_after = stale_after
+    if _server is None:
+        from http.server import ThreadingHTTPServer
+        _server = ThreadingHTTPServer((host, port), health_handler())
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name='health-server', daemon=True).start()
+        logger.info(f"Health endpoints at http://{host}:{_server.server_address[1]}/health, /ready, /status")
+    return _server
+
+
+def stop_health_server():
+    global _server
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
+        _server = None
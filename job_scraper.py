@@ -1,262 +1,979 @@
 """
 Job Scraper Module
 Scrapes new grad and internship listings from Indian job sites
+
+Scrapers are asyncio-native: every (source, keyword) request runs on one
+event loop with a shared aiohttp session, per-host concurrency limits and
+asyncio.sleep-based politeness. HTML parsing is shipped to a pool of warm
+worker processes so it uses every core. The synchronous scrape() and
+scrape_all_jobs() API is a thin wrapper that drives that loop.
+
+aiohttp and BeautifulSoup are imported on first use: parse workers never
+load aiohttp, and the main process only loads the parser when it parses
+inline.
 """
 
-import requests
-from bs4 import BeautifulSoup
-import time
+from __future__ import annotations
+
+import asyncio
+import atexit
+import contextvars
+import json
+import multiprocessing
+import os
 import re
-from datetime import datetime
-from typing import List, Dict
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Callable, FrozenSet, List, Dict, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
 import logging
 
-logging.basicConfig(level=logging.INFO)
+import metrics
+from archive import PageArchive, read_page
+from circuit import BreakerRegistry, CircuitBreaker, CircuitOpenError
+from health import state as health_state
+from log_config import log_context
+from models import Job, JobDetails
+
+if TYPE_CHECKING:
+    import aiohttp
+    from bs4 import BeautifulSoup, Tag
+
 logger = logging.getLogger(__name__)
 
+# Card ids (job URLs) remembered per (source key, keyword) listing page
+FINGERPRINT_SIZE = 50
+# Consecutive previously seen cards after which the rest of a listing page is skipped; one seen
+# card alone (a promoted or re-posted listing above newer ones) does not stop extraction
+SEEN_RUN = 3
+PageKey = Tuple[str, str]
+
+
+class ExtractResult(NamedTuple):
+    """Cards extracted from one listing page"""
+    rows: List[Tuple[str, str, str]]  # (title, company, url)
+    dropped: int  # cards that could not be parsed
+    card_ids: List[str]  # ids of the cards looked at, in page order
+    skipped: int = 0  # previously seen cards, and the cards below a run of them
+
+
+class SeenRun:
+    """Tracks runs of previously seen cards while one listing page is extracted"""
+
+    def __init__(self, seen: Optional[FrozenSet[str]]):
+        self.seen = seen
+        self.run = 0
+        self.skipped = 0
+
+    def skip(self, card_id: str) -> bool:
+        """Whether the card was on the page at its last fetch (and so is not extracted again)"""
+        if self.seen and card_id in self.seen:
+            self.run += 1
+            self.skipped += 1
+            return True
+        self.run = 0
+        return False
+
+    def remaining(self, cards: List, index: int) -> Optional[int]:
+        """Cards skipped in all if extraction stops after cards[index]; None until SEEN_RUN were seen in a row"""
+        if self.run < SEEN_RUN:
+            return None
+        return self.skipped + len(cards) - index - 1
+
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+
+class HostLimiter:
+    """Per-host concurrency limit and politeness delay for async fetches"""
+
+    def __init__(self, per_host: int = 1, delay: float = 2):
+        self.per_host = per_host
+        self.delay = delay
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str, admit: Callable[[], bool] = None):
+        """Hold one of the host's request slots; the slot is kept for `delay` seconds after the request
+
+        Yields whether to make the request: admit, if given, is asked once
+        the slot is held, and a refused request frees the slot at once.
+        """
+        host = urlsplit(url).netloc
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self.per_host)
+        async with semaphore:
+            if admit is not None and not admit():
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                await asyncio.sleep(self.delay)  # Be respectful with requests
+
 
 class JobScraper:
-    """Base class for job scrapers"""
-    
+    """Base class for job scrapers
+
+    Subclasses describe a source (base_url, build_params, extract); fetching,
+    concurrency and politeness are handled here.
+    """
+
+    source = 'Unknown'
+    key = ''
+    base_url = ''
+    default_keywords: Optional[List[str]] = None
+    uses_keywords = True
+    # The site's search understands ("a" OR "b") queries
+    supports_or_queries = False
+    # Cards read from one listing page
+    page_size = 20
+    # Query parameter holding the result offset, and results per page (None: first page only)
+    page_param: Optional[str] = None
+    page_step = 0
+    # Element and class of a listing card; only these parts of a listing page are parsed
+    card_tag = ''
+    card_class = ''
+
     def __init__(self):
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-    
-    def scrape(self, keywords: List[str] = None) -> List[Dict]:
-        """Override in subclasses"""
+        self.headers = dict(DEFAULT_HEADERS)
+        # Page fingerprints and new card ids recorded by this scraper's fetches
+        self.fingerprints: Dict[PageKey, List[str]] = {}
+        self.page_results: Dict[PageKey, List[str]] = {}
+
+    def reset(self):
+        """Forget the fingerprints and results recorded by the last cycle"""
+        self.fingerprints.clear()
+        self.page_results.clear()
+
+    @staticmethod
+    def combine_keywords(keywords: List[str]) -> str:
+        """One search query matching any of the keywords (for sources with supports_or_queries)"""
+        return '(' + ' OR '.join(f'"{keyword}"' for keyword in keywords) + ')'
+
+    def build_params(self, keyword: Optional[str]) -> Dict:
+        """Query parameters for one search. Override in subclasses"""
         raise NotImplementedError
 
+    def build_page_params(self, keyword: Optional[str], page: int = 0) -> Dict:
+        """Query parameters for one results page of a search"""
+        params = self.build_params(keyword)
+        if page and self.page_param:
+            params[self.page_param] = page * self.page_step
+        return params
+
+    @classmethod
+    def extract(cls, content: bytes, seen: FrozenSet[str] = None) -> ExtractResult:
+        """Extract (title, company, url) tuples from one listing page
+
+        Only the card elements are built into a tree, and the tree is
+        decomposed as soon as the cards have been read, so its memory is
+        released at once rather than whenever the garbage collector breaks
+        its reference cycles. Must be a pure function of its arguments so it
+        can run in a parse worker process.
+        """
+        soup = make_soup(content, (cls.card_tag, cls.card_class))
+        try:
+            return cls.extract_cards(soup.find_all(cls.card_tag, class_=cls.card_class)[:cls.page_size], seen)
+        finally:
+            soup.decompose()
+
+    @classmethod
+    def extract_cards(cls, cards: List[Tag], seen: FrozenSet[str] = None) -> ExtractResult:
+        """Extract (title, company, url) tuples from a page's cards. Override in subclasses
+
+        Listings are requested newest-first, so cards whose id (their job URL)
+        is in `seen`, the page's fingerprint from the last fetch, are
+        skipped, and after SEEN_RUN of them in a row nothing below is read.
+        """
+        raise NotImplementedError
+
+    @classmethod
+    def extract_details(cls, content: bytes, fetched_at: datetime = None) -> JobDetails:
+        """Experience, location and posting time from one job detail page
+
+        Reads the schema.org JobPosting data most job sites embed, falling
+        back to the page text. Override in subclasses to read site markup
+        first. Must be a pure function of its arguments (see extract).
+        """
+        soup = make_soup(content)
+        try:
+            return parse_job_posting(soup, fetched_at or datetime.now())
+        finally:
+            soup.decompose()
+
+    def to_jobs(self, rows: List[Tuple[str, str, str]], scraped_at: datetime) -> List[Job]:
+        """Turn extracted rows into Jobs sharing the page's fetch timestamp"""
+        source = self.source
+        return [Job(title, company, url, source, scraped_at) for title, company, url in rows]
+
+    def parse(self, content: bytes, scraped_at: datetime = None) -> List[Job]:
+        """Extract jobs from one listing page in this process"""
+        return self.to_jobs(self.extract(content).rows, scraped_at or datetime.now())
+
+    async def parse_async(self, content: bytes, scraped_at: datetime,
+                          pool: Optional[ProcessPoolExecutor] = None,
+                          seen: FrozenSet[str] = None) -> ExtractResult:
+        """Extract cards in the parse worker pool if one is given, otherwise inline"""
+        start = time.perf_counter()
+        if pool is None:
+            result = self.extract(content, seen)
+        else:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(pool, parse_listing, self.key, content, seen)
+        metrics.PARSE_SECONDS.observe(time.perf_counter() - start, self.source)
+        metrics.CARDS.inc(self.source, 'parsed', amount=len(result.rows))
+        metrics.CARDS.inc(self.source, 'dropped', amount=result.dropped)
+        metrics.CARDS.inc(self.source, 'skipped', amount=result.skipped)
+        return result
+
+    def queries(self, keywords: List[str] = None) -> List[Optional[str]]:
+        """Keywords to search for; sources that ignore keywords make a single request"""
+        if not self.uses_keywords:
+            return [None]
+        return keywords or self.default_keywords or []
+
+    async def fetch(self, session: aiohttp.ClientSession, params: Optional[Dict], limiter: HostLimiter,
+                    timeout: float = 10, keyword: Optional[str] = None,
+                    breaker: CircuitBreaker = None) -> Optional[bytes]:
+        """Fetch one listing page
+
+        Returns the raw body, or None on a non-200 response. Raises
+        CircuitOpenError, without fetching, if breaker does not allow the
+        request once it gets its turn.
+        """
+        url = self.base_url
+        async with limiter.slot(url, breaker.allow if breaker is not None else None) as admitted:
+            if not admitted:
+                raise CircuitOpenError(self.source)
+            start = time.perf_counter()
+            async with asyncio.timeout(timeout):
+                async with session.get(url, params=params, headers=self.headers) as response:
+                    metrics.FETCH_REQUESTS.inc(self.source, response.status)
+                    if response.status != 200:
+                        logger.warning("%s returned status %s", self.source, response.status)
+                        health_state.source_failed(self.source, f"HTTP {response.status}")
+                        return None
+                    content = await response.read()
+            metrics.FETCH_SECONDS.observe(time.perf_counter() - start, self.source, keyword or '')
+            metrics.FETCH_BYTES.inc(self.source, amount=len(content))
+            return content
+
+    async def fetch_detail(self, session: aiohttp.ClientSession, url: str, limiter: HostLimiter,
+                           timeout: float = 10) -> Optional[bytes]:
+        """Fetch one job's detail page; None on a non-200 response
+
+        Only the detail-page metrics record it: an expired job (404) says
+        nothing about the source's listing pages, so source health and the
+        listing metrics are left alone.
+        """
+        async with limiter.slot(url):
+            start = time.perf_counter()
+            try:
+                async with asyncio.timeout(timeout):
+                    async with session.get(url, headers=self.headers) as response:
+                        metrics.DETAIL_REQUESTS.inc(self.source, response.status)
+                        if response.status != 200:
+                            logger.debug("%s detail page %s returned status %s", self.source, url, response.status)
+                            return None
+                        content = await response.read()
+            except TimeoutError:
+                metrics.DETAIL_REQUESTS.inc(self.source, 'timeout')
+                raise
+            metrics.DETAIL_SECONDS.observe(time.perf_counter() - start, self.source)
+            return content
+
+    async def scrape_query(self, session: aiohttp.ClientSession, keyword: Optional[str],
+                           limiter: HostLimiter, timeout: float = 10,
+                           pool: Optional[ProcessPoolExecutor] = None,
+                           fingerprints: Dict[PageKey, List[str]] = None,
+                           breaker: CircuitBreaker = None, archive: PageArchive = None) -> List[Job]:
+        """Fetch and parse the results for a single keyword
+
+        With fingerprints, cards seen on the last fetch are skipped, and so
+        is the rest of the page after a run of them (see SEEN_RUN); the
+        page's new fingerprint is recorded in self.fingerprints. With a
+        breaker, the outcome is recorded in it (a page without any job card
+        counts as a failure) and the request is skipped while it is open.
+        With an archive, the raw page is stored for replay.
+        """
+        try:
+            content = await self.fetch(session, self.build_params(keyword), limiter, timeout, keyword,
+                                       breaker=breaker)
+            if content is None:
+                if breaker is not None:
+                    breaker.record_failure('non-200 response')
+                return []
+            page_key = (self.key, keyword or '')
+            previous = fingerprints.get(page_key, []) if fingerprints is not None else []
+            scraped_at = datetime.now()
+            if archive is not None:
+                await archive.store_async(self.key, keyword, 0, scraped_at, content)
+            result = await self.parse_async(content, scraped_at, pool, frozenset(previous) or None)
+            if fingerprints is not None:
+                self.fingerprints[page_key] = (result.card_ids + previous)[:FINGERPRINT_SIZE]
+            self.page_results[page_key] = result.card_ids
+            if result.rows or result.dropped or result.skipped:
+                health_state.source_succeeded(self.source, len(result.rows))
+                if breaker is not None:
+                    breaker.record_success()
+            else:
+                health_state.source_failed(self.source, f"no job cards ({keyword})")
+                if breaker is not None:
+                    breaker.record_failure('no job cards')
+            return self.to_jobs(result.rows, scraped_at)
+        except CircuitOpenError:
+            logger.debug("Skipped %s for keyword '%s', circuit open", self.source, keyword)
+            return []
+        except asyncio.CancelledError:
+            # Cycle timeout or shutdown: a probe must not leave the breaker half-open
+            if breaker is not None:
+                breaker.abandon()
+            raise
+        except TimeoutError:
+            metrics.FETCH_REQUESTS.inc(self.source, 'timeout')
+            logger.error("Timed out scraping %s for keyword '%s'", self.source, keyword)
+            health_state.source_failed(self.source, f"timeout ({keyword})")
+            if breaker is not None:
+                breaker.record_failure('timeout')
+            return []
+        except Exception as e:
+            logger.error("Error scraping %s for keyword '%s': %s", self.source, keyword, e)
+            health_state.source_failed(self.source, f"{type(e).__name__}: {e}")
+            if breaker is not None:
+                breaker.record_failure(f"{type(e).__name__}: {e}")
+            return []
+
+    async def scrape_async(self, session: aiohttp.ClientSession, keywords: List[str] = None,
+                           limiter: HostLimiter = None, timeout: float = 10,
+                           pool: Optional[ProcessPoolExecutor] = None,
+                           fingerprints: Dict[PageKey, List[str]] = None,
+                           breaker: CircuitBreaker = None, archive: PageArchive = None) -> List[Job]:
+        """Scrape all keywords concurrently (bounded by the limiter)"""
+        limiter = limiter or HostLimiter()
+        with log_context(source=self.source):
+            results = await asyncio.gather(*[
+                self.scrape_query(session, keyword, limiter, timeout, pool, fingerprints, breaker, archive)
+                for keyword in self.queries(keywords)
+            ])
+        return [job for jobs in results for job in jobs]
+
+    def scrape(self, keywords: List[str] = None) -> List[Job]:
+        """Synchronous wrapper around scrape_async"""
+        async def _scrape():
+            return await self.scrape_async(await get_session(), keywords)
+        return run_sync(_scrape())
+
 
 class LinkedInScraper(JobScraper):
     """Scraper for LinkedIn job listings"""
-    
-    def __init__(self):
-        super().__init__()
-        self.base_url = "https://www.linkedin.com/jobs/search"
-    
-    def scrape(self, keywords: List[str] = None) -> List[Dict]:
-        """Scrape LinkedIn jobs"""
+
+    source = 'LinkedIn'
+    key = 'linkedin'
+    base_url = "https://www.linkedin.com/jobs/search"
+    default_keywords = ["new grad", "fresher", "internship", "entry level"]
+    supports_or_queries = True
+    page_param = 'start'
+    page_step = 25
+    card_tag = 'div'
+    card_class = 'base-card'
+
+    def build_params(self, keyword: Optional[str]) -> Dict:
+        return {
+            'keywords': f"{keyword} India",
+            'location': 'India',
+            'f_TPR': 'r86400',  # Past 24 hours
+            'f_E': '2,1',  # Entry level and internship
+            'sortBy': 'DD',  # Most recent first, which page fingerprints rely on
+            'start': 0
+        }
+
+    @classmethod
+    def extract_cards(cls, job_cards: List[Tag], seen: FrozenSet[str] = None) -> ExtractResult:
+        """Extract (title, company, url) from LinkedIn job cards"""
         jobs = []
-        keywords = keywords or ["new grad", "fresher", "internship", "entry level"]
-        
-        for keyword in keywords:
+        card_ids = []
+        dropped = 0
+        seen_run = SeenRun(seen)
+
+        for index, card in enumerate(job_cards):
             try:
-                params = {
-                    'keywords': f"{keyword} India",
-                    'location': 'India',
-                    'f_TPR': 'r86400',  # Past 24 hours
-                    'f_E': '2,1',  # Entry level and internship
-                    'start': 0
-                }
-                
-                response = requests.get(self.base_url, params=params, headers=self.headers, timeout=10)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    job_cards = soup.find_all('div', class_='base-card')
-                    
-                    for card in job_cards[:20]:  # Limit to first 20 results
-                        try:
-                            title_elem = card.find('h3', class_='base-search-card__title')
-                            company_elem = card.find('h4', class_='base-search-card__subtitle')
-                            link_elem = card.find('a', class_='base-card__full-link')
-                            
-                            if title_elem and link_elem:
-                                job = {
-                                    'title': title_elem.get_text(strip=True),
-                                    'company': company_elem.get_text(strip=True) if company_elem else 'Unknown',
-                                    'url': link_elem.get('href', '').split('?')[0],
-                                    'source': 'LinkedIn',
-                                    'scraped_at': datetime.now().isoformat()
-                                }
-                                jobs.append(job)
-                        except Exception as e:
-                            logger.error(f"Error parsing LinkedIn job card: {e}")
-                            continue
-                
-                time.sleep(2)  # Be respectful with requests
+                link_elem = card.find('a', class_='base-card__full-link')
+                url = link_elem.get('href', '').split('?')[0] if link_elem else ''
+                if seen_run.skip(url):
+                    skipped = seen_run.remaining(job_cards, index)
+                    if skipped is not None:
+                        return ExtractResult(jobs, dropped, card_ids, skipped)
+                    continue
+                if url:
+                    card_ids.append(url)
+
+                title_elem = card.find('h3', class_='base-search-card__title')
+                company_elem = card.find('h4', class_='base-search-card__subtitle')
+
+                if title_elem and link_elem:
+                    jobs.append((
+                        title_elem.get_text(strip=True),
+                        company_elem.get_text(strip=True) if company_elem else 'Unknown',
+                        url
+                    ))
+                else:
+                    dropped += 1
             except Exception as e:
-                logger.error(f"Error scraping LinkedIn for keyword '{keyword}': {e}")
+                logger.error("Error parsing LinkedIn job card: %s", e)
+                dropped += 1
                 continue
-        
-        return jobs
+
+        return ExtractResult(jobs, dropped, card_ids, seen_run.skipped)
+
+    @classmethod
+    def extract_details(cls, content: bytes, fetched_at: datetime = None) -> JobDetails:
+        """LinkedIn's guest job page shows location and "2 days ago" in its top card"""
+        fetched_at = fetched_at or datetime.now()
+        soup = make_soup(content)
+        try:
+            details = parse_job_posting(soup, fetched_at)
+            location_elem = soup.find('span', class_='topcard__flavor--bullet')
+            posted_elem = soup.find('span', class_='posted-time-ago__text')
+            return details._replace(
+                location=details.location or (location_elem.get_text(strip=True) if location_elem else None),
+                posted_at=details.posted_at or (parse_posted(posted_elem.get_text(strip=True), fetched_at)
+                                                if posted_elem else None),
+            )
+        finally:
+            soup.decompose()
 
 
 class InternshalaScraper(JobScraper):
     """Scraper for Internshala internship listings"""
-    
-    def __init__(self):
-        super().__init__()
-        self.base_url = "https://internshala.com/internships"
-    
-    def scrape(self, keywords: List[str] = None) -> List[Dict]:
-        """Scrape Internshala internships"""
+
+    source = 'Internshala'
+    key = 'internshala'
+    base_url = "https://internshala.com/internships"
+    uses_keywords = False
+    page_size = 30
+    card_tag = 'div'
+    card_class = 'internship_meta'
+
+    def build_params(self, keyword: Optional[str]) -> Dict:
+        return {
+            'location': 'india',
+            'preference': 'all'
+        }
+
+    @classmethod
+    def extract_cards(cls, internship_cards: List[Tag], seen: FrozenSet[str] = None) -> ExtractResult:
+        """Extract (title, company, url) from Internshala internship cards"""
         jobs = []
-        
-        try:
-            params = {
-                'location': 'india',
-                'preference': 'all'
-            }
-            
-            response = requests.get(self.base_url, params=params, headers=self.headers, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                internship_cards = soup.find_all('div', class_='internship_meta')
-                
-                for card in internship_cards[:30]:  # Limit results
-                    try:
-                        title_elem = card.find('h3', class_='heading_4_5')
-                        company_elem = card.find('a', class_='link_display_like_text')
-                        link_elem = card.find('a', class_='view_detail_button')
-                        
-                        if title_elem:
-                            job = {
-                                'title': title_elem.get_text(strip=True),
-                                'company': company_elem.get_text(strip=True) if company_elem else 'Unknown',
-                                'url': f"https://internshala.com{link_elem.get('href', '')}" if link_elem else '',
-                                'source': 'Internshala',
-                                'scraped_at': datetime.now().isoformat()
-                            }
-                            jobs.append(job)
-                    except Exception as e:
-                        logger.error(f"Error parsing Internshala card: {e}")
-                        continue
-            
-            time.sleep(2)
-        except Exception as e:
-            logger.error(f"Error scraping Internshala: {e}")
-        
-        return jobs
+        card_ids = []
+        dropped = 0
+        seen_run = SeenRun(seen)
+
+        for index, card in enumerate(internship_cards):
+            try:
+                link_elem = card.find('a', class_='view_detail_button')
+                url = f"https://internshala.com{link_elem.get('href', '')}" if link_elem else ''
+                if seen_run.skip(url):
+                    skipped = seen_run.remaining(internship_cards, index)
+                    if skipped is not None:
+                        return ExtractResult(jobs, dropped, card_ids, skipped)
+                    continue
+                if url:
+                    card_ids.append(url)
+
+                title_elem = card.find('h3', class_='heading_4_5')
+                company_elem = card.find('a', class_='link_display_like_text')
+
+                if title_elem:
+                    jobs.append((
+                        title_elem.get_text(strip=True),
+                        company_elem.get_text(strip=True) if company_elem else 'Unknown',
+                        url
+                    ))
+                else:
+                    dropped += 1
+            except Exception as e:
+                logger.error("Error parsing Internshala card: %s", e)
+                dropped += 1
+                continue
+
+        return ExtractResult(jobs, dropped, card_ids, seen_run.skipped)
 
 
 class NaukriScraper(JobScraper):
     """Scraper for Naukri.com job listings"""
-    
-    def __init__(self):
-        super().__init__()
-        self.base_url = "https://www.naukri.com/jobs-in-india"
-    
-    def scrape(self, keywords: List[str] = None) -> List[Dict]:
-        """Scrape Naukri jobs"""
+
+    source = 'Naukri'
+    key = 'naukri'
+    base_url = "https://www.naukri.com/jobs-in-india"
+    default_keywords = ["fresher", "entry level", "trainee"]
+    card_tag = 'article'
+    card_class = 'jobTuple'
+
+    def build_params(self, keyword: Optional[str]) -> Dict:
+        return {
+            'k': keyword,
+            'l': 'india',
+            'experience': '0'  # Fresher jobs
+        }
+
+    @classmethod
+    def extract_cards(cls, job_cards: List[Tag], seen: FrozenSet[str] = None) -> ExtractResult:
+        """Extract (title, company, url) from Naukri job cards"""
         jobs = []
-        keywords = keywords or ["fresher", "entry level", "trainee"]
-        
-        for keyword in keywords:
+        card_ids = []
+        dropped = 0
+        seen_run = SeenRun(seen)
+
+        for index, card in enumerate(job_cards):
             try:
-                params = {
-                    'k': keyword,
-                    'l': 'india',
-                    'experience': '0'  # Fresher jobs
-                }
-                
-                response = requests.get(self.base_url, params=params, headers=self.headers, timeout=10)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    job_cards = soup.find_all('article', class_='jobTuple')
-                    
-                    for card in job_cards[:20]:
-                        try:
-                            title_elem = card.find('a', class_='title')
-                            company_elem = card.find('a', class_='subTitle')
-                            
-                            if title_elem:
-                                job = {
-                                    'title': title_elem.get_text(strip=True),
-                                    'company': company_elem.get_text(strip=True) if company_elem else 'Unknown',
-                                    'url': title_elem.get('href', ''),
-                                    'source': 'Naukri',
-                                    'scraped_at': datetime.now().isoformat()
-                                }
-                                jobs.append(job)
-                        except Exception as e:
-                            logger.error(f"Error parsing Naukri job card: {e}")
-                            continue
-                
-                time.sleep(2)
+                title_elem = card.find('a', class_='title')
+                url = title_elem.get('href', '') if title_elem else ''
+                if seen_run.skip(url):
+                    skipped = seen_run.remaining(job_cards, index)
+                    if skipped is not None:
+                        return ExtractResult(jobs, dropped, card_ids, skipped)
+                    continue
+                if url:
+                    card_ids.append(url)
+
+                company_elem = card.find('a', class_='subTitle')
+
+                if title_elem:
+                    jobs.append((
+                        title_elem.get_text(strip=True),
+                        company_elem.get_text(strip=True) if company_elem else 'Unknown',
+                        url
+                    ))
+                else:
+                    dropped += 1
             except Exception as e:
-                logger.error(f"Error scraping Naukri for keyword '{keyword}': {e}")
+                logger.error("Error parsing Naukri job card: %s", e)
+                dropped += 1
                 continue
-        
-        return jobs
+
+        return ExtractResult(jobs, dropped, card_ids, seen_run.skipped)
 
 
 class IndeedScraper(JobScraper):
     """Scraper for Indeed job listings"""
-    
-    def __init__(self):
-        super().__init__()
-        self.base_url = "https://in.indeed.com/jobs"
-    
-    def scrape(self, keywords: List[str] = None) -> List[Dict]:
-        """Scrape Indeed jobs"""
+
+    source = 'Indeed'
+    key = 'indeed'
+    base_url = "https://in.indeed.com/jobs"
+    default_keywords = ["fresher", "entry level", "intern", "new grad"]
+    supports_or_queries = True
+    page_param = 'start'
+    page_step = 10
+    card_tag = 'div'
+    card_class = 'job_seen_beacon'
+
+    def build_params(self, keyword: Optional[str]) -> Dict:
+        return {
+            'q': f"{keyword} India",
+            'l': 'India',
+            'fromage': '1',  # Last 24 hours
+            'explvl': 'entry_level',
+            'sort': 'date',  # Most recent first, which page fingerprints rely on
+        }
+
+    @classmethod
+    def extract_cards(cls, job_cards: List[Tag], seen: FrozenSet[str] = None) -> ExtractResult:
+        """Extract (title, company, url) from Indeed job cards"""
         jobs = []
-        keywords = keywords or ["fresher", "entry level", "intern", "new grad"]
-        
-        for keyword in keywords:
+        card_ids = []
+        dropped = 0
+        seen_run = SeenRun(seen)
+
+        for index, card in enumerate(job_cards):
             try:
-                params = {
-                    'q': f"{keyword} India",
-                    'l': 'India',
-                    'fromage': '1',  # Last 24 hours
-                    'explvl': 'entry_level'
-                }
-                
-                response = requests.get(self.base_url, params=params, headers=self.headers, timeout=10)
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    job_cards = soup.find_all('div', class_='job_seen_beacon')
-                    
-                    for card in job_cards[:20]:
-                        try:
-                            title_elem = card.find('h2', class_='jobTitle')
-                            company_elem = card.find('span', class_='companyName')
-                            link_elem = card.find('a', class_='jcs-JobTitle')
-                            
-                            if title_elem and link_elem:
-                                job = {
-                                    'title': title_elem.get_text(strip=True),
-                                    'company': company_elem.get_text(strip=True) if company_elem else 'Unknown',
-                                    'url': f"https://in.indeed.com{link_elem.get('href', '')}",
-                                    'source': 'Indeed',
-                                    'scraped_at': datetime.now().isoformat()
-                                }
-                                jobs.append(job)
-                        except Exception as e:
-                            logger.error(f"Error parsing Indeed job card: {e}")
-                            continue
-                
-                time.sleep(2)
+                link_elem = card.find('a', class_='jcs-JobTitle')
+                url = f"https://in.indeed.com{link_elem.get('href', '')}" if link_elem else ''
+                if seen_run.skip(url):
+                    skipped = seen_run.remaining(job_cards, index)
+                    if skipped is not None:
+                        return ExtractResult(jobs, dropped, card_ids, skipped)
+                    continue
+                if url:
+                    card_ids.append(url)
+
+                title_elem = card.find('h2', class_='jobTitle')
+                company_elem = card.find('span', class_='companyName')
+
+                if title_elem and link_elem:
+                    jobs.append((
+                        title_elem.get_text(strip=True),
+                        company_elem.get_text(strip=True) if company_elem else 'Unknown',
+                        url
+                    ))
+                else:
+                    dropped += 1
             except Exception as e:
-                logger.error(f"Error scraping Indeed for keyword '{keyword}': {e}")
+                logger.error("Error parsing Indeed job card: %s", e)
+                dropped += 1
                 continue
-        
-        return jobs
 
+        return ExtractResult(jobs, dropped, card_ids, seen_run.skipped)
 
-def scrape_all_jobs(keywords: List[str] = None) -> List[Dict]:
-    """Scrape jobs from all sources"""
-    all_jobs = []
-    scrapers = [
-        LinkedInScraper(),
-        InternshalaScraper(),
-        NaukriScraper(),
-        IndeedScraper()
-    ]
-    
+
+# Registry of available scrapers, keyed like SCRAPING_CONFIG['scrapers']
+SCRAPERS = {
+    'linkedin': LinkedInScraper,
+    'internshala': InternshalaScraper,
+    'naukri': NaukriScraper,
+    'indeed': IndeedScraper,
+}
+
+
+_scrapers: Dict[str, JobScraper] = {}
+
+
+def get_scraper(name: str) -> JobScraper:
+    """The scraper for a source in SCRAPERS, created once and reused across cycles"""
+    scraper = _scrapers.get(name)
+    if scraper is None:
+        scraper = _scrapers[name] = SCRAPERS[name]()
+    return scraper
+
+
+def make_soup(content, parse_only: Tuple[str, str] = None) -> BeautifulSoup:
+    """Parse a page (imports BeautifulSoup on first use)
+
+    parse_only=(tag, class) builds only the matching elements and their contents.
+    """
+    from bs4 import BeautifulSoup, SoupStrainer
+    strainer = None
+    if parse_only:
+        tag, css_class = parse_only
+        # While parsing, the strainer sees the raw class attribute ("base-card job-card"), not a list
+        strainer = SoupStrainer(tag, class_=lambda value: value is not None and css_class in value.split())
+    return BeautifulSoup(content, 'html.parser', parse_only=strainer)
+
+
+def parse_listing(key: str, content: bytes, seen: FrozenSet[str] = None) -> ExtractResult:
+    """Parse-worker entry point: run a source's card extraction on raw page bytes"""
+    return SCRAPERS[key].extract(content, seen)
+
+
+def parse_archived(key: str, path: str) -> ExtractResult:
+    """Parse-worker entry point for replay: decompress an archived page and extract all its cards"""
+    return SCRAPERS[key].extract(read_page(path))
+
+
+def parse_details(key: str, content: bytes, fetched_at: datetime = None) -> JobDetails:
+    """Parse-worker entry point: run a source's detail extraction on a job page's bytes"""
+    return SCRAPERS[key].extract_details(content, fetched_at)
+
+
+# "2-4 years", "0 to 1 yrs", "3+ years", "minimum 2 years", near the word experience
+_YEARS = r'(\d+(?:\.\d+)?)\s*(?:(?:-|–|to)\s*(\d+(?:\.\d+)?)\s*)?\+?\s*(?:years?|yrs?)'
+_EXPERIENCE_PATTERNS = [
+    re.compile(r'experience\W{0,3}(?:\w+\W+){0,4}?' + _YEARS, re.IGNORECASE),
+    re.compile(_YEARS + r'\W+(?:\w+\W+){0,2}?(?:experience|exp)\b', re.IGNORECASE),
+]
+_FRESHER = re.compile(r'\bfreshers?\b', re.IGNORECASE)
+_POSTED_AGO = re.compile(r'\b(\d+|an?)\+?\s*(minute|min|hour|hr|day|week|month)s?\s+ago\b', re.IGNORECASE)
+_AGO_UNITS = {
+    'minute': timedelta(minutes=1), 'min': timedelta(minutes=1),
+    'hour': timedelta(hours=1), 'hr': timedelta(hours=1),
+    'day': timedelta(days=1), 'week': timedelta(weeks=1), 'month': timedelta(days=30),
+}
+# Only the start of a detail page is searched; the description comes first
+_DETAIL_TEXT_LIMIT = 20000
+
+
+def parse_experience(text: str) -> Tuple[Optional[float], Optional[float]]:
+    """(min, max) years of experience asked for in text; max is None unless a range is given"""
+    for pattern in _EXPERIENCE_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            low, high = match.groups()
+            return float(low), float(high) if high else None
+    if _FRESHER.search(text):
+        return 0.0, 0.0
+    return None, None
+
+
+def parse_posted(text: str, now: datetime) -> Optional[datetime]:
+    """Posting time from relative text ('3 days ago', 'Just now', 'Yesterday')"""
+    lowered = text.lower()
+    if 'just now' in lowered or 'today' in lowered:
+        return now
+    if 'yesterday' in lowered:
+        return now - timedelta(days=1)
+    match = _POSTED_AGO.search(text)
+    if match is None:
+        return None
+    count, unit = match.groups()
+    count = 1 if count.lower() in ('a', 'an') else int(count)
+    return now - count * _AGO_UNITS[unit.lower()]
+
+
+def _job_posting_data(soup: BeautifulSoup) -> Optional[Dict]:
+    """The schema.org JobPosting object from a page's JSON-LD scripts, if any"""
+    for script in soup.find_all('script', type='application/ld+json'):
+        try:
+            data = json.loads(script.string or '')
+        except ValueError:
+            continue
+        for item in (data if isinstance(data, list) else data.get('@graph', [data])):
+            if isinstance(item, dict) and item.get('@type') == 'JobPosting':
+                return item
+    return None
+
+
+def _posting_location(posting: Dict) -> Optional[str]:
+    if posting.get('jobLocationType') == 'TELECOMMUTE':
+        return 'Remote'
+    places = posting.get('jobLocation') or []
+    names = []
+    for place in (places if isinstance(places, list) else [places]):
+        address = place.get('address', {}) if isinstance(place, dict) else {}
+        if isinstance(address, str):
+            names.append(address)
+            continue
+        name = ', '.join(part for part in (address.get('addressLocality'), address.get('addressRegion')) if part)
+        if name and name not in names:
+            names.append(name)
+    return '; '.join(names) or None
+
+
+def parse_job_posting(soup: BeautifulSoup, fetched_at: datetime) -> JobDetails:
+    """JobDetails from a detail page's JobPosting data, with the page text filling the gaps"""
+    experience_min = experience_max = location = posted_at = None
+    posting = _job_posting_data(soup)
+    if posting:
+        location = _posting_location(posting)
+        if posting.get('datePosted'):
+            try:
+                posted_at = datetime.fromisoformat(str(posting['datePosted']).replace('Z', '+00:00'))
+                if posted_at.tzinfo is not None:
+                    posted_at = posted_at.astimezone().replace(tzinfo=None)
+            except ValueError:
+                pass
+        requirement = posting.get('experienceRequirements')
+        if isinstance(requirement, dict) and requirement.get('monthsOfExperience') is not None:
+            experience_min = float(requirement['monthsOfExperience']) / 12
+        elif isinstance(requirement, str):
+            experience_min, experience_max = parse_experience(requirement)
+
+    text = soup.get_text(' ', strip=True)[:_DETAIL_TEXT_LIMIT]
+    if experience_min is None:
+        experience_min, experience_max = parse_experience(text)
+    if posted_at is None:
+        posted_at = parse_posted(text, fetched_at)
+    return JobDetails(experience_min, experience_max, location, posted_at)
+
+
+def _warm_up() -> int:
+    """Import the parser in a fresh worker so the first real page doesn't pay for it"""
+    make_soup('<html></html>')
+    return os.getpid()
+
+
+def default_parse_workers() -> int:
+    """Parse workers to use when not configured: one per core, up to 4 (0 on single-core hosts)"""
+    cpus = os.cpu_count() or 1
+    return 0 if cpus < 2 else min(cpus, 4)
+
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+_parse_pool_workers = 0
+
+
+def get_parse_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    """Return the shared parse pool with the given number of workers (None for inline parsing)
+
+    Workers are started once and kept warm across cycles; the pool is only
+    rebuilt if the worker count changes.
+    """
+    global _parse_pool, _parse_pool_workers
+    if workers <= 0:
+        return None
+    if _parse_pool is not None and _parse_pool_workers == workers:
+        return _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=True)
+    _parse_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    _parse_pool_workers = workers
+    pids = {f.result() for f in [_parse_pool.submit(_warm_up) for _ in range(workers)]}
+    logger.info(f"Started {len(pids)} parse worker process(es)")
+    return _parse_pool
+
+
+# Shared event loop and HTTP session, kept alive across cycles so
+# connections stay warm between scheduled runs
+_runner: Optional[asyncio.Runner] = None
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def run_sync(coro):
+    """Run a coroutine on the module's persistent event loop
+
+    The coroutine runs in the caller's context, so log_context fields
+    (cycle id) carry over into the scraping tasks.
+    """
+    global _runner
+    if _runner is None:
+        _runner = asyncio.Runner()
+    return _runner.run(coro, context=contextvars.copy_context())
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session, creating it on first use"""
+    global _session
+    if _session is None or _session.closed:
+        import aiohttp
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
+        )
+    return _session
+
+
+def close():
+    """Close the shared session, event loop and parse pool"""
+    global _runner, _session, _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+    if _runner is None:
+        return
+    if _session is not None and not _session.closed:
+        _runner.run(_session.close())
+    _session = None
+    _runner.close()
+    _runner = None
+
+
+atexit.register(close)
+
+
+async def scrape_all_jobs_async(keywords: List[str] = None, sources: List[str] = None,
+                                per_host_concurrency: int = 2, request_delay: float = 2,
+                                request_timeout: float = 10, cycle_timeout: float = None,
+                                parse_workers: int = None,
+                                session: aiohttp.ClientSession = None,
+                                fingerprints: Dict[PageKey, List[str]] = None,
+                                queries: Dict[str, List[str]] = None,
+                                page_results: Dict[PageKey, List[str]] = None,
+                                breakers: BreakerRegistry = None,
+                                archive: PageArchive = None) -> List[Job]:
+    """Scrape jobs from all sources concurrently
+
+    Sources run in parallel; requests to the same host are limited to
+    per_host_concurrency at a time. Pages are parsed in parse_workers
+    processes (0 parses inline). Anything still running after
+    cycle_timeout seconds is cancelled and its results dropped.
+
+    fingerprints maps (source key, keyword) to the card ids seen on that
+    page last time (see JobDatabase.get_fingerprints); only cards above the
+    first seen one are returned, and the dict is updated in place for the
+    sources that completed.
+
+    queries maps a source key to the search queries to run instead of
+    keywords (see QueryPlanner); an empty list skips the source this cycle.
+    page_results, if given, receives the new card ids found by each
+    (source key, query) of the sources that completed.
+
+    breakers (see circuit.get_breakers) trips sources whose requests keep
+    failing: a tripped source is skipped until its next probe, when a
+    single request is made. Fetched pages are stored in archive, if given,
+    for main.py --replay.
+    """
+    session = session or await get_session()
+    limiter = HostLimiter(per_host_concurrency, request_delay)
+    pool = get_parse_pool(default_parse_workers() if parse_workers is None else parse_workers)
+    queries = queries or {}
+    scrapers = []
+    for name in (sources or SCRAPERS):
+        if name in queries and not queries[name]:
+            logger.info(f"No queries planned for {SCRAPERS[name].__name__} this cycle")
+            continue
+        scraper = get_scraper(name)
+        scraper.reset()
+        if breakers is not None and not breakers.get(scraper.source).available():
+            # Counted in requests, like the breaker's own refusals
+            metrics.BREAKER_SKIPPED.inc(scraper.source, amount=len(scraper.queries(queries.get(name, keywords))))
+            logger.info(f"Skipping {scraper.__class__.__name__}, circuit open until its next probe")
+            continue
+        scrapers.append(scraper)
+
+    tasks = {}
     for scraper in scrapers:
+        logger.info(f"Scraping {scraper.__class__.__name__}...")
+        breaker = breakers.get(scraper.source) if breakers is not None else None
+        task = asyncio.create_task(scraper.scrape_async(
+            session, queries.get(scraper.key, keywords), limiter, request_timeout, pool, fingerprints, breaker,
+            archive
+        ))
+        tasks[task] = scraper
+
+    done, pending = await asyncio.wait(tasks, timeout=cycle_timeout) if tasks else (set(), set())
+    for task in pending:
+        task.cancel()
+        logger.error(f"❌ {tasks[task].__class__.__name__} did not finish within {cycle_timeout}s, cancelled")
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    all_jobs = []
+    for task, scraper in tasks.items():
+        if task not in done:
+            continue
         try:
-            logger.info(f"Scraping {scraper.__class__.__name__}...")
-            jobs = scraper.scrape(keywords)
+            jobs = task.result()
             all_jobs.extend(jobs)
+            if fingerprints is not None:
+                fingerprints.update(scraper.fingerprints)
+            if page_results is not None:
+                page_results.update(scraper.page_results)
             logger.info(f"✅ Found {len(jobs)} jobs from {scraper.__class__.__name__}")
-            logger.info(f"   Total jobs so far: {len(all_jobs)}")
         except Exception as e:
             logger.error(f"❌ Error with {scraper.__class__.__name__}: {e}", exc_info=True)
             logger.info(f"   Continuing with other scrapers...")
-            continue
-    
+
     logger.info(f"✅ All scrapers completed. Total jobs found: {len(all_jobs)}")
-    
+
     return all_jobs
 
+
+def scrape_all_jobs(keywords: List[str] = None, **kwargs) -> List[Job]:
+    """Scrape jobs from all sources (synchronous wrapper around scrape_all_jobs_async)"""
+    return run_sync(scrape_all_jobs_async(keywords, **kwargs))
+
+
+async def scrape_page_async(source: str, keyword: Optional[str] = None, page: int = 0,
+                            fingerprint: List[str] = None, request_delay: float = 2,
+                            request_timeout: float = 10, parse_workers: int = None,
+                            session: aiohttp.ClientSession = None,
+                            archive: PageArchive = None) -> Optional[Tuple[List[Job], ExtractResult]]:
+    """Fetch and parse one results page of one search (a work queue task)
+
+    Only cards above the first one in `fingerprint` are extracted. Returns
+    None if the site did not answer with a page; other errors are raised
+    so the task can be retried.
+    """
+    scraper = get_scraper(source)
+    session = session or await get_session()
+    pool = get_parse_pool(default_parse_workers() if parse_workers is None else parse_workers)
+    limiter = HostLimiter(1, request_delay)
+    with log_context(source=scraper.source):
+        content = await scraper.fetch(session, scraper.build_page_params(keyword, page), limiter,
+                                      request_timeout, keyword)
+        if content is None:
+            return None
+        scraped_at = datetime.now()
+        if archive is not None:
+            await archive.store_async(scraper.key, keyword, page, scraped_at, content)
+        result = await scraper.parse_async(content, scraped_at, pool, frozenset(fingerprint or ()) or None)
+    health_state.source_succeeded(scraper.source, len(result.rows))
+    return scraper.to_jobs(result.rows, scraped_at), result
+
+
+def scrape_page(source: str, keyword: Optional[str] = None, page: int = 0, **kwargs):
+    """Synchronous wrapper around scrape_page_async"""
+    return run_sync(scrape_page_async(source, keyword, page, **kwargs))
@@ -0,0 +1,210 @@
+"""
+Logging setup for the job scraper
+
+All modules log through the standard logging module; setup_logging() routes
+every record through a QueueHandler so the scraping thread only enqueues
+records, while formatting and I/O (console, log file) happen on a background
+QueueListener thread. Records carry the current cycle and source ids (see
+log_context), can be rendered as JSON lines, and bursts of identical
+warnings/errors are rate-limited.
+"""
+
+import atexit
+import contextvars
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(context)s%(message)s'
+
+_context: contextvars.ContextVar[Dict] = contextvars.ContextVar('log_context', default={})
+_cycle_counter = itertools.count(1)
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+@contextmanager
+def log_context(**fields):
+    """Attach fields (e.g. cycle_id, source) to every record logged inside the block
+
+    Uses a context variable, so it follows asyncio tasks created inside the block.
+    """
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def new_cycle_id() -> str:
+    """Short unique id for one check_and_notify cycle"""
+    return f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{next(_cycle_counter)}"
+
+
+class ContextFilter(logging.Filter):
+    """Copies the current log_context fields onto each record"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        fields = _context.get()
+        record.cycle_id = fields.get('cycle_id', '')
+        record.source = fields.get('source', '')
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets through at most `burst` identical WARNING+ records per `period` seconds
+
+    Records are identical when they share logger, level, message template
+    and arguments, so an error repeated for one source does not hide the
+    same error for another. The next record let through after a suppressed
+    run carries the number of suppressed records in record.suppressed. At
+    most max_keys messages are tracked; expired ones are dropped first.
+    """
+
+    def __init__(self, burst: int = 5, period: float = 60.0, max_keys: int = 1024):
+        super().__init__()
+        self.burst = burst
+        self.period = period
+        self.max_keys = max_keys
+        self._state: Dict[Tuple, List] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(record: logging.LogRecord) -> Tuple:
+        args = record.args
+        if isinstance(args, tuple):
+            # By value, so a new exception object with the same message is a repeat
+            args = tuple(arg if isinstance(arg, (str, int, float, bool, type(None))) else repr(arg) for arg in args)
+        else:
+            args = repr(args)
+        return record.name, record.levelno, record.msg if isinstance(record.msg, str) else type(record.msg), args
+
+    def _evict(self, now: float):
+        for key in [key for key, state in self._state.items() if now - state[0] >= self.period]:
+            del self._state[key]
+        while len(self._state) >= self.max_keys:
+            del self._state[next(iter(self._state))]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING:
+            return True
+        key = self._key(record)
+        now = time.monotonic()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None and len(self._state) >= self.max_keys:
+                self._evict(now)
+            if state is None or now - state[0] >= self.period:
+                suppressed = state[2] if state else 0
+                self._state[key] = [now, 1, 0]
+                if suppressed:
+                    record.suppressed = suppressed
+                return True
+            if state[1] < self.burst:
+                state[1] += 1
+                return True
+            state[2] += 1
+            return False
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread
+
+    The stock QueueHandler formats each record before enqueueing it; since
+    the queue never leaves this process, the record can be passed as-is.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class TextFormatter(logging.Formatter):
+    """Classic text format plus the cycle/source ids when set"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        tags = [value for value in (getattr(record, 'cycle_id', ''), getattr(record, 'source', '')) if value]
+        record.context = f"[{' '.join(tags)}] " if tags else ''
+        message = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            message += f" ({suppressed} similar messages suppressed)"
+        return message
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for field in ('cycle_id', 'source', 'suppressed'):
+            value = getattr(record, field, None)
+            if value:
+                entry[field] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def setup_logging(level: str = None, fmt: str = None, log_file: str = None,
+                  rate_limit_burst: int = None, rate_limit_period: float = None):
+    """Configure root logging once for the process
+
+    Defaults come from LOG_LEVEL (INFO), LOG_FORMAT (text|json),
+    LOG_FILE (job_scraper.log, empty to disable), LOG_RATE_LIMIT_BURST (5)
+    and LOG_RATE_LIMIT_PERIOD (60 seconds).
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    level = (level or os.getenv('LOG_LEVEL', 'INFO')).upper()
+    fmt = fmt or os.getenv('LOG_FORMAT', 'text')
+    log_file = log_file if log_file is not None else os.getenv('LOG_FILE', 'job_scraper.log')
+    burst = rate_limit_burst or int(os.getenv('LOG_RATE_LIMIT_BURST', '5'))
+    period = rate_limit_period or float(os.getenv('LOG_RATE_LIMIT_PERIOD', '60'))
+
+    formatter = JSONFormatter() if fmt == 'json' else TextFormatter(TEXT_FORMAT)
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        try:
+            handlers.append(logging.FileHandler(log_file))
+        except OSError:
+            # File logging not available (e.g., read-only filesystem in the cloud)
+            pass
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.addFilter(RateLimitFilter(burst, period))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
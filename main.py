@@ -1,24 +1,23 @@
 """
 Main script to run the job scraper and email notification system
+
+Subsystems (scrapers, database, notifiers, scheduler) are imported where
+they are first used, so short-lived invocations such as `--once` from cron
+only load what the cycle needs.
 """
 
-import schedule
 import time
 import logging
 import os
+import sys
 from datetime import datetime
-from job_scraper import scrape_all_jobs
-from database import JobDatabase
-from email_notifier import EmailNotifier
-
-# Initialize logging first
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
+import health
+import metrics
+from log_config import log_context, new_cycle_id, setup_logging
+from profiling import CycleProfiler
+
+# Initialize logging first (LOG_LEVEL, LOG_FORMAT=text|json, LOG_FILE)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # Try to import config, fallback to environment variables if not available
@@ -53,7 +52,18 @@ except ImportError:
             'internshala': os.getenv('SCRAPER_INTERNSHALA', 'true').lower() == 'true',
             'naukri': os.getenv('SCRAPER_NAUKRI', 'true').lower() == 'true',
             'indeed': os.getenv('SCRAPER_INDEED', 'true').lower() == 'true',
-        }
+        },
+        'per_host_concurrency': int(os.getenv('PER_HOST_CONCURRENCY', '2')),
+        'request_delay_seconds': float(os.getenv('REQUEST_DELAY_SECONDS', '2')),
+        'request_timeout_seconds': float(os.getenv('REQUEST_TIMEOUT_SECONDS', '10')),
+        'cycle_timeout_seconds': float(os.getenv('CYCLE_TIMEOUT_SECONDS', '600')),
+        'parse_workers': int(os.getenv('PARSE_WORKERS')) if os.getenv('PARSE_WORKERS') else None,
+        'page_fingerprints': os.getenv('PAGE_FINGERPRINTS', 'true').lower() == 'true',
+        'query_planner': os.getenv('QUERY_PLANNER', 'true').lower() == 'true',
+        'circuit_breaker': os.getenv('CIRCUIT_BREAKER', 'true').lower() == 'true',
+        'breaker_failures': int(os.getenv('BREAKER_FAILURES', '5')),
+        'breaker_probe_minutes': float(os.getenv('BREAKER_PROBE_MINUTES', '30')),
+        'breaker_max_probe_minutes': float(os.getenv('BREAKER_MAX_PROBE_MINUTES', '360')),
     }
     
     exclude_keywords_str = os.getenv('EXCLUDE_KEYWORDS', '')
@@ -64,98 +74,686 @@ except ImportError:
     
     FILTER_CONFIG = {
         'min_jobs_for_email': int(os.getenv('MIN_JOBS_FOR_EMAIL', '1')),
-        'exclude_keywords': exclude_keywords
+        # Most jobs read from the backlog into one email; the rest wait for the next one (0 = no limit)
+        'max_jobs_per_email': int(os.getenv('MAX_JOBS_PER_EMAIL', '500')),
+        'exclude_keywords': exclude_keywords,
+        # Applied to details read by the enrichment stage (ENRICHMENT_CONFIG)
+        'max_experience_years': float(os.getenv('MAX_EXPERIENCE_YEARS')) if os.getenv('MAX_EXPERIENCE_YEARS') else None,
+        'locations': [k.strip() for k in os.getenv('LOCATIONS', '').split(',') if k.strip()],
+        'max_age_days': float(os.getenv('MAX_AGE_DAYS')) if os.getenv('MAX_AGE_DAYS') else None,
+        # Order emailed jobs by how well their titles match JOB_KEYWORDS (needs numpy)
+        'rank_jobs': os.getenv('RANK_JOBS', 'true').lower() == 'true',
+    }
+
+# Real-time push channels (optional, sent alongside the email digest)
+try:
+    from config import NOTIFIER_CONFIG
+except ImportError:
+    NOTIFIER_CONFIG = {
+        'webhook_url': os.getenv('WEBHOOK_URL', ''),
+        'webhook_timeout': int(os.getenv('WEBHOOK_TIMEOUT', '10')),
+    }
+
+# Monitoring: /metrics and /health endpoints are off unless a port is set
+try:
+    from config import MONITORING_CONFIG
+except ImportError:
+    MONITORING_CONFIG = {
+        'metrics_port': int(os.getenv('METRICS_PORT', '0')),
+        'metrics_host': os.getenv('METRICS_HOST', '127.0.0.1'),
+        'health_port': int(os.getenv('HEALTH_PORT', '0')),
+        'health_host': os.getenv('HEALTH_HOST', '0.0.0.0'),
+        'health_stale_seconds': float(os.getenv('HEALTH_STALE_SECONDS', '0')),
+    }
+
+# Profiling: PROFILE_CYCLES=N profiles the first N cycles, SIGUSR1 profiles the next one(s)
+try:
+    from config import PROFILING_CONFIG
+except ImportError:
+    PROFILING_CONFIG = {
+        'output_dir': os.getenv('PROFILE_DIR', 'profiles'),
+        'mode': os.getenv('PROFILE_MODE', 'sample'),
+        'interval_ms': float(os.getenv('PROFILE_INTERVAL_MS', '5')),
+        'cycles': int(os.getenv('PROFILE_CYCLES', '0')),
+    }
+
+# Distributed mode: a coordinator (--coordinator) hands out tasks to workers (--worker)
+# through a shared SQLite file, which also holds the shared job store
+try:
+    from config import WORK_QUEUE_CONFIG
+except ImportError:
+    WORK_QUEUE_CONFIG = {
+        'db_path': os.getenv('WORK_QUEUE_DB', 'jobs.db'),
+        'lease_seconds': float(os.getenv('WORK_QUEUE_LEASE_SECONDS', '120')),
+        'max_attempts': int(os.getenv('WORK_QUEUE_MAX_ATTEMPTS', '3')),
+        'poll_seconds': float(os.getenv('WORK_QUEUE_POLL_SECONDS', '2')),
+        'pages_per_query': int(os.getenv('WORK_QUEUE_PAGES_PER_QUERY', '1')),
+        'busy_timeout_seconds': float(os.getenv('WORK_QUEUE_BUSY_TIMEOUT', '60')),
+    }
+
+# Digest batching: coalesce jobs into fewer emails, sending priority jobs at once
+try:
+    from config import DIGEST_CONFIG
+except ImportError:
+    DIGEST_CONFIG = {
+        'max_delay_minutes': float(os.getenv('DIGEST_MAX_DELAY_MINUTES', '0')),
+        'max_batch_size': int(os.getenv('DIGEST_MAX_BATCH_SIZE', '50')),
+        'max_emails_per_hour': int(os.getenv('DIGEST_MAX_EMAILS_PER_HOUR', '0')),
+        'priority_keywords': [k.strip() for k in os.getenv('PRIORITY_KEYWORDS', '').split(',') if k.strip()],
+        'priority_companies': [k.strip() for k in os.getenv('PRIORITY_COMPANIES', '').split(',') if k.strip()],
+    }
+
+# Detail enrichment: fetch the detail page of each new job for experience/location/posted-time filters
+try:
+    from config import ENRICHMENT_CONFIG
+except ImportError:
+    ENRICHMENT_CONFIG = {
+        'enabled': os.getenv('ENRICH_DETAILS', 'false').lower() == 'true',
+        'concurrency': int(os.getenv('ENRICH_CONCURRENCY', '4')),
+        'per_host_concurrency': int(os.getenv('ENRICH_PER_HOST_CONCURRENCY', '1')),
+        'request_delay_seconds': float(os.getenv('ENRICH_REQUEST_DELAY_SECONDS', '1')),
+        'cache_size': int(os.getenv('ENRICH_CACHE_SIZE', '5000')),
     }
 
-# Add file handler if running locally (file may not be writable in cloud)
+# Seen-jobs snapshot: a fresh deployment (empty jobs.db) loads it to skip jobs it already emailed
 try:
-    file_handler = logging.FileHandler('job_scraper.log')
-    file_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-    logger.addHandler(file_handler)
-except Exception:
-    # File logging not available (e.g., in cloud environment)
-    pass
+    from config import SNAPSHOT_CONFIG
+except ImportError:
+    SNAPSHOT_CONFIG = {
+        'path': os.getenv('SNAPSHOT_PATH', ''),
+        'auto': os.getenv('SNAPSHOT_AUTO', 'false').lower() == 'true',
+    }
+
+# Raw page archive: with a path set, fetched listing pages are kept (gzip) for `--replay`
+try:
+    from config import ARCHIVE_CONFIG
+except ImportError:
+    ARCHIVE_CONFIG = {
+        'path': os.getenv('PAGE_ARCHIVE_DIR', ''),
+        'retention_days': float(os.getenv('PAGE_ARCHIVE_RETENTION_DAYS', '14')),
+        # Email jobs found by a replay (false: store them as already notified)
+        'replay_notify': os.getenv('REPLAY_NOTIFY', 'true').lower() == 'true',
+    }
+
+# Hot reload: the sections below are re-read between cycles when config.py changes,
+# or from CONFIG_FILE (a .py, .toml or .json file) if set; CONFIG_RELOAD=false turns this off
+CONFIG_FILE = os.getenv('CONFIG_FILE', '')
+CONFIG_RELOAD = os.getenv('CONFIG_RELOAD', 'true').lower() == 'true'
+RELOADABLE_CONFIG = ('JOB_KEYWORDS', 'EMAIL_CONFIG', 'SCRAPING_CONFIG', 'FILTER_CONFIG',
+                     'NOTIFIER_CONFIG', 'DIGEST_CONFIG', 'ENRICHMENT_CONFIG')
+
+profiler = CycleProfiler(
+    output_dir=PROFILING_CONFIG.get('output_dir', 'profiles'),
+    mode=PROFILING_CONFIG.get('mode', 'sample'),
+    interval=PROFILING_CONFIG.get('interval_ms', 5) / 1000
+)
+
+
+def scrape_options():
+    """Keyword arguments for scrape_all_jobs built from SCRAPING_CONFIG"""
+    from job_scraper import SCRAPERS
+    enabled = SCRAPING_CONFIG.get('scrapers', {})
+    breakers = None
+    if SCRAPING_CONFIG.get('circuit_breaker', True):
+        from circuit import get_breakers
+        breakers = get_breakers(
+            SCRAPING_CONFIG.get('breaker_failures', 5),
+            SCRAPING_CONFIG.get('breaker_probe_minutes', 30),
+            SCRAPING_CONFIG.get('breaker_max_probe_minutes', 360)
+        )
+    return {
+        'sources': [name for name in SCRAPERS if enabled.get(name, True)],
+        'per_host_concurrency': SCRAPING_CONFIG.get('per_host_concurrency', 2),
+        'request_delay': SCRAPING_CONFIG.get('request_delay_seconds', 2),
+        'request_timeout': SCRAPING_CONFIG.get('request_timeout_seconds', 10),
+        'cycle_timeout': SCRAPING_CONFIG.get('cycle_timeout_seconds', 600),
+        'parse_workers': SCRAPING_CONFIG.get('parse_workers'),
+        'breakers': breakers,
+        'archive': get_page_archive(),
+    }
+
+
+def get_page_archive():
+    """The raw page archive, or None when ARCHIVE_CONFIG has no path"""
+    from archive import get_archive
+    return get_archive(ARCHIVE_CONFIG.get('path'))
+
+
+def prune_archive():
+    """Delete archived pages past ARCHIVE_CONFIG['retention_days']"""
+    archive = get_page_archive()
+    if archive is None or not ARCHIVE_CONFIG.get('retention_days'):
+        return
+    deleted = archive.prune(ARCHIVE_CONFIG['retention_days'])
+    if deleted:
+        logger.info(f"Deleted {deleted} day(s) of archived pages from {archive.directory}")
+
+
+_exclude_pattern = (None, None)
+
+
+def exclude_pattern():
+    """Regex matching any exclude keyword, compiled again only when the keywords change"""
+    global _exclude_pattern
+    keywords = tuple(kw.lower() for kw in FILTER_CONFIG.get('exclude_keywords', []))
+    if _exclude_pattern[0] != keywords:
+        import re
+        pattern = re.compile('|'.join(map(re.escape, keywords))) if keywords else None
+        _exclude_pattern = (keywords, pattern)
+    return _exclude_pattern[1]
 
 
 def filter_jobs(jobs):
     """Filter jobs based on exclude keywords"""
     filtered = []
-    exclude_keywords = [kw.lower() for kw in FILTER_CONFIG.get('exclude_keywords', [])]
+    pattern = exclude_pattern()
+    debug = logger.isEnabledFor(logging.DEBUG)
     
     for job in jobs:
-        title_lower = job.get('title', '').lower()
-        should_exclude = any(keyword in title_lower for keyword in exclude_keywords)
+        should_exclude = pattern is not None and pattern.search(job.title.lower()) is not None
         
         if not should_exclude:
             filtered.append(job)
-        else:
-            logger.debug(f"Excluded job: {job.get('title')} (contains exclude keyword)")
+        elif debug:
+            logger.debug("Excluded job: %s (contains exclude keyword)", job.title)
     
+    metrics.FILTERED_JOBS.inc(amount=len(jobs) - len(filtered))
     return filtered
 
 
+def build_email_notifier():
+    """Create the email notifier from EMAIL_CONFIG (supports both SMTP and SendGrid)"""
+    from email_notifier import EmailNotifier
+    return EmailNotifier(
+        smtp_server=EMAIL_CONFIG.get('smtp_server'),
+        smtp_port=EMAIL_CONFIG.get('smtp_port'),
+        email=EMAIL_CONFIG['sender_email'],
+        password=EMAIL_CONFIG.get('sender_password'),
+        sendgrid_api_key=os.getenv('SENDGRID_API_KEY'),
+        recipient=EMAIL_CONFIG.get('recipient_email'),
+        use_tls=EMAIL_CONFIG.get('use_tls', True)
+    )
+
+
+_push_notifiers = None
+
+
+def get_push_notifiers():
+    """Build the real-time push channels once and reuse them (and their connections) across cycles"""
+    global _push_notifiers
+    if _push_notifiers is None:
+        _push_notifiers = []
+        webhook_url = NOTIFIER_CONFIG.get('webhook_url')
+        if webhook_url:
+            from notifier import WebhookNotifier
+            _push_notifiers.append(WebhookNotifier(
+                webhook_url,
+                headers=NOTIFIER_CONFIG.get('webhook_headers'),
+                timeout=NOTIFIER_CONFIG.get('webhook_timeout', 10)
+            ))
+            logger.info("Webhook push notifications enabled")
+    return _push_notifiers
+
+
+def push_new_job(job):
+    """Push a newly accepted job to every real-time channel"""
+    for notifier in get_push_notifiers():
+        notifier.notify_job(job)
+
+
+def enrich_new_jobs(db, new_jobs):
+    """Fetch the detail pages of new jobs and drop those the detail filters in FILTER_CONFIG exclude
+
+    Excluded jobs stay in the database marked as notified, so they are
+    neither fetched nor emailed again.
+    """
+    from enrichment import enrich_jobs, get_detail_cache, passes_detail_filters
+    
+    start = time.perf_counter()
+    enriched = enrich_jobs(
+        new_jobs,
+        concurrency=ENRICHMENT_CONFIG.get('concurrency', 4),
+        per_host_concurrency=ENRICHMENT_CONFIG.get('per_host_concurrency', 1),
+        request_delay=ENRICHMENT_CONFIG.get('request_delay_seconds', 1),
+        request_timeout=SCRAPING_CONFIG.get('request_timeout_seconds', 10),
+        parse_workers=SCRAPING_CONFIG.get('parse_workers'),
+        cache=get_detail_cache(ENRICHMENT_CONFIG.get('cache_size', 5000))
+    )
+    kept, excluded = [], []
+    for job in new_jobs:
+        if passes_detail_filters(job, FILTER_CONFIG.get('max_experience_years'), FILTER_CONFIG.get('locations'),
+                                 FILTER_CONFIG.get('max_age_days')):
+            kept.append(job)
+        else:
+            excluded.append(job.id)
+    if excluded:
+        db.mark_many_as_notified(excluded)
+        metrics.FILTERED_JOBS.inc(amount=len(excluded))
+    logger.info(f"Enriched {enriched} of {len(new_jobs)} new jobs in {time.perf_counter() - start:.1f}s, "
+                f"{len(excluded)} excluded by detail filters")
+    return kept
+
+
+def store_new_jobs(db, jobs, fingerprints=None):
+    """Add jobs to the database, enrich the new ones if enabled, and push them; returns the new jobs kept"""
+    enrich = ENRICHMENT_CONFIG.get('enabled', False)
+    push_notifiers = get_push_notifiers()
+    # With enrichment, jobs are pushed once their details have passed the filters
+    on_new = push_new_job if push_notifiers and not enrich else None
+    with metrics.DB_INGEST_SECONDS.time():
+        new_jobs = db.add_jobs(jobs, on_new=on_new, fingerprints=fingerprints)
+    if enrich and new_jobs:
+        new_jobs = enrich_new_jobs(db, new_jobs)
+        if push_notifiers:
+            for job in new_jobs:
+                push_new_job(job)
+    metrics.NEW_JOBS.inc(amount=len(new_jobs))
+    # Pushes go out from the channels' own threads; close_push_notifiers drains them on shutdown
+    return new_jobs
+
+
 def check_and_notify():
     """Main function to check for new jobs and send notifications"""
+    start = time.perf_counter()
+    cycle_id = new_cycle_id()
+    health.state.cycle_started(cycle_id)
+    try:
+        with log_context(cycle_id=cycle_id):
+            new_jobs = profiler.run(run_cycle)
+        metrics.CYCLES.inc('ok')
+        health.state.cycle_finished(True, new_jobs=new_jobs)
+    except Exception as e:
+        metrics.CYCLES.inc('error')
+        health.state.cycle_finished(False, error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        metrics.CYCLE_SECONDS.observe(time.perf_counter() - start)
+
+
+def plan_queries(db, sources):
+    """Planned searches per source from the query planner, or None when it is disabled"""
+    if not SCRAPING_CONFIG.get('query_planner', True):
+        return None
+    from job_scraper import SCRAPERS
+    from query_planner import QueryPlanner
+    return QueryPlanner(db).plan({name: SCRAPERS[name] for name in sources}, JOB_KEYWORDS)
+
+
+def send_digest(db, new_jobs, check_minimum=True):
+    """Email new jobs if there are enough of them, and mark them notified once sent"""
+    if check_minimum and len(new_jobs) < FILTER_CONFIG.get('min_jobs_for_email', 1):
+        logger.info(f"Not enough new jobs ({len(new_jobs)}) to send email (minimum: {FILTER_CONFIG.get('min_jobs_for_email', 1)})")
+        return False
+    
+    logger.info("Sending email notification...")
+    
+    # Most relevant jobs first
+    ranker = get_ranker()
+    if ranker is not None:
+        new_jobs = ranker.rank(new_jobs)
+    
+    # Initialize email notifier (supports both SMTP and SendGrid)
+    notifier = build_email_notifier()
+    
+    # Send email
+    success = notifier.send_email(
+        recipient=EMAIL_CONFIG['recipient_email'],
+        jobs=new_jobs
+    )
+    
+    if success:
+        # Mark jobs as notified
+        db.mark_many_as_notified([job.id for job in new_jobs])
+        logger.info("Email sent successfully!")
+    else:
+        logger.error("Failed to send email")
+    return success
+
+
+def send_in_batches(db, jobs, limit):
+    """Email jobs, most relevant first, in emails of at most limit jobs (one email when limit is None)"""
+    if limit is None or len(jobs) <= limit:
+        return send_digest(db, jobs)
+    ranker = get_ranker()
+    if ranker is not None:
+        jobs = ranker.rank(jobs)
+    logger.info(f"Sending {len(jobs)} jobs in emails of up to {limit}")
+    for start in range(0, len(jobs), limit):
+        # A failed email leaves the rest unnotified rather than retrying them all at once
+        if not send_digest(db, jobs[start:start + limit], check_minimum=False):
+            return False
+    return True
+
+
+_digest_policy = None
+_digest_settings = None
+
+
+def get_digest_policy():
+    """The digest batching policy, kept across cycles; None when DIGEST_CONFIG asks for neither delay nor cap
+
+    A policy rebuilt after a config change keeps the send history its hourly cap counts.
+    """
+    global _digest_policy, _digest_settings
+    if not (DIGEST_CONFIG.get('max_delay_minutes') or DIGEST_CONFIG.get('max_emails_per_hour')):
+        return None
+    settings = (DIGEST_CONFIG, FILTER_CONFIG.get('min_jobs_for_email', 1))
+    if _digest_policy is None or settings != _digest_settings:
+        from digest import DigestPolicy
+        previous = _digest_policy
+        _digest_policy = DigestPolicy(
+            max_delay_minutes=DIGEST_CONFIG.get('max_delay_minutes', 0),
+            max_batch_size=DIGEST_CONFIG.get('max_batch_size', 50),
+            max_emails_per_hour=DIGEST_CONFIG.get('max_emails_per_hour', 0),
+            priority_keywords=DIGEST_CONFIG.get('priority_keywords', []),
+            priority_companies=DIGEST_CONFIG.get('priority_companies', []),
+            min_jobs=FILTER_CONFIG.get('min_jobs_for_email', 1)
+        )
+        if previous is not None:
+            _digest_policy.carry_over(previous)
+        _digest_settings = (dict(DIGEST_CONFIG), settings[1])
+    return _digest_policy
+
+
+def deliver_digest(db, new_jobs=None):
+    """Email jobs as DIGEST_CONFIG allows
+
+    Without batching this emails new_jobs (default: the unnotified jobs)
+    as before, split into emails of max_jobs_per_email. With batching,
+    every job still unnotified is pending and is emailed once the policy
+    says so; until then it waits in the database. The backlog is read a
+    page at a time and an email carries at most max_jobs_per_email of it,
+    most relevant first.
+
+    Emails are sent on the background email thread; returns whether one
+    was queued. Jobs are marked notified once their email is sent, so
+    while a send is still running the backlog is not read again (new_jobs
+    are queued behind it).
+    """
+    from email_notifier import sends_pending, submit_send
+    
+    limit = FILTER_CONFIG.get('max_jobs_per_email', 500) or None
+    policy = get_digest_policy()
+    if policy is None and new_jobs is not None:
+        submit_send(send_in_batches, db, new_jobs, limit)
+        return True
+    if sends_pending():
+        logger.info("Previous email still sending, unnotified jobs are checked again next time")
+        return False
+    if policy is None:
+        submit_send(send_digest, db, db.get_unnotified_jobs(limit=limit))
+        return True
+    
+    pending = policy.summarize(db.iter_unnotified_jobs())
+    metrics.DIGEST_PENDING.set(pending.count)
+    health.state.set_queue(digest_pending=pending.count)
+    send, reason = policy.decide(pending)
+    metrics.DIGEST_DECISIONS.inc(reason)
+    if not send:
+        if pending.count:
+            logger.info(f"Holding {pending.count} job(s) for the next digest ({reason})")
+        return False
+    jobs = db.get_unnotified_jobs(limit=limit)
+    logger.info(f"Sending digest of {len(jobs)} of {pending.count} pending job(s) ({reason})")
+    
+    def send():
+        success = send_digest(db, jobs, check_minimum=False)
+        if success:
+            policy.record_send()
+            metrics.DIGEST_PENDING.set(pending.count - len(jobs))
+            health.state.set_queue(digest_pending=pending.count - len(jobs))
+        else:
+            policy.record_failure()
+        return success
+    
+    submit_send(send)
+    return True
+
+
+def wait_for_email(timeout: float = None):
+    """Before exiting: let emails still sending in the background finish"""
+    from email_notifier import sends_pending, wait_for_sends
+    if not sends_pending():
+        return
+    logger.info("Waiting for emails still being sent...")
+    if not wait_for_sends(timeout):
+        logger.warning(f"Emails still sending after {timeout}s; their jobs stay unnotified")
+
+
+def flush_digest(db):
+    """Between cycles: send held jobs whose latency window has run out"""
+    try:
+        deliver_digest(db)
+    except Exception as e:
+        logger.error(f"Error flushing digest: {e}", exc_info=True)
+
+
+def log_stats(db):
+    stats = db.get_stats()
+    health.state.set_stats(stats)
+    logger.info(f"Database stats - Total: {stats['total_jobs']}, Notified: {stats['notified_jobs']}, Unnotified: {stats['unnotified_jobs']}")
+
+
+def get_ranker():
+    """Relevance scorer for JOB_KEYWORDS, or None when ranking is off or numpy is missing"""
+    if not FILTER_CONFIG.get('rank_jobs', True):
+        return None
+    from scoring import get_scorer
+    return get_scorer(JOB_KEYWORDS)
+
+
+_databases = {}
+
+
+def open_database(db_path: str = "jobs.db", busy_timeout: float = None):
+    """JobDatabase that also consults the configured seen-jobs snapshot and ranks unnotified jobs
+
+    One instance per database file is kept for the life of the process;
+    its snapshot and ranker follow the current settings, and its schema is
+    created again if the file was deleted since. busy_timeout (seconds)
+    overrides how long a SQLite backend waits for another process's lock.
+    """
+    from database import JobDatabase
+    from storage import SQLiteBackend
+    key = os.path.abspath(db_path)
+    db = _databases.get(key)
+    if db is None:
+        db = _databases[key] = JobDatabase(db_path)
+    else:
+        db.backend.ensure_schema()
+    if busy_timeout is not None and isinstance(db.backend, SQLiteBackend):
+        db.backend.timeout = busy_timeout
+    db.snapshot_path = SNAPSHOT_CONFIG.get('path') or None
+    db.scorer = get_ranker()
+    return db
+
+
+def export_snapshot(path: str = None, db=None) -> int:
+    """Write the seen-jobs snapshot (jobs in the database plus the loaded snapshot)
+
+    Returns the number of jobs written.
+    """
+    from snapshot import export_entries, write_snapshot
+    
+    path = path or SNAPSHOT_CONFIG.get('path')
+    if not path:
+        raise ValueError("No snapshot path given and SNAPSHOT_CONFIG['path'] (SNAPSHOT_PATH) is not set")
+    db = db or open_database()
+    start = time.perf_counter()
+    count = write_snapshot(path, export_entries(db, db.snapshot))
+    logger.info(f"Snapshot of {count} jobs written to {path} in {time.perf_counter() - start:.2f}s")
+    return count
+
+
+def import_snapshot(path: str) -> int:
+    """Merge a snapshot file into the configured snapshot, which every cycle then loads
+
+    Returns the number of jobs in the merged snapshot.
+    """
+    from snapshot import Snapshot, open_snapshot, write_snapshot
+    
+    target = SNAPSHOT_CONFIG.get('path')
+    if not target:
+        raise ValueError("Set SNAPSHOT_CONFIG['path'] (SNAPSHOT_PATH) to import a snapshot")
+    imported = Snapshot(path)
+    try:
+        entries = list(imported.items())
+    finally:
+        imported.close()
+    if os.path.abspath(path) != os.path.abspath(target):
+        current = open_snapshot(target)
+        if current is not None:
+            entries.extend(current.items())
+    count = write_snapshot(target, entries)
+    logger.info(f"Imported {path}: {target} now holds {count} jobs")
+    return count
+
+
+def auto_snapshot(db):
+    """Refresh the snapshot after a cycle when SNAPSHOT_CONFIG['auto'] is on"""
+    if not (SNAPSHOT_CONFIG.get('auto') and SNAPSHOT_CONFIG.get('path')):
+        return
+    try:
+        export_snapshot(db=db)
+    except Exception as e:
+        logger.error(f"Failed to write snapshot: {e}")
+
+
+_config_watcher = None
+
+
+def get_config_watcher():
+    """Watcher for CONFIG_FILE, or for config.py; None when reloading is off"""
+    global _config_watcher
+    if not CONFIG_RELOAD:
+        return None
+    if _config_watcher is None:
+        from config_reload import ConfigWatcher
+        config_module = sys.modules.get('config')
+        if CONFIG_FILE:
+            path, loaded = CONFIG_FILE, False
+        elif config_module is not None and getattr(config_module, '__file__', None):
+            path, loaded = config_module.__file__, True
+        else:
+            path, loaded = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.py'), False
+        baseline = {name: globals()[name] for name in RELOADABLE_CONFIG}
+        _config_watcher = ConfigWatcher(path, baseline, loaded=loaded)
+    return _config_watcher
+
+
+def reload_config() -> bool:
+    """Between cycles: swap in the settings of the watched config file if it changed
+
+    All changed sections are replaced together. Sessions, parse workers,
+    caches, breakers and the database stay as they are; only what depends on
+    a changed section is rebuilt when next used (exclude filter, relevance
+    scorer, digest policy, push channels). Returns whether anything changed.
+    """
+    watcher = get_config_watcher()
+    settings = watcher.poll() if watcher is not None else None
+    if settings is None:
+        return False
+    changed = [name for name in RELOADABLE_CONFIG if settings[name] != globals()[name]]
+    if not changed:
+        return False
+    globals().update((name, settings[name]) for name in changed)
+    if 'NOTIFIER_CONFIG' in changed:
+        close_push_notifiers()
+    logger.info(f"Reloaded {watcher.path}: {', '.join(changed)} changed")
+    return True
+
+
+def schedule_cycles(scheduler, cycle, *args, db_path: str = 'jobs.db'):
+    """Schedule cycle(*args) every check interval, plus the digest flush while batching is on
+
+    Called again after a config reload; jobs whose timing did not change
+    keep their place in the schedule.
+    """
+    interval = SCRAPING_CONFIG.get('check_interval_minutes', 30)
+    cycles = scheduler.get_jobs('cycle')
+    if not cycles or cycles[0].interval != interval:
+        scheduler.clear('cycle')
+        scheduler.every(interval).minutes.do(cycle, *args).tag('cycle')
+        if cycles:
+            logger.info(f"Check interval changed to {interval} minutes")
+    flushing = bool(scheduler.get_jobs('digest'))
+    if get_digest_policy() is not None and not flushing:
+        logger.info("Digest batching enabled: held jobs are checked every minute")
+        scheduler.every(1).minutes.do(flush_digest, open_database(db_path)).tag('digest')
+    elif get_digest_policy() is None and flushing:
+        scheduler.clear('digest')
+
+
+def start_health_endpoints():
+    """Serve /health, /ready and /status when MONITORING_CONFIG['health_port'] is set
+
+    The loop counts as stalled once it has not ticked for health_stale_seconds
+    (default: the cycle timeout plus five minutes, since a running cycle
+    does not tick).
+    """
+    port = MONITORING_CONFIG.get('health_port')
+    if not port:
+        return
+    stale_after = (MONITORING_CONFIG.get('health_stale_seconds')
+                   or SCRAPING_CONFIG.get('cycle_timeout_seconds', 600) + 300)
+    try:
+        health.start_health_server(port, MONITORING_CONFIG.get('health_host', '0.0.0.0'), stale_after)
+    except OSError as e:
+        logger.error(f"Could not start health endpoints on port {port}: {e}")
+
+
+def run_cycle():
+    """Scrape, filter, store and notify once; returns the number of new jobs"""
+    from job_scraper import scrape_all_jobs
+    
     logger.info("=" * 60)
     logger.info("Starting job scrape check...")
     logger.info(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     try:
         # Initialize database
-        db = JobDatabase()
+        db = open_database()
         
-        # Scrape jobs from all sources
+        # Scrape jobs from all sources, skipping cards already seen on each page
+        fingerprints = db.get_fingerprints() if SCRAPING_CONFIG.get('page_fingerprints', True) else None
+        options = scrape_options()
+        queries = plan_queries(db, options['sources'])
+        page_results = {} if queries is not None else None
         logger.info(f"Scraping jobs with keywords: {JOB_KEYWORDS}")
         logger.info("Starting scraping process...")
-        all_jobs = scrape_all_jobs(JOB_KEYWORDS)
+        stage_start = time.perf_counter()
+        all_jobs = scrape_all_jobs(JOB_KEYWORDS, fingerprints=fingerprints, queries=queries,
+                                   page_results=page_results, **options)
+        health.state.stage_finished('scrape', time.perf_counter() - stage_start)
         logger.info(f"✅ Scraping complete! Total jobs scraped: {len(all_jobs)}")
         
         # Filter jobs
         logger.info("Filtering jobs...")
+        stage_start = time.perf_counter()
         filtered_jobs = filter_jobs(all_jobs)
+        health.state.stage_finished('filter', time.perf_counter() - stage_start)
         logger.info(f"✅ Filtering complete! Jobs after filtering: {len(filtered_jobs)}")
         
         # Add to database and get only new jobs
         logger.info("Checking for new jobs in database...")
-        new_jobs = db.add_jobs(filtered_jobs)
+        stage_start = time.perf_counter()
+        new_jobs = store_new_jobs(db, filtered_jobs, fingerprints)
+        if page_results:
+            db.record_query_results(page_results)
+        health.state.stage_finished('store', time.perf_counter() - stage_start)
         logger.info(f"✅ Database check complete! New jobs found: {len(new_jobs)}")
         
-        # Send email if we have new jobs
-        if len(new_jobs) >= FILTER_CONFIG.get('min_jobs_for_email', 1):
-            logger.info("Sending email notification...")
-            
-            # Initialize email notifier (supports both SMTP and SendGrid)
-            sendgrid_api_key = os.getenv('SENDGRID_API_KEY')
-            notifier = EmailNotifier(
-                smtp_server=EMAIL_CONFIG.get('smtp_server'),
-                smtp_port=EMAIL_CONFIG.get('smtp_port'),
-                email=EMAIL_CONFIG['sender_email'],
-                password=EMAIL_CONFIG.get('sender_password'),
-                sendgrid_api_key=sendgrid_api_key
-            )
-            
-            # Send email
-            success = notifier.send_email(
-                recipient=EMAIL_CONFIG['recipient_email'],
-                jobs=new_jobs
-            )
-            
-            if success:
-                # Mark jobs as notified
-                unnotified = db.get_unnotified_jobs()
-                for job in unnotified:
-                    if any(nj['url'] == job['url'] for nj in new_jobs):
-                        db.mark_as_notified(job['id'])
-                logger.info("Email sent successfully!")
-            else:
-                logger.error("Failed to send email")
-        else:
-            logger.info(f"Not enough new jobs ({len(new_jobs)}) to send email (minimum: {FILTER_CONFIG.get('min_jobs_for_email', 1)})")
+        # Send email if we have new jobs (or hold them for a later digest)
+        stage_start = time.perf_counter()
+        deliver_digest(db, new_jobs)
+        health.state.stage_finished('notify', time.perf_counter() - stage_start)
         
         # Print stats
-        stats = db.get_stats()
-        logger.info(f"Database stats - Total: {stats['total_jobs']}, Notified: {stats['notified_jobs']}, Unnotified: {stats['unnotified_jobs']}")
+        log_stats(db)
+        auto_snapshot(db)
+        prune_archive()
         logger.info("=" * 60)
+        return len(new_jobs)
         
     except Exception as e:
         logger.error(f"❌ Error in check_and_notify: {e}", exc_info=True)
@@ -170,14 +768,7 @@ def test_email():
     logger.info("Testing email configuration...")
     
     try:
-        sendgrid_api_key = os.getenv('SENDGRID_API_KEY')
-        notifier = EmailNotifier(
-            smtp_server=EMAIL_CONFIG.get('smtp_server'),
-            smtp_port=EMAIL_CONFIG.get('smtp_port'),
-            email=EMAIL_CONFIG['sender_email'],
-            password=EMAIL_CONFIG.get('sender_password'),
-            sendgrid_api_key=sendgrid_api_key
-        )
+        notifier = build_email_notifier()
         
         success = notifier.send_test_email(EMAIL_CONFIG['recipient_email'])
         if success:
@@ -188,19 +779,284 @@ def test_email():
         logger.error(f"Error testing email: {e}", exc_info=True)
 
 
+def profile_cycles(cycles: int = 1):
+    """Run `cycles` back-to-back cycles under the profiler, then exit"""
+    logger.info(f"Profiling {cycles} cycle(s), output in {profiler.output_dir}/")
+    profiler.request(cycles)
+    for _ in range(cycles):
+        check_and_notify()
+    wait_for_email()
+
+
+def close_push_notifiers():
+    """Deliver anything still queued on the push channels and close them"""
+    global _push_notifiers
+    for notifier in _push_notifiers or []:
+        notifier.close()
+    _push_notifiers = None
+
+
+def email_configured() -> bool:
+    """Check that real email credentials are set, logging how to fix it if not"""
+    # Check if email is still the default placeholder (means not configured)
+    if EMAIL_CONFIG['sender_email'] == 'your_email@gmail.com' or not EMAIL_CONFIG['sender_email']:
+        logger.error("⚠️  Please configure your email settings in config.py or environment variables!")
+        logger.error("   Update EMAIL_CONFIG with your email credentials.")
+        logger.error("   Or set environment variables: SENDER_EMAIL, SENDER_PASSWORD, RECIPIENT_EMAIL")
+        return False
+    return True
+
+
+def get_work_queue():
+    from work_queue import WorkQueue
+    return WorkQueue(
+        WORK_QUEUE_CONFIG.get('db_path', 'jobs.db'),
+        lease_seconds=WORK_QUEUE_CONFIG.get('lease_seconds', 120),
+        max_attempts=WORK_QUEUE_CONFIG.get('max_attempts', 3),
+        timeout=WORK_QUEUE_CONFIG.get('busy_timeout_seconds', 60)
+    )
+
+
+def open_queue_database():
+    """The database shared by the coordinator and workers, with the queue's busy timeout
+
+    Only SQLite shares jobs between processes: with another backend each
+    worker would keep its jobs to itself, so the coordinator would never
+    email them. That is refused instead of left to fail silently.
+    """
+    backend = os.getenv('STORAGE_BACKEND', 'sqlite')
+    if backend != 'sqlite':
+        raise ValueError(f"--coordinator and --worker need the shared SQLite database, "
+                         f"but STORAGE_BACKEND is {backend!r}; unset it or set it to 'sqlite'")
+    return open_database(WORK_QUEUE_CONFIG.get('db_path', 'jobs.db'),
+                         busy_timeout=WORK_QUEUE_CONFIG.get('busy_timeout_seconds', 60))
+
+
+def coordinate_cycle(queue=None):
+    """Coordinator side of one cycle: enqueue every search, wait for workers, then email the digest"""
+    from job_scraper import get_scraper
+    
+    queue = queue or get_work_queue()
+    db = open_queue_database()
+    cycle_id = new_cycle_id()
+    health.state.cycle_started(cycle_id)
+    with log_context(cycle_id=cycle_id):
+        sources = scrape_options()['sources']
+        queries = plan_queries(db, sources) or {}
+        pages = WORK_QUEUE_CONFIG.get('pages_per_query', 1)
+        tasks = []
+        for name in sources:
+            scraper = get_scraper(name)
+            source_queries = queries.get(name, scraper.queries(JOB_KEYWORDS))
+            source_pages = pages if scraper.page_param else 1
+            tasks.extend((name, query, page) for query in source_queries for page in range(source_pages))
+        added = queue.enqueue(cycle_id, tasks)
+        logger.info(f"Queued {added} of {len(tasks)} tasks for cycle {cycle_id}")
+        
+        wait_start = time.monotonic()
+        deadline = wait_start + SCRAPING_CONFIG.get('cycle_timeout_seconds', 600)
+        status = queue.cycle_status(cycle_id)
+        while (status.get('pending') or status.get('leased')) and time.monotonic() < deadline:
+            health.state.set_queue(**{f"tasks_{state}": count for state, count in status.items()})
+            time.sleep(WORK_QUEUE_CONFIG.get('poll_seconds', 2))
+            status = queue.cycle_status(cycle_id)
+        health.state.set_queue(**{f"tasks_{state}": count for state, count in status.items()})
+        health.state.stage_finished('workers', time.monotonic() - wait_start)
+        logger.info(f"Cycle {cycle_id} tasks: {status}")
+        
+        # Workers have stored their jobs; only the coordinator emails, so each job is sent once
+        try:
+            deliver_digest(db)
+        except Exception as e:
+            health.state.cycle_finished(False, error=f"{type(e).__name__}: {e}")
+            raise
+        # Failed tasks show up under sources and queue; the cycle itself still completed
+        health.state.cycle_finished(True)
+        log_stats(db)
+        auto_snapshot(db)
+        prune_archive()
+        queue.prune()
+        return status
+
+
+def run_coordinator():
+    """Enqueue a cycle of tasks every check interval"""
+    import schedule
+    
+    reload_config()
+    if not email_configured():
+        return
+    queue = get_work_queue()
+    interval = SCRAPING_CONFIG.get('check_interval_minutes', 30)
+    logger.info(f"Coordinator started, queueing work every {interval} minutes in {queue.db_path}")
+    start_health_endpoints()
+    db_path = WORK_QUEUE_CONFIG.get('db_path', 'jobs.db')
+    schedule_cycles(schedule, coordinate_cycle, queue, db_path=db_path)
+    coordinate_cycle(queue)
+    try:
+        while True:
+            health.state.heartbeat()
+            try:
+                if reload_config():
+                    schedule_cycles(schedule, coordinate_cycle, queue, db_path=db_path)
+                schedule.run_pending()
+            except Exception as e:
+                logger.error(f"Error in coordinator loop: {e}", exc_info=True)
+            time.sleep(60)
+    except KeyboardInterrupt:
+        logger.info("Stopping coordinator...")
+    finally:
+        wait_for_email()
+
+
+def process_task(db, queue, task, worker_id):
+    """Worker side of one task: scrape one page, store its new jobs, push them, then complete the task"""
+    from job_scraper import FINGERPRINT_SIZE, scrape_page
+    
+    options = scrape_options()
+    page_key = (task.source, task.keyword or '')
+    use_fingerprints = task.page == 0 and SCRAPING_CONFIG.get('page_fingerprints', True)
+    previous = db.get_fingerprints().get(page_key, []) if use_fingerprints else []
+    scraped = scrape_page(
+        task.source, task.keyword, task.page, fingerprint=previous,
+        request_delay=options['request_delay'], request_timeout=options['request_timeout'],
+        parse_workers=options['parse_workers'], archive=options['archive']
+    )
+    if scraped is None:
+        queue.fail(task, worker_id, 'no page')
+        return
+    
+    jobs, result = scraped
+    fingerprints = {page_key: (result.card_ids + previous)[:FINGERPRINT_SIZE]} if use_fingerprints else None
+    new_jobs = store_new_jobs(db, filter_jobs(jobs), fingerprints)
+    if task.page == 0:
+        db.record_query_results({page_key: result.card_ids})
+    queue.complete(task, worker_id, len(new_jobs))
+    logger.info(f"Task {task.id} ({task.source} '{task.keyword}' page {task.page}): "
+                f"{len(jobs)} jobs, {len(new_jobs)} new")
+
+
+def run_worker(sources=None, worker_id=None):
+    """Lease and process tasks from the shared queue until interrupted
+
+    sources limits the worker to some sites, e.g. to give each its own egress IP.
+    """
+    import socket
+    
+    queue = get_work_queue()
+    db = open_queue_database()
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    poll = WORK_QUEUE_CONFIG.get('poll_seconds', 2)
+    logger.info(f"Worker {worker_id} started (sources: {', '.join(sources) if sources else 'all'})")
+    try:
+        while True:
+            reload_config()
+            task = queue.lease(worker_id, sources)
+            if task is None:
+                time.sleep(poll)
+                continue
+            with log_context(cycle_id=task.cycle_id):
+                try:
+                    process_task(db, queue, task, worker_id)
+                except Exception as e:
+                    logger.error(f"Task {task.id} ({task.source} '{task.keyword}' page {task.page}) failed: {e}",
+                                 exc_info=True)
+                    queue.fail(task, worker_id, str(e))
+    except KeyboardInterrupt:
+        logger.info(f"Stopping worker {worker_id}...")
+    finally:
+        close_push_notifiers()
+
+
+def replay_archive(since: str = None, batch_size: int = 1000) -> dict:
+    """Backfill the database from archived listing pages with the current extractors
+
+    Pages (from `since`, an ISO date or time, or all of them) are parsed in
+    the parse pool in parallel and their jobs go through the exclude filter
+    and the database dedup in batches, so jobs already stored are neither
+    stored nor emailed again. Jobs found only now go out through the digest
+    like a cycle's new jobs, at most max_jobs_per_email per email, or are
+    stored as notified when ARCHIVE_CONFIG['replay_notify'] is off.
+    Returns pages, jobs, new jobs and pages per second.
+    """
+    from archive import replay_pages
+    from job_scraper import SCRAPERS, default_parse_workers, get_parse_pool, get_scraper, parse_archived
+    
+    archive = get_page_archive()
+    if archive is None:
+        raise ValueError("Set ARCHIVE_CONFIG['path'] (PAGE_ARCHIVE_DIR) to replay archived pages")
+    db = open_database()
+    workers = SCRAPING_CONFIG.get('parse_workers')
+    pool = get_parse_pool(default_parse_workers() if workers is None else workers)
+    scrapers = {key: get_scraper(key) for key in SCRAPERS}
+    pages = archive.iter_pages(since=datetime.fromisoformat(since) if since else None, sources=scrapers)
+    
+    logger.info(f"Replaying pages from {archive.directory}" + (f" since {since}" if since else ""))
+    start = time.perf_counter()
+    page_count = job_count = 0
+    batch, new_jobs = [], []
+    
+    def store_batch():
+        new_jobs.extend(db.add_jobs(filter_jobs(batch)))
+        batch.clear()
+    
+    for page, result in replay_pages(pages, parse_archived, pool):
+        jobs = scrapers[page.key].to_jobs(result.rows, page.fetched_at)
+        page_count += 1
+        job_count += len(jobs)
+        batch.extend(jobs)
+        if len(batch) >= batch_size:
+            store_batch()
+        if page_count % 1000 == 0:
+            logger.info(f"Replayed {page_count} pages ({page_count / (time.perf_counter() - start):.0f} pages/s), "
+                        f"{len(new_jobs)} new jobs so far")
+    store_batch()
+    elapsed = time.perf_counter() - start
+    pages_per_second = page_count / elapsed if elapsed > 0 else 0.0
+    logger.info(f"✅ Replayed {page_count} pages in {elapsed:.1f}s ({pages_per_second:.0f} pages/s): "
+                f"{job_count} jobs, {len(new_jobs)} new")
+    
+    if new_jobs:
+        if ARCHIVE_CONFIG.get('replay_notify', True):
+            deliver_digest(db, new_jobs)
+            wait_for_email()
+        else:
+            db.mark_many_as_notified([job.id for job in new_jobs])
+    log_stats(db)
+    return {'pages': page_count, 'jobs': job_count, 'new_jobs': len(new_jobs),
+            'seconds': round(elapsed, 3), 'pages_per_second': round(pages_per_second, 1)}
+
+
+def run_once() -> int:
+    """Single-shot mode for cron / scale-to-zero deployments: one cycle, then exit
+
+    Returns the process exit code (0 on success).
+    """
+    reload_config()
+    if not email_configured():
+        return 1
+    try:
+        check_and_notify()
+        return 0
+    except Exception:
+        return 1
+    finally:
+        wait_for_email()
+        close_push_notifiers()
+
+
 def main():
     """Main entry point"""
+    import schedule
+    
+    reload_config()
     logger.info("Job Scraper and Email Notification System")
     logger.info("=" * 60)
     logger.info(f"Starting at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     logger.info(f"Environment: {'Railway/Cloud' if os.getenv('RAILWAY_ENVIRONMENT') or os.getenv('RENDER') else 'Local'}")
     
     # Validate configuration
-    # Check if email is still the default placeholder (means not configured)
-    if EMAIL_CONFIG['sender_email'] == 'your_email@gmail.com' or not EMAIL_CONFIG['sender_email']:
-        logger.error("⚠️  Please configure your email settings in config.py or environment variables!")
-        logger.error("   Update EMAIL_CONFIG with your email credentials.")
-        logger.error("   Or set environment variables: SENDER_EMAIL, SENDER_PASSWORD, RECIPIENT_EMAIL")
+    if not email_configured():
         return
     
     # Log configuration status (without sensitive data)
@@ -209,11 +1065,22 @@ def main():
     logger.info(f"SMTP Server: {EMAIL_CONFIG['smtp_server']}:{EMAIL_CONFIG['smtp_port']}")
     logger.info(f"Check interval: {SCRAPING_CONFIG.get('check_interval_minutes', 30)} minutes")
     
+    # Expose metrics if configured
+    metrics_port = MONITORING_CONFIG.get('metrics_port')
+    if metrics_port:
+        metrics.start_metrics_server(metrics_port, MONITORING_CONFIG.get('metrics_host', '127.0.0.1'))
+    start_health_endpoints()
+    
+    # Profiling can be requested at startup or at runtime with SIGUSR1
+    if PROFILING_CONFIG.get('cycles'):
+        profiler.request(PROFILING_CONFIG['cycles'])
+    profiler.install_signal_handler()
+    
     # Schedule job checks
     interval = SCRAPING_CONFIG.get('check_interval_minutes', 30)
     logger.info(f"Scheduling job checks every {interval} minutes...")
     
-    schedule.every(interval).minutes.do(check_and_notify)
+    schedule_cycles(schedule, check_and_notify)
     
     # Run immediately on start
     logger.info("Running initial check...")
@@ -225,7 +1092,10 @@ def main():
     
     try:
         while True:
+            health.state.heartbeat()
             try:
+                if reload_config():
+                    schedule_cycles(schedule, check_and_notify)
                 schedule.run_pending()
                 time.sleep(60)  # Check every minute if any scheduled jobs are due
             except Exception as e:
@@ -239,20 +1109,36 @@ def main():
         logger.error(f"Fatal error in main loop: {e}", exc_info=True)
         logger.error("Process will exit. Check logs for details.")
         raise
+    finally:
+        wait_for_email()
+        close_push_notifiers()
 
 
 if __name__ == "__main__":
-    import sys
-    
     if len(sys.argv) > 1:
-        if sys.argv[1] == '--test-email':
+        if sys.argv[1] == '--once':
+            sys.exit(run_once())
+        elif sys.argv[1] == '--coordinator':
+            run_coordinator()
+        elif sys.argv[1] == '--worker':
+            run_worker(sys.argv[2].split(',') if len(sys.argv) > 2 else None)
+        elif sys.argv[1] == '--export-snapshot':
+            export_snapshot(sys.argv[2] if len(sys.argv) > 2 else None)
+        elif sys.argv[1] == '--import-snapshot' and len(sys.argv) > 2:
+            import_snapshot(sys.argv[2])
+        elif sys.argv[1] == '--replay':
+            replay_archive(sys.argv[2] if len(sys.argv) > 2 else None)
+        elif sys.argv[1] == '--test-email':
             test_email()
         elif sys.argv[1] == '--test':
             # Run diagnostic tests
             from test_deployment import main as run_tests
             run_tests()
+        elif sys.argv[1] == '--profile':
+            profile_cycles(int(sys.argv[2]) if len(sys.argv) > 2 else 1)
         else:
-            print("Usage: python main.py [--test-email|--test]")
+            print("Usage: python main.py [--once|--coordinator|--worker [sources]|--export-snapshot [path]|"
+                  "--import-snapshot path|--replay [since]|--test-email|--test|--profile [N]]")
             sys.exit(1)
     else:
         main()
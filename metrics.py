@@ -0,0 +1,250 @@
+"""
+Lightweight Prometheus-style metrics for the scraping pipeline
+
+Metrics are no-ops until enable() is called, so instrumented code pays only
+a flag check when metrics are turned off. start_metrics_server() exposes the
+Prometheus text format on a local /metrics endpoint from a background thread.
+"""
+
+import bisect
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+_enabled = False
+_registry: List['Metric'] = []
+
+
+def enable():
+    """Start recording metrics"""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Stop recording metrics (already recorded values are kept)"""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Sequence[str], values: Tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Metric:
+    """Base class for metrics; label values are passed positionally in labelnames order"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Monotonically increasing count"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *labelvalues, amount: float = 1):
+        if not _enabled:
+            return
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in items]
+
+
+class Gauge(Metric):
+    """Value that can go up and down"""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def set(self, value: float, *labelvalues):
+        if not _enabled:
+            return
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, labels)} {value}" for labels, value in items]
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple, List[float]] = {}
+
+    def observe(self, value: float, *labelvalues):
+        if not _enabled:
+            return
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                state = self._values[labelvalues] = [0] * (len(self.buckets) + 2)
+            state[index] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, *labelvalues):
+        """Observe the duration of the with-block"""
+        if not _enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def count(self, *labelvalues) -> int:
+        state = self._values.get(labelvalues)
+        return int(sum(state[:-1])) if state else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(labels, list(state)) for labels, state in self._values.items()]
+        lines = []
+        for labels, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), state[:-1]):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else repr(float(bound))
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {state[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+# Pipeline metrics
+FETCH_SECONDS = Histogram('jobtracker_fetch_seconds', 'Listing page fetch latency', ('source', 'keyword'))
+FETCH_REQUESTS = Counter('jobtracker_fetch_requests_total', 'Listing page requests by HTTP status', ('source', 'status'))
+FETCH_BYTES = Counter('jobtracker_fetch_bytes_total', 'Bytes downloaded from listing pages', ('source',))
+PARSE_SECONDS = Histogram('jobtracker_parse_seconds', 'Time to extract cards from one listing page', ('source',))
+CARDS = Counter('jobtracker_cards_total', 'Job cards seen on listing pages by outcome (parsed/dropped)', ('source', 'outcome'))
+FILTERED_JOBS = Counter('jobtracker_filtered_jobs_total', 'Jobs dropped by exclude keywords')
+DB_INGEST_SECONDS = Histogram('jobtracker_db_ingest_seconds', 'Time to ingest one cycle of jobs into the database')
+NEW_JOBS = Counter('jobtracker_new_jobs_total', 'Jobs accepted as new by the database')
+EMAIL_SEND_SECONDS = Histogram('jobtracker_email_send_seconds', 'Email delivery latency including retries', ('channel',))
+EMAIL_ATTEMPTS = Counter('jobtracker_email_attempts_total', 'Email delivery attempts by channel and result', ('channel', 'result'))
+CYCLE_SECONDS = Histogram('jobtracker_cycle_seconds', 'Duration of one check_and_notify cycle')
+CYCLES = Counter('jobtracker_cycles_total', 'Completed check_and_notify cycles by result', ('result',))
+PLANNED_QUERIES = Gauge('jobtracker_planned_queries', 'Searches planned for the current cycle', ('source',))
+DETAIL_REQUESTS = Counter('jobtracker_detail_requests_total', 'Job detail page requests by HTTP status', ('source', 'status'))
+DETAIL_SECONDS = Histogram('jobtracker_detail_fetch_seconds', 'Job detail page fetch latency', ('source',))
+ENRICHED_JOBS = Counter('jobtracker_enriched_jobs_total', 'Detail page lookups for new jobs by result (fetched/cached/failed)', ('source', 'result'))
+DIGEST_PENDING = Gauge('jobtracker_digest_pending_jobs', 'Jobs waiting for the next email digest')
+DIGEST_DECISIONS = Counter('jobtracker_digest_decisions_total', 'Digest send/hold decisions by reason', ('reason',))
+BREAKER_OPEN = Gauge('jobtracker_source_circuit_open', 'Whether the source is tripped (1: open or probing, 0: closed)', ('source',))
+BREAKER_TRANSITIONS = Counter('jobtracker_source_circuit_transitions_total', 'Circuit breaker state changes by new state', ('source', 'state'))
+BREAKER_SKIPPED = Counter('jobtracker_source_circuit_skipped_total', 'Listing requests not made because the source is tripped (one per search skipped)', ('source',))
+
+
+_server = None
+
+
+def metrics_handler():
+    """Request handler class serving /metrics (http.server is only imported when serving)"""
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MetricsHandler
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1'):
+    """Enable metrics and serve them on http://host:port/metrics from a daemon thread"""
+    global _server
+    enable()
+    if _server is None:
+        from http.server import ThreadingHTTPServer
+        _server = ThreadingHTTPServer((host, port), metrics_handler())
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True).start()
+        logger.info(f"Metrics available at http://{host}:{_server.server_address[1]}/metrics")
+    return _server
+
+
+def stop_metrics_server():
+    global _server
+    if _server is not None:
+        _server.shutdown()
+        _server.server_close()
+        _server = None
@@ -0,0 +1,82 @@
+"""
+Data model for job listings passed through the scrape -> filter -> store -> notify pipeline
+"""
+
+import sys
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Union
+
+
+class JobDetails(NamedTuple):
+    """Facts read from a job's detail page by the enrichment stage (None when not found)"""
+    experience_min: Optional[float] = None  # years
+    experience_max: Optional[float] = None
+    location: Optional[str] = None
+    posted_at: Optional[datetime] = None
+
+
+class Job:
+    """A single job listing
+
+    Uses __slots__ so large scrapes and notification backlogs don't pay for a
+    dict per job. Source names are interned, and scraped_at is kept as the
+    datetime of the fetch (shared by every card on the page) until it is
+    serialized.
+    """
+
+    __slots__ = ('title', 'company', 'url', 'source', 'scraped_at', 'id', 'notified', 'details')
+
+    def __init__(self, title: str, company: str = 'Unknown', url: str = '', source: str = 'Unknown',
+                 scraped_at: Union[datetime, str, None] = None, id: Optional[int] = None,
+                 notified: bool = False, details: Optional[JobDetails] = None):
+        self.title = title
+        self.company = company
+        self.url = url
+        self.source = sys.intern(source)
+        self.scraped_at = scraped_at if scraped_at is not None else datetime.now()
+        self.id = id
+        self.notified = notified
+        self.details = details
+
+    @property
+    def scraped_at_iso(self) -> str:
+        """scraped_at as an ISO 8601 string"""
+        if isinstance(self.scraped_at, datetime):
+            return self.scraped_at.isoformat()
+        return self.scraped_at
+
+    def to_dict(self) -> Dict:
+        """Serialize to a plain dict"""
+        return {
+            'id': self.id,
+            'title': self.title,
+            'company': self.company,
+            'url': self.url,
+            'source': self.source,
+            'scraped_at': self.scraped_at_iso,
+            'notified': self.notified
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Job':
+        """Build a Job from a dict with the same keys as to_dict()"""
+        return cls(
+            title=data.get('title', ''),
+            company=data.get('company', 'Unknown'),
+            url=data.get('url', ''),
+            source=data.get('source', 'Unknown'),
+            scraped_at=data.get('scraped_at'),
+            id=data.get('id'),
+            notified=bool(data.get('notified', False))
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, Job):
+            return NotImplemented
+        return self.url == other.url
+
+    def __hash__(self):
+        return hash(self.url)
+
+    def __repr__(self):
+        return f"Job(title={self.title!r}, company={self.company!r}, source={self.source!r}, url={self.url!r})"
@@ -0,0 +1,136 @@
+"""
+Notification channels for job alerts
+Defines the Notifier interface and a generic HTTP webhook channel
+"""
+
+import queue
+import threading
+import logging
+from typing import List, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from models import Job
+
+logger = logging.getLogger(__name__)
+
+
+class Notifier:
+    """Base class for notification channels
+
+    Channels that can deliver a single job the moment it is found implement
+    notify_job(); digest-style channels (like email) implement notify().
+    """
+
+    def notify_job(self, job: Job) -> bool:
+        """Push a single new job immediately. Returns False if the channel does not support it"""
+        return False
+
+    def notify(self, jobs: List[Job]) -> bool:
+        """Deliver a batch of new jobs. Override in subclasses"""
+        raise NotImplementedError
+
+    def flush(self, timeout: float = None):
+        """Wait for any queued deliveries to finish"""
+        pass
+
+    def close(self):
+        """Release any resources held by the channel"""
+        pass
+
+
+class WebhookNotifier(Notifier):
+    """Pushes each new job to an HTTP webhook as a small JSON payload
+
+    Jobs are queued and posted from a background thread over one persistent
+    keep-alive connection, so the caller (database ingest) never waits on
+    the network.
+    """
+
+    def __init__(self, url: str, headers: Dict = None, timeout: int = 10, retries: int = 2):
+        self.url = url
+        self.timeout = timeout
+        self.retries = retries
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        self.session.headers.update({'Content-Type': 'application/json'})
+        if headers:
+            self.session.headers.update(headers)
+
+        self._queue: queue.Queue = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def build_payload(job: Job) -> Dict:
+        """Build the per-job webhook payload"""
+        return {
+            'title': job.title,
+            'company': job.company,
+            'url': job.url,
+            'source': job.source
+        }
+
+    def post(self, payload: Dict) -> bool:
+        """POST one payload to the webhook, retrying on failure"""
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout)
+                if 200 <= response.status_code < 300:
+                    return True
+                logger.warning("Webhook returned status %s (attempt %d)", response.status_code, attempt + 1)
+            except Exception as e:
+                logger.warning("Webhook error (attempt %d): %s", attempt + 1, e)
+        logger.error("❌ Failed to push job to webhook: %s", payload.get('url'))
+        return False
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='webhook-notifier', daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        while True:
+            payload = self._queue.get()
+            try:
+                if payload is None:
+                    return
+                self.post(payload)
+            finally:
+                self._queue.task_done()
+
+    def notify_job(self, job: Job) -> bool:
+        """Queue a job for immediate delivery"""
+        self._ensure_worker()
+        self._queue.put(self.build_payload(job))
+        return True
+
+    def notify(self, jobs: List[Job]) -> bool:
+        """Queue every job for delivery"""
+        for job in jobs:
+            self.notify_job(job)
+        return True
+
+    def flush(self, timeout: float = None):
+        """Block until all queued jobs have been posted"""
+        if self._worker is None:
+            return
+        if timeout is None:
+            self._queue.join()
+            return
+        done = threading.Event()
+        threading.Thread(target=lambda: (self._queue.join(), done.set()), daemon=True).start()
+        if not done.wait(timeout):
+            logger.warning(f"Webhook queue not drained after {timeout}s ({self._queue.qsize()} pending)")
+
+    def close(self):
+        """Drain the queue, stop the worker and close the connection"""
+        if self._worker is not None and self._worker.is_alive():
+            self._queue.put(None)
+            self._worker.join(timeout=self.timeout * (self.retries + 1))
+            if self._worker.is_alive():
+                logger.warning("Webhook queue not drained on close (%d pending)", self._queue.qsize())
+        self.session.close()
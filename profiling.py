@@ -0,0 +1,195 @@
+"""
+Built-in profiler for check_and_notify cycles
+
+A background thread samples the cycle's call stack at a fixed interval and
+writes collapsed stacks (the input format of flamegraph.pl, speedscope and
+inferno) plus a top-N hot-function summary per pipeline stage. In
+'deterministic' mode cProfile runs as well and its .pstats file is saved.
+
+Profiling is requested per cycle, so it can be switched on in a running
+worker with a signal (SIGUSR1) without redeploying.
+"""
+
+import cProfile
+import io
+import os
+import signal
+import sys
+import threading
+import time
+import logging
+from collections import Counter, deque
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (file name, function name or None for any) -> pipeline stage
+STAGES: List[Tuple[str, Optional[str], str]] = [
+    ('main.py', 'filter_jobs', 'filter_jobs'),
+    ('job_scraper.py', None, 'scrapers'),
+    ('database.py', None, 'JobDatabase'),
+    ('email_notifier.py', None, 'EmailNotifier'),
+    ('notifier.py', None, 'notifiers'),
+]
+
+
+def frame_label(code) -> str:
+    """module:function label used in stacks and summaries"""
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}"
+
+
+def stage_of(stack: Tuple) -> str:
+    """Innermost pipeline stage a sampled stack (root first) belongs to"""
+    for code in reversed(stack):
+        filename = os.path.basename(code.co_filename)
+        for stage_file, function, stage in STAGES:
+            if filename == stage_file and (function is None or code.co_name == function):
+                return stage
+    return 'other'
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack every `interval` seconds"""
+
+    def __init__(self, interval: float = 0.005, thread_id: int = None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.thread_id = self.thread_id or threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='cycle-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                self.samples[tuple(reversed(stack))] += 1
+
+    def collapsed(self) -> List[str]:
+        """Samples in collapsed-stack format: 'root;caller;leaf count'"""
+        return [
+            f"{';'.join(frame_label(code) for code in stack)} {count}"
+            for stack, count in self.samples.most_common()
+        ]
+
+    def summary(self, top: int = 10) -> Dict[str, Dict]:
+        """Per stage: share of samples and the hottest functions by self time"""
+        total = sum(self.samples.values()) or 1
+        stages: Dict[str, Counter] = {}
+        for stack, count in self.samples.items():
+            stages.setdefault(stage_of(stack), Counter())[frame_label(stack[-1])] += count
+        return {
+            stage: {
+                'samples': sum(functions.values()),
+                'percent': round(100 * sum(functions.values()) / total, 1),
+                'seconds': round(sum(functions.values()) * self.interval, 3),
+                'hot_functions': [
+                    (name, count, round(100 * count / total, 1))
+                    for name, count in functions.most_common(top)
+                ],
+            }
+            for stage, functions in sorted(stages.items(), key=lambda item: -sum(item[1].values()))
+        }
+
+
+class CycleProfiler:
+    """Profiles requested check_and_notify cycles and writes the results to output_dir"""
+
+    def __init__(self, output_dir: str = 'profiles', mode: str = 'sample',
+                 interval: float = 0.005, top: int = 10):
+        self.output_dir = output_dir
+        self.mode = mode
+        self.interval = interval
+        self.top = top
+        self._pending = 0
+        self._lock = threading.Lock()
+        # Cycles requested by signal; appended by the handler, which must not take locks or log
+        self._signalled: deque = deque()
+
+    def request(self, cycles: int = 1):
+        """Profile the next `cycles` cycles"""
+        with self._lock:
+            self._pending += cycles
+        logger.info(f"Profiling requested for the next {cycles} cycle(s)")
+
+    def pending(self) -> bool:
+        return self._pending > 0 or bool(self._signalled)
+
+    def install_signal_handler(self, signum: int = None, cycles: int = 1):
+        """Request profiling of the next cycle(s) when the process receives signum (SIGUSR1)"""
+        signum = signum or getattr(signal, 'SIGUSR1', None)
+        if signum is None:
+            logger.warning("Signal-triggered profiling is not available on this platform")
+            return
+        # The handler interrupts the main thread, possibly inside run() while it holds self._lock
+        signal.signal(signum, lambda *_: self._signalled.append(cycles))
+
+    def run(self, cycle: Callable):
+        """Run one cycle, profiling it if profiling has been requested"""
+        while self._signalled:
+            self.request(self._signalled.popleft())
+        with self._lock:
+            profile = self._pending > 0
+            if profile:
+                self._pending -= 1
+        return self.profile(cycle) if profile else cycle()
+
+    def profile(self, cycle: Callable):
+        """Run one cycle under the profiler and write its outputs"""
+        sampler = SamplingProfiler(self.interval)
+        profiler = cProfile.Profile() if self.mode == 'deterministic' else None
+        start = time.perf_counter()
+        sampler.start()
+        if profiler:
+            profiler.enable()
+        try:
+            return cycle()
+        finally:
+            if profiler:
+                profiler.disable()
+            sampler.stop()
+            self.write(sampler, profiler, time.perf_counter() - start)
+
+    def write(self, sampler: SamplingProfiler, profiler: Optional[cProfile.Profile], elapsed: float):
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"cycle-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}")
+
+        with open(f"{base}.folded", 'w') as f:
+            f.write('\n'.join(sampler.collapsed()) + '\n')
+
+        lines = [f"Cycle wall time: {elapsed:.3f}s, {sum(sampler.samples.values())} samples "
+                 f"every {sampler.interval * 1000:.1f}ms",
+                 "Parse worker processes are not sampled; set PARSE_WORKERS=0 to include parsing."]
+        for stage, info in sampler.summary(self.top).items():
+            lines.append(f"\n[{stage}] {info['percent']}% (~{info['seconds']}s)")
+            for name, count, percent in info['hot_functions']:
+                lines.append(f"  {percent:5.1f}%  {name}")
+
+        if profiler is not None:
+            import pstats
+            profiler.dump_stats(f"{base}.pstats")
+            stream = io.StringIO()
+            pstats.Stats(profiler, stream=stream).sort_stats('cumulative').print_stats(self.top * 2)
+            lines.append("\ncProfile (cumulative):")
+            lines.append(stream.getvalue())
+
+        summary = '\n'.join(lines)
+        with open(f"{base}.txt", 'w') as f:
+            f.write(summary + '\n')
+        logger.info(f"Profile written to {base}.folded / .txt\n{summary}")
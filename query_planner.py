@@ -0,0 +1,133 @@
+"""
+Keyword query planner
+
+Decides which searches each source runs in a cycle, from the history of
+what every (source, query) search returned (JobDatabase.record_query_results):
+
+- A keyword with fewer than min_runs individual searches in the window is
+  searched on its own, so its yield and overlap can be measured.
+- The measured keywords are chosen by greedy set cover: the keyword that
+  adds the most URLs not found by the keywords chosen (or still learning)
+  so far is picked first, until none adds anything. Of keywords that find
+  the same jobs, one is kept. The others, and keywords that found nothing
+  new, are down-scheduled: they are searched on their own only once every
+  probe_hours, to notice if they become useful again.
+- On sites that understand OR queries, the remaining keywords are combined
+  into OR searches, as long as their usual number of new jobs fits well
+  inside one results page so recall is kept.
+
+Combined searches are not attributed to single keywords, so once a
+keyword's individual history leaves the window it is measured again.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Type
+
+import metrics
+from database import JobDatabase
+
+logger = logging.getLogger(__name__)
+
+
+class QueryPlanner:
+    """Plans each source's searches for the next cycle from past search results"""
+
+    def __init__(self, db: JobDatabase, window_days: float = 7, min_runs: int = 3,
+                 probe_hours: float = 12, max_or_terms: int = 4, fill_ratio: float = 0.5):
+        self.db = db
+        self.window = timedelta(days=window_days)
+        self.min_runs = min_runs
+        self.probe_interval = timedelta(hours=probe_hours)
+        self.max_or_terms = max_or_terms
+        self.fill_ratio = fill_ratio
+
+    def plan(self, scrapers: Dict[str, Type], keywords: List[str] = None) -> Dict[str, List[str]]:
+        """Search queries per source key (sources that ignore keywords are left out)"""
+        plans = {}
+        for key, scraper_class in scrapers.items():
+            if not scraper_class.uses_keywords:
+                continue
+            source_keywords = keywords or scraper_class.default_keywords or []
+            plans[key] = self.plan_source(scraper_class, source_keywords)
+            metrics.PLANNED_QUERIES.set(len(plans[key]), scraper_class.source)
+        return plans
+
+    def plan_source(self, scraper_class: Type, keywords: List[str]) -> List[str]:
+        now = datetime.now()
+        history = self.db.get_query_history(scraper_class.key, now - self.window)
+
+        learning, measured = [], []
+        for keyword in keywords:
+            stats = history.get(keyword)
+            if stats is None or stats['runs'] < self.min_runs:
+                learning.append(keyword)
+            else:
+                measured.append(keyword)
+
+        covered = set()
+        for keyword in learning:
+            if keyword in history:
+                covered |= history[keyword]['urls']
+        chosen = set(self.cover({keyword: history[keyword]['urls'] for keyword in measured}, covered))
+
+        probes, active = [], []
+        skipped = 0
+        for keyword in measured:
+            stats = history[keyword]
+            if keyword in chosen:
+                active.append((keyword, stats['cards'] / stats['runs']))
+            elif now - stats['last_run'] >= self.probe_interval:
+                probes.append(keyword)
+            else:
+                skipped += 1
+
+        queries = learning + probes
+        if scraper_class.supports_or_queries:
+            queries += [
+                group[0] if len(group) == 1 else scraper_class.combine_keywords(group)
+                for group in self.group(active, scraper_class.page_size * self.fill_ratio)
+            ]
+        else:
+            queries += [keyword for keyword, _ in active]
+
+        if len(queries) != len(keywords):
+            logger.info(
+                "Query plan for %s: %d keywords -> %d searches (%d learning, %d probing, %d down-scheduled)",
+                scraper_class.source, len(keywords), len(queries), len(learning), len(probes), skipped
+            )
+        return queries
+
+    @staticmethod
+    def cover(urls: Dict[str, set], covered: set = frozenset()) -> List[str]:
+        """Keywords that together find every URL in urls not already covered, chosen greedily
+
+        Each step picks the keyword adding the most uncovered URLs (the
+        earlier one on a tie); keywords that add nothing are left out.
+        """
+        covered = set(covered)
+        remaining = dict(urls)
+        chosen = []
+        while remaining:
+            keyword = max(remaining, key=lambda k: len(remaining[k] - covered))
+            found = remaining.pop(keyword)
+            if not found - covered:
+                break
+            chosen.append(keyword)
+            covered |= found
+        return chosen
+
+    def group(self, keywords: List[tuple], capacity: float) -> List[List[str]]:
+        """Pack (keyword, new jobs per search) into groups whose expected new jobs fit within capacity"""
+        groups: List[List[str]] = []
+        current: List[str] = []
+        load = 0.0
+        for keyword, per_run in sorted(keywords, key=lambda item: item[1]):
+            if current and (load + per_run > capacity or len(current) >= self.max_or_terms):
+                groups.append(current)
+                current, load = [], 0.0
+            current.append(keyword)
+            load += per_run
+        if current:
+            groups.append(current)
+        return groups
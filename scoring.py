@@ -0,0 +1,148 @@
+"""
+Relevance scoring of job titles
+
+Titles are turned into hashed bag-of-words features (words and adjacent word
+pairs, so 'new grad' counts as a phrase) weighted by TF-IDF over the batch being
+scored (or over a larger corpus given as document frequencies, so batches
+scored separately compare), and compared with a profile built from JOB_KEYWORDS
+by cosine similarity. A whole batch is scored with a handful of NumPy operations on
+the sparse (job, feature) pairs, so thousands of titles take milliseconds.
+
+NumPy is imported on first use; without it jobs are left in their original
+order.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import logging
+from typing import TYPE_CHECKING, Iterable, List, Optional, Tuple
+
+from models import Job
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Words, and the NUL separator placed between texts
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*|\x00")
+_SEPARATOR_HASH = hash('\x00')
+DEFAULT_FEATURES = 2 ** 18
+# Multiplier combining two word hashes into a word-pair hash
+_PAIR_PRIME = 1000003
+
+
+def hashed_features(texts: List[str], mask: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(text index, feature) arrays with one entry per word and per adjacent word pair
+
+    All texts are tokenized by one regex pass over their NUL-joined
+    concatenation; text indices and word-pair features are then derived
+    from the word hashes with array operations. hash() is salted per
+    process, which is fine: features are never stored.
+    """
+    import numpy as np
+
+    tokens = _TOKEN.findall('\x00'.join(texts).lower())
+    hashes = np.fromiter(map(hash, tokens), dtype=np.int64, count=len(tokens))
+    separator = hashes == _SEPARATOR_HASH
+    row_of = np.cumsum(separator)[~separator]
+    word = hashes[~separator]
+    same_text = row_of[1:] == row_of[:-1]
+    pair = (word[:-1][same_text] * _PAIR_PRIME) ^ word[1:][same_text]
+    return np.concatenate([row_of, row_of[:-1][same_text]]), np.concatenate([word, pair]) & mask
+
+
+class RelevanceScorer:
+    """Scores job titles against a keyword profile"""
+
+    def __init__(self, keywords: Iterable[str], n_features: int = DEFAULT_FEATURES):
+        import numpy as np
+
+        self.n_features = n_features
+        self._mask = n_features - 1
+        if n_features & self._mask:
+            raise ValueError("n_features must be a power of two")
+        # Sorted and unique, so the profile weight of any feature is one searchsorted away
+        self._profile = np.unique(hashed_features(list(keywords), self._mask)[1])
+
+    def document_frequencies(self, titles: List[str]) -> np.ndarray:
+        """Number of titles containing each feature (an n_features array); add them up across batches"""
+        import numpy as np
+
+        rows, cols = hashed_features(titles, self._mask)
+        features = np.unique(rows * self.n_features + cols) % self.n_features
+        return np.bincount(features, minlength=self.n_features)
+
+    def score(self, titles: List[str], df: np.ndarray = None, total: int = None) -> np.ndarray:
+        """Cosine similarity (0..1) of each title's TF-IDF vector with the profile
+
+        IDF is taken from the titles themselves, or from df, the
+        document_frequencies of a corpus of total titles they belong to:
+        scores computed with the same df are comparable across calls, and
+        equal to scoring the whole corpus at once.
+        """
+        import numpy as np
+
+        count = len(titles)
+        if count == 0 or len(self._profile) == 0:
+            return np.zeros(count)
+
+        rows, cols = hashed_features(titles, self._mask)
+        if len(cols) == 0:
+            return np.zeros(count)
+
+        # One entry per distinct (title, feature) with its term frequency
+        pairs, tf = np.unique(rows * self.n_features + cols, return_counts=True)
+        row_of, col_of = np.divmod(pairs, self.n_features)
+        features, inverse, batch_df = np.unique(col_of, return_inverse=True, return_counts=True)
+        position = np.searchsorted(features, self._profile)
+        position[position == len(features)] = 0
+        present = features[position] == self._profile
+        if df is None:
+            total = count
+            feature_df = batch_df
+            profile_df = np.where(present, batch_df[position], 0)
+        else:
+            feature_df = df[features]
+            profile_df = df[self._profile]
+        idf = np.log((total + 1) / (feature_df + 1)) + 1
+        weights = (1 + np.log(tf)) * idf[inverse]
+
+        # Profile features: weighted by their idf (the maximum idf if no title has them)
+        profile_idf = np.log((total + 1) / (profile_df + 1)) + 1
+        in_profile = np.zeros(len(features))
+        in_profile[position[present]] = idf[position[present]]
+
+        dot = np.bincount(row_of, weights=weights * in_profile[inverse], minlength=count)
+        norms = np.sqrt(np.bincount(row_of, weights=weights * weights, minlength=count))
+        norms *= math.sqrt(float(np.dot(profile_idf, profile_idf)))
+        return np.divide(dot, norms, out=np.zeros(count), where=norms > 0)
+
+    def rank(self, jobs: List[Job]) -> List[Job]:
+        """Jobs ordered by descending relevance; ties keep their original order"""
+        import numpy as np
+
+        if len(jobs) < 2:
+            return list(jobs)
+        scores = self.score([job.title for job in jobs])
+        return [jobs[i] for i in np.argsort(-scores, kind='stable')]
+
+
+_scorer: Optional[RelevanceScorer] = None
+_scorer_keywords: tuple = ()
+
+
+def get_scorer(keywords: Iterable[str]) -> Optional[RelevanceScorer]:
+    """Scorer for the keywords, reused while they stay the same; None if NumPy is not installed"""
+    global _scorer, _scorer_keywords
+    keywords = tuple(keywords)
+    if _scorer is None or keywords != _scorer_keywords:
+        try:
+            _scorer = RelevanceScorer(keywords)
+        except ImportError:
+            logger.warning("numpy is not installed, jobs will not be ranked by relevance")
+            return None
+        _scorer_keywords = keywords
+    return _scorer
@@ -0,0 +1,160 @@
+"""
+Binary snapshot of the seen-jobs (dedup) state
+
+A snapshot holds one 64-bit hash per job URL plus its notified flag, so a
+fresh deployment whose jobs.db starts empty can still tell which jobs it
+has already seen and emailed. Layout (little-endian):
+
+    header   8-byte magic b'JOBSNAP1', uint64 count
+    hashes   count x uint64, sorted ascending
+    flags    count x uint8 (bit 0: notified)
+
+The file is memory-mapped and searched with bisect, so opening it costs the
+same for 100 or 10 million jobs and lookups touch only a few pages.
+"""
+
+import bisect
+import hashlib
+import mmap
+import os
+import sys
+import logging
+from array import array
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'JOBSNAP1'
+HEADER_SIZE = 16
+NOTIFIED = 1
+
+
+def url_hash(url: str) -> int:
+    """64-bit hash of a job URL"""
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class Snapshot:
+    """Read-only view of a snapshot file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:8] != MAGIC or len(self._mmap) < HEADER_SIZE:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a job snapshot")
+        count = int.from_bytes(self._mmap[8:16], 'little')
+        size = len(self._mmap)
+        if size != HEADER_SIZE + count * 9:
+            self._mmap.close()
+            raise ValueError(f"{path} is truncated ({size} bytes for {count} entries)")
+
+        view = memoryview(self._mmap)
+        if sys.byteorder == 'little':
+            self._hashes = view[HEADER_SIZE:HEADER_SIZE + count * 8].cast('Q')
+        else:
+            self._hashes = array('Q', view[HEADER_SIZE:HEADER_SIZE + count * 8])
+            self._hashes.byteswap()
+        self._flags = view[HEADER_SIZE + count * 8:]
+        self._view = view
+        self.stat = os.stat(path)
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def _index(self, url: str) -> int:
+        value = url_hash(url)
+        index = bisect.bisect_left(self._hashes, value)
+        if index < len(self._hashes) and self._hashes[index] == value:
+            return index
+        return -1
+
+    def __contains__(self, url: str) -> bool:
+        return self._index(url) >= 0
+
+    def is_notified(self, url: str) -> bool:
+        index = self._index(url)
+        return index >= 0 and bool(self._flags[index] & NOTIFIED)
+
+    def items(self) -> Iterator[Tuple[int, bool]]:
+        """(url hash, notified) for every entry"""
+        for value, flags in zip(self._hashes, self._flags):
+            yield value, bool(flags & NOTIFIED)
+
+    def close(self):
+        if isinstance(self._hashes, memoryview):
+            self._hashes.release()
+        self._flags.release()
+        self._view.release()
+        self._mmap.close()
+
+
+def write_snapshot(path: str, entries: Iterable[Tuple[int, bool]]) -> int:
+    """Write (url hash, notified) entries to path; returns the number of entries
+
+    Duplicate hashes are merged (notified if any copy is). The file is
+    written to a temporary name and renamed, so readers never see a partial
+    snapshot.
+    """
+    merged: Dict[int, bool] = {}
+    for value, notified in entries:
+        merged[value] = merged.get(value, False) or notified
+    hashes = array('Q', sorted(merged))
+    flags = bytes(NOTIFIED if merged[value] else 0 for value in hashes)
+    if sys.byteorder != 'little':
+        hashes.byteswap()
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(len(merged).to_bytes(8, 'little'))
+        f.write(hashes.tobytes())
+        f.write(flags)
+    # An open snapshot of the same path is closed first (Windows cannot replace a mapped file)
+    cached = _snapshots.pop(os.path.abspath(path), None)
+    if cached is not None:
+        cached.close()
+    os.replace(temp_path, path)
+    return len(merged)
+
+
+def export_entries(db, base: Optional[Snapshot] = None) -> Iterator[Tuple[int, bool]]:
+    """Entries for every job in db, plus those of an older snapshot so state survives several redeploys"""
+    if base is not None:
+        yield from base.items()
+    for url, notified in db.iter_seen():
+        yield url_hash(url), notified
+
+
+_snapshots: Dict[str, Snapshot] = {}
+
+
+def open_snapshot(path: str) -> Optional[Snapshot]:
+    """Snapshot at path, shared within the process and reopened when the file changes
+
+    Returns None if the file does not exist or cannot be read.
+    """
+    key = os.path.abspath(path)
+    cached = _snapshots.get(key)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    if cached is not None:
+        if (stat.st_ino, stat.st_mtime_ns, stat.st_size) == (
+                cached.stat.st_ino, cached.stat.st_mtime_ns, cached.stat.st_size):
+            return cached
+        cached.close()
+        del _snapshots[key]
+    try:
+        snapshot = Snapshot(path)
+    except (OSError, ValueError) as e:
+        logger.error("Cannot load snapshot %s: %s", path, e)
+        return None
+    _snapshots[key] = snapshot
+    logger.info("Loaded snapshot %s (%d jobs)", path, len(snapshot))
+    return snapshot
@@ -0,0 +1,675 @@
+"""
+Storage backends for JobDatabase
+
+Every backend implements StorageBackend: bulk ingest with URL dedup,
+exists-many, mark-notified-many, unnotified jobs, stats and search, plus the
+page fingerprints and query history used by the scrapers and the query
+planner.
+
+- SQLiteBackend: jobs.db, shared between processes (required for --worker mode)
+- MemoryBackend: dicts in this process; nothing survives a restart, which
+  suits ephemeral containers that lose jobs.db anyway
+- AppendLogBackend: MemoryBackend state made durable as an append-only
+  JSON-lines log that is replayed on startup and can be compacted
+"""
+
+import bisect
+import json
+import os
+import sqlite3
+import threading
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from models import Job
+
+logger = logging.getLogger(__name__)
+
+PageKey = Tuple[str, str]
+
+# Max parameters per IN (...) query, below SQLite's default limit
+SQLITE_CHUNK = 500
+# Rows read per query when iterating over the whole table
+SQLITE_PAGE = 1000
+# Seconds a connection waits for another process's write lock (sqlite3's default)
+SQLITE_TIMEOUT = 5.0
+# The log is compacted once it holds this many records more than twice its compacted size
+LOG_COMPACT_SLACK = 1000
+
+
+class StorageBackend:
+    """Interface for job storage backends"""
+
+    name = 'base'
+
+    def add_jobs(self, jobs: List[Job], on_new: Optional[Callable[[Job], None]] = None,
+                 fingerprints: Dict[PageKey, List[str]] = None) -> List[Job]:
+        """Store jobs whose URL is not stored yet, set their id, and return them
+
+        on_new is called with each new job once the batch is stored, so a
+        batch that fails is never pushed; fingerprints are saved together
+        with the jobs.
+        """
+        raise NotImplementedError
+
+    def exists_many(self, urls: Iterable[str]) -> Set[str]:
+        """The subset of urls that are already stored"""
+        raise NotImplementedError
+
+    def mark_notified_many(self, job_ids: List[int]):
+        raise NotImplementedError
+
+    def iter_seen(self) -> Iterator[Tuple[str, bool]]:
+        """(url, notified) for every stored job"""
+        raise NotImplementedError
+
+    def get_unnotified_jobs(self, limit: int = None, before_id: int = None) -> List[Job]:
+        """Jobs not notified yet, newest (highest id) first
+
+        With limit, at most that many; with before_id, only jobs with a lower
+        id, so the ids of one page are the cursor for the next.
+        """
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict:
+        """{'total_jobs', 'unnotified_jobs', 'notified_jobs'}"""
+        raise NotImplementedError
+
+    def search(self, text: str, source: str = None, limit: int = 50) -> List[Job]:
+        """Newest jobs whose title or company contains text (case-insensitive)"""
+        raise NotImplementedError
+
+    def get_fingerprints(self) -> Dict[PageKey, List[str]]:
+        raise NotImplementedError
+
+    def record_query_results(self, results: Dict[PageKey, List[str]], retention_days: int = 30):
+        raise NotImplementedError
+
+    def get_query_history(self, source: str, since: datetime) -> Dict[str, Dict]:
+        """Per query of a source since `since`: runs, cards, the set of URLs found and the last run time"""
+        raise NotImplementedError
+
+    def ensure_schema(self):
+        """Recreate the schema if the storage was deleted or replaced since it was opened"""
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def _notify_new(job: Job, on_new: Optional[Callable[[Job], None]]):
+        if on_new is not None:
+            try:
+                on_new(job)
+            except Exception as e:
+                logger.error("Error in new job callback: %s", e)
+
+
+class SQLiteBackend(StorageBackend):
+    """Jobs, fingerprints and query history in a SQLite file"""
+
+    name = 'sqlite'
+
+    def __init__(self, db_path: str = "jobs.db", timeout: float = SQLITE_TIMEOUT):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.init_database()
+
+    def connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=self.timeout)
+
+    def ensure_schema(self):
+        # jobs.db may be deleted to reset tracking while a long-running process holds this backend
+        conn = self.connect()
+        try:
+            exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jobs'").fetchone()
+        finally:
+            conn.close()
+        if not exists:
+            logger.info("Database file %s was deleted or replaced, initializing it again", self.db_path)
+            self.init_database()
+
+    def init_database(self):
+        """Initialize the database with required tables"""
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                company TEXT,
+                url TEXT UNIQUE NOT NULL,
+                source TEXT,
+                scraped_at TEXT,
+                notified INTEGER DEFAULT 0,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_url ON jobs(url)
+        ''')
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_notified ON jobs(notified)
+        ''')
+
+        # Card ids seen on each (source, keyword) listing page at its last fetch
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS page_fingerprints (
+                source TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                card_ids TEXT NOT NULL,
+                updated_at TEXT,
+                PRIMARY KEY (source, keyword)
+            )
+        ''')
+
+        # Per-query search history: one row per fetched (source, query) page,
+        # and the new job URLs it returned
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS query_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT NOT NULL,
+                query TEXT NOT NULL,
+                run_at TEXT NOT NULL,
+                cards INTEGER NOT NULL
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_query_runs ON query_runs(source, run_at)
+        ''')
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS query_hits (
+                run_id INTEGER NOT NULL REFERENCES query_runs(id),
+                url TEXT NOT NULL
+            )
+        ''')
+
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_query_hits ON query_hits(run_id)
+        ''')
+
+        conn.commit()
+        conn.close()
+        logger.info("Database initialized")
+
+    def add_jobs(self, jobs: List[Job], on_new: Optional[Callable[[Job], None]] = None,
+                 fingerprints: Dict[PageKey, List[str]] = None) -> List[Job]:
+        """All jobs are inserted over one connection; the UNIQUE url constraint does the dedup"""
+        new_jobs = []
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        try:
+            for job in jobs:
+                cursor.execute('''
+                    INSERT OR IGNORE INTO jobs (title, company, url, source, scraped_at, notified)
+                    VALUES (?, ?, ?, ?, ?, 0)
+                ''', (job.title, job.company, job.url, job.source, job.scraped_at_iso))
+                if cursor.rowcount != 1:
+                    continue
+                job.id = cursor.lastrowid
+                new_jobs.append(job)
+            if fingerprints:
+                self._save_fingerprints(cursor, fingerprints)
+            conn.commit()
+        except sqlite3.OperationalError as e:
+            # A missing table or a locked database is not a bad batch: let the cycle fail
+            conn.rollback()
+            if 'locked' in str(e):
+                logger.error("Database %s stayed locked for %ss, %d jobs were not stored",
+                             self.db_path, self.timeout, len(jobs))
+            raise
+        except Exception as e:
+            logger.error(f"Error adding jobs to database: {e}")
+            conn.rollback()
+            new_jobs = []
+        finally:
+            conn.close()
+        for job in new_jobs:
+            self._notify_new(job, on_new)
+        return new_jobs
+
+    def exists_many(self, urls: Iterable[str]) -> Set[str]:
+        urls = list(urls)
+        found = set()
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        for start in range(0, len(urls), SQLITE_CHUNK):
+            chunk = urls[start:start + SQLITE_CHUNK]
+            cursor.execute(f"SELECT url FROM jobs WHERE url IN ({','.join('?' * len(chunk))})", chunk)
+            found.update(url for url, in cursor)
+
+        conn.close()
+        return found
+
+    def mark_notified_many(self, job_ids: List[int]):
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        cursor.executemany('UPDATE jobs SET notified = 1 WHERE id = ?', [(job_id,) for job_id in job_ids])
+        conn.commit()
+        conn.close()
+
+    def iter_seen(self) -> Iterator[Tuple[str, bool]]:
+        # Paged by id with a connection per page, so a slow consumer holds no read transaction open
+        last_id = 0
+        while True:
+            conn = self.connect()
+            try:
+                rows = conn.execute('SELECT id, url, notified FROM jobs WHERE id > ? ORDER BY id LIMIT ?',
+                                    (last_id, SQLITE_PAGE)).fetchall()
+            finally:
+                conn.close()
+            for last_id, url, notified in rows:
+                yield url, bool(notified)
+            if len(rows) < SQLITE_PAGE:
+                return
+
+    def get_unnotified_jobs(self, limit: int = None, before_id: int = None) -> List[Job]:
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        sql = 'SELECT id, title, company, url, source, scraped_at FROM jobs WHERE notified = 0'
+        params: list = []
+        if before_id is not None:
+            sql += ' AND id < ?'
+            params.append(before_id)
+        sql += ' ORDER BY id DESC'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        cursor.execute(sql, params)
+
+        jobs = [
+            Job(title, company, url, source, scraped_at, id=job_id)
+            for job_id, title, company, url, source, scraped_at in cursor
+        ]
+
+        conn.close()
+        return jobs
+
+    def get_stats(self) -> Dict:
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT COUNT(*), COALESCE(SUM(notified), 0) FROM jobs')
+        total, notified = cursor.fetchone()
+
+        conn.close()
+
+        return {
+            'total_jobs': total,
+            'unnotified_jobs': total - notified,
+            'notified_jobs': notified
+        }
+
+    def search(self, text: str, source: str = None, limit: int = 50) -> List[Job]:
+        pattern = f"%{text}%"
+        sql = '''
+            SELECT id, title, company, url, source, scraped_at, notified
+            FROM jobs WHERE (title LIKE ? OR company LIKE ?)
+        '''
+        params: list = [pattern, pattern]
+        if source:
+            sql += ' AND source = ?'
+            params.append(source)
+        sql += ' ORDER BY id DESC LIMIT ?'
+        params.append(limit)
+
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        jobs = [
+            Job(title, company, url, source, scraped_at, id=job_id, notified=bool(notified))
+            for job_id, title, company, url, source, scraped_at, notified in cursor
+        ]
+        conn.close()
+        return jobs
+
+    def get_fingerprints(self) -> Dict[PageKey, List[str]]:
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT source, keyword, card_ids FROM page_fingerprints')
+        fingerprints = {(source, keyword): json.loads(card_ids) for source, keyword, card_ids in cursor}
+
+        conn.close()
+        return fingerprints
+
+    @staticmethod
+    def _save_fingerprints(cursor: sqlite3.Cursor, fingerprints: Dict[PageKey, List[str]]):
+        updated_at = datetime.now().isoformat()
+        cursor.executemany('''
+            INSERT OR REPLACE INTO page_fingerprints (source, keyword, card_ids, updated_at)
+            VALUES (?, ?, ?, ?)
+        ''', [
+            (source, keyword, json.dumps(card_ids), updated_at)
+            for (source, keyword), card_ids in fingerprints.items()
+        ])
+
+    def record_query_results(self, results: Dict[PageKey, List[str]], retention_days: int = 30):
+        run_at = datetime.now().isoformat()
+        cutoff = (datetime.now() - timedelta(days=retention_days)).isoformat()
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        for (source, query), urls in results.items():
+            cursor.execute(
+                'INSERT INTO query_runs (source, query, run_at, cards) VALUES (?, ?, ?, ?)',
+                (source, query, run_at, len(urls))
+            )
+            run_id = cursor.lastrowid
+            cursor.executemany('INSERT INTO query_hits (run_id, url) VALUES (?, ?)', [(run_id, url) for url in urls])
+
+        cursor.execute('DELETE FROM query_hits WHERE run_id IN (SELECT id FROM query_runs WHERE run_at < ?)', (cutoff,))
+        cursor.execute('DELETE FROM query_runs WHERE run_at < ?', (cutoff,))
+        conn.commit()
+        conn.close()
+
+    def get_query_history(self, source: str, since: datetime) -> Dict[str, Dict]:
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        history = {}
+        cursor.execute('''
+            SELECT query, COUNT(*), SUM(cards), MAX(run_at)
+            FROM query_runs WHERE source = ? AND run_at >= ? GROUP BY query
+        ''', (source, since.isoformat()))
+        for query, runs, cards, last_run in cursor.fetchall():
+            history[query] = {
+                'runs': runs,
+                'cards': cards,
+                'urls': set(),
+                'last_run': datetime.fromisoformat(last_run),
+            }
+
+        cursor.execute('''
+            SELECT r.query, h.url FROM query_hits h JOIN query_runs r ON r.id = h.run_id
+            WHERE r.source = ? AND r.run_at >= ?
+        ''', (source, since.isoformat()))
+        for query, url in cursor:
+            history[query]['urls'].add(url)
+
+        conn.close()
+        return history
+
+
+class MemoryBackend(StorageBackend):
+    """Everything in dicts in this process"""
+
+    name = 'memory'
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._by_url: Dict[str, Job] = {}
+        self._by_id: Dict[int, Job] = {}
+        self._next_id = 1
+        self._notified = 0
+        # Ids of unnotified jobs, ascending, so a page before any id is a slice
+        self._unnotified: List[int] = []
+        self._fingerprints: Dict[PageKey, List[str]] = {}
+        # (source, query, run_at, urls)
+        self._query_runs: List[Tuple[str, str, datetime, List[str]]] = []
+
+    def _insert(self, job: Job) -> bool:
+        if job.url in self._by_url:
+            return False
+        if job.id is None:
+            job.id = self._next_id
+        self._next_id = max(self._next_id, job.id + 1)
+        self._by_url[job.url] = self._by_id[job.id] = job
+        if job.notified:
+            self._notified += 1
+        else:
+            bisect.insort(self._unnotified, job.id)
+        return True
+
+    def add_jobs(self, jobs: List[Job], on_new: Optional[Callable[[Job], None]] = None,
+                 fingerprints: Dict[PageKey, List[str]] = None) -> List[Job]:
+        new_jobs = []
+        with self._lock:
+            for job in jobs:
+                # Duplicates are left as the caller passed them
+                if job.url in self._by_url:
+                    continue
+                job.id = None
+                job.notified = False
+                self._insert(job)
+                new_jobs.append(job)
+            if fingerprints:
+                self._fingerprints.update(fingerprints)
+        for job in new_jobs:
+            self._notify_new(job, on_new)
+        return new_jobs
+
+    def exists_many(self, urls: Iterable[str]) -> Set[str]:
+        by_url = self._by_url
+        return {url for url in urls if url in by_url}
+
+    def mark_notified_many(self, job_ids: List[int]):
+        with self._lock:
+            marked = []
+            for job_id in job_ids:
+                job = self._by_id.get(job_id)
+                if job is not None and not job.notified:
+                    job.notified = True
+                    self._notified += 1
+                    marked.append(job_id)
+            if len(marked) > 64:
+                # One pass instead of a list shift per id
+                self._unnotified = [job_id for job_id in self._unnotified if not self._by_id[job_id].notified]
+                return
+            for job_id in marked:
+                del self._unnotified[bisect.bisect_left(self._unnotified, job_id)]
+
+    def iter_seen(self) -> Iterator[Tuple[str, bool]]:
+        with self._lock:
+            seen = [(url, job.notified) for url, job in self._by_url.items()]
+        return iter(seen)
+
+    def get_unnotified_jobs(self, limit: int = None, before_id: int = None) -> List[Job]:
+        with self._lock:
+            ids = self._unnotified
+            end = len(ids) if before_id is None else bisect.bisect_left(ids, before_id)
+            start = 0 if limit is None else max(0, end - limit)
+            return [self._by_id[job_id] for job_id in reversed(ids[start:end])]
+
+    def get_stats(self) -> Dict:
+        total = len(self._by_id)
+        return {
+            'total_jobs': total,
+            'unnotified_jobs': total - self._notified,
+            'notified_jobs': self._notified
+        }
+
+    def search(self, text: str, source: str = None, limit: int = 50) -> List[Job]:
+        text = text.lower()
+        results = []
+        with self._lock:
+            for job in reversed(self._by_id.values()):
+                if source and job.source != source:
+                    continue
+                if text in job.title.lower() or text in (job.company or '').lower():
+                    results.append(job)
+                    if len(results) >= limit:
+                        break
+        return results
+
+    def get_fingerprints(self) -> Dict[PageKey, List[str]]:
+        with self._lock:
+            return dict(self._fingerprints)
+
+    def record_query_results(self, results: Dict[PageKey, List[str]], retention_days: int = 30,
+                             run_at: datetime = None):
+        run_at = run_at or datetime.now()
+        cutoff = datetime.now() - timedelta(days=retention_days)
+        with self._lock:
+            for (source, query), urls in results.items():
+                self._query_runs.append((source, query, run_at, list(urls)))
+            self._query_runs = [run for run in self._query_runs if run[2] >= cutoff]
+
+    def get_query_history(self, source: str, since: datetime) -> Dict[str, Dict]:
+        history = {}
+        with self._lock:
+            for run_source, query, run_at, urls in self._query_runs:
+                if run_source != source or run_at < since:
+                    continue
+                stats = history.setdefault(query, {'runs': 0, 'cards': 0, 'urls': set(), 'last_run': run_at})
+                stats['runs'] += 1
+                stats['cards'] += len(urls)
+                stats['urls'].update(urls)
+                stats['last_run'] = max(stats['last_run'], run_at)
+        return history
+
+
+class AppendLogBackend(MemoryBackend):
+    """MemoryBackend persisted as an append-only JSON-lines log
+
+    Each change is one line ('job', 'notified', 'fingerprints', 'queries');
+    the log is replayed into memory on startup, so lookups never touch disk.
+    compact() rewrites the log as the current state; it runs on its own,
+    on startup or while appending, once the log grows past twice its
+    compacted size (or job count) plus LOG_COMPACT_SLACK records.
+    """
+
+    name = 'log'
+
+    def __init__(self, path: str = "jobs.jsonl"):
+        super().__init__()
+        self.path = path
+        self._records = 0
+        self._compacted = 0
+        self._replay()
+        self._file = open(self.path, 'a', encoding='utf-8')
+        self._maybe_compact()
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write
+                    logger.warning("Skipping unreadable record in %s", self.path)
+                    continue
+                self._apply(record)
+                self._records += 1
+        logger.info("Loaded %d jobs from %s", len(self._by_id), self.path)
+
+    def _apply(self, record: Dict):
+        kind = record['t']
+        if kind == 'job':
+            self._insert(Job.from_dict(record))
+        elif kind == 'notified':
+            MemoryBackend.mark_notified_many(self, record['ids'])
+        elif kind == 'fingerprints':
+            self._fingerprints.update({(source, keyword): ids for source, keyword, ids in record['items']})
+        elif kind == 'queries':
+            MemoryBackend.record_query_results(
+                self, {(source, query): urls for source, query, urls in record['items']},
+                run_at=datetime.fromisoformat(record['run_at'])
+            )
+
+    def _append(self, records: List[Dict]):
+        if records:
+            self._file.write(''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records))
+            self._file.flush()
+            self._records += len(records)
+            self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self._records > 2 * max(self._compacted, len(self._by_id)) + LOG_COMPACT_SLACK:
+            self.compact()
+
+    def add_jobs(self, jobs: List[Job], on_new: Optional[Callable[[Job], None]] = None,
+                 fingerprints: Dict[PageKey, List[str]] = None) -> List[Job]:
+        with self._lock:
+            new_jobs = super().add_jobs(jobs, None, fingerprints)
+            records = [dict(job.to_dict(), t='job') for job in new_jobs]
+            if fingerprints:
+                records.append({'t': 'fingerprints', 'items': [
+                    [source, keyword, ids] for (source, keyword), ids in fingerprints.items()
+                ]})
+            self._append(records)
+        for job in new_jobs:
+            self._notify_new(job, on_new)
+        return new_jobs
+
+    def mark_notified_many(self, job_ids: List[int]):
+        with self._lock:
+            super().mark_notified_many(job_ids)
+            self._append([{'t': 'notified', 'ids': list(job_ids)}])
+
+    def record_query_results(self, results: Dict[PageKey, List[str]], retention_days: int = 30,
+                             run_at: datetime = None):
+        run_at = run_at or datetime.now()
+        with self._lock:
+            super().record_query_results(results, retention_days, run_at)
+            self._append([{'t': 'queries', 'run_at': run_at.isoformat(), 'items': [
+                [source, query, urls] for (source, query), urls in results.items()
+            ]}])
+
+    def compact(self):
+        """Rewrite the log as one record per job plus current fingerprints and query history"""
+        with self._lock:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                for job in self._by_id.values():
+                    f.write(json.dumps(dict(job.to_dict(), t='job'), separators=(',', ':')) + '\n')
+                if self._fingerprints:
+                    f.write(json.dumps({'t': 'fingerprints', 'items': [
+                        [source, keyword, ids] for (source, keyword), ids in self._fingerprints.items()
+                    ]}) + '\n')
+                runs: Dict[datetime, list] = {}
+                for source, query, run_at, urls in self._query_runs:
+                    runs.setdefault(run_at, []).append([source, query, urls])
+                for run_at, items in runs.items():
+                    f.write(json.dumps({'t': 'queries', 'run_at': run_at.isoformat(), 'items': items}) + '\n')
+            self._file.close()
+            os.replace(temp_path, self.path)
+            self._file = open(self.path, 'a', encoding='utf-8')
+            self._records = self._compacted = len(self._by_id) + bool(self._fingerprints) + len(runs)
+            logger.info("Compacted %s to %d records", self.path, self._records)
+
+    def close(self):
+        self._file.close()
+
+
+BACKENDS = {
+    'sqlite': SQLiteBackend,
+    'memory': MemoryBackend,
+    'log': AppendLogBackend,
+}
+
+_backends: Dict[Tuple[str, str], StorageBackend] = {}
+
+
+def get_backend(kind: str = 'sqlite', db_path: str = "jobs.db") -> StorageBackend:
+    """Backend for (kind, db_path)
+
+    Memory and log backends keep their state in the instance, so one
+    instance per path is shared by every JobDatabase in the process; the log
+    backend keeps its log next to db_path as .jsonl.
+    """
+    if kind not in BACKENDS:
+        raise ValueError(f"Unknown storage backend {kind!r} (expected one of {', '.join(BACKENDS)})")
+    if kind == 'sqlite':
+        # Stateless apart from the file, so nothing to share
+        return SQLiteBackend(db_path)
+    key = (kind, os.path.abspath(db_path))
+    backend = _backends.get(key)
+    if backend is None:
+        if kind == 'log':
+            backend = AppendLogBackend(os.path.splitext(db_path)[0] + '.jsonl')
+        else:
+            backend = MemoryBackend()
+        _backends[key] = backend
+    return backend
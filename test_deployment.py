@@ -23,11 +23,9 @@ except ImportError:
 from email_notifier import EmailNotifier
 from job_scraper import scrape_all_jobs
 from database import JobDatabase
+from log_config import setup_logging
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+setup_logging(log_file='')
 logger = logging.getLogger(__name__)
 
 
@@ -107,7 +105,7 @@ def test_scrapers():
         if jobs:
             logger.info("\nSample jobs:")
             for i, job in enumerate(jobs[:3], 1):
-                logger.info(f"  {i}. {job.get('title', 'N/A')} at {job.get('company', 'Unknown')} ({job.get('source', 'Unknown')})")
+                logger.info(f"  {i}. {job.title} at {job.company} ({job.source})")
         
         return len(jobs) > 0
         
@@ -0,0 +1,134 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+import main
+from archive import PageArchive, read_page, replay_pages
+from job_scraper import SCRAPERS, get_scraper
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+
+
+def fixture(key):
+    with open(os.path.join(FIXTURES, f"{key}.html"), 'rb') as f:
+        return f.read()
+
+
+def test_store_iterate_and_prune(tmp_path):
+    archive = PageArchive(str(tmp_path / 'archive'))
+    now = datetime.now().replace(microsecond=0)
+    old = now - timedelta(days=30)
+    archive.store('linkedin', 'new grad', 0, now, b'<html>today</html>')
+    archive.store('indeed', 'new grad', 0, now - timedelta(seconds=1), b'<html>indeed</html>')
+    archive.store('linkedin', 'new grad', 0, old, b'<html>old</html>')
+
+    pages = list(archive.iter_pages())
+    assert [(page.key, page.fetched_at) for page in pages] == [
+        ('linkedin', old), ('indeed', now - timedelta(seconds=1)), ('linkedin', now)
+    ]
+    assert read_page(pages[-1].path) == b'<html>today</html>'
+    assert [page.fetched_at for page in archive.iter_pages(since=now - timedelta(days=1))] == [
+        now - timedelta(seconds=1), now
+    ]
+    assert [page.key for page in archive.iter_pages(sources=['indeed'])] == ['indeed']
+
+    assert archive.prune(14) == 1
+    assert [page.fetched_at for page in archive.iter_pages()] == [now - timedelta(seconds=1), now]
+
+
+def test_page_identical_to_last_fetch_of_the_search_is_skipped(tmp_path):
+    archive = PageArchive(str(tmp_path / 'archive'))
+    now = datetime.now()
+
+    def store(query, page, content, seconds):
+        return archive.store('linkedin', query, page, now + timedelta(seconds=seconds), content)
+
+    assert store('new grad', 0, b'A', 0) is not None
+    assert store('new grad', 0, b'A', 1) is None
+    # Another search, or another page of it, is not compared with this one
+    assert store('intern', 0, b'A', 2) is not None
+    assert store('new grad', 1, b'A', 3) is not None
+    # Only the last fetch counts: A again after B is stored
+    assert store('new grad', 0, b'B', 4) is not None
+    assert store('new grad', 0, b'A', 5) is not None
+    assert len(list(archive.iter_pages())) == 5
+
+
+def test_replay_pages_keeps_order_and_skips_failures(tmp_path):
+    archive = PageArchive(str(tmp_path / 'archive'))
+    now = datetime.now()
+    for i in range(10):
+        archive.store('linkedin', f"query {i}", 0, now + timedelta(seconds=i), str(i).encode())
+
+    def parse(key, path):
+        body = read_page(path)
+        if body == b'3':
+            raise ValueError("bad page")
+        return int(body)
+
+    with ThreadPoolExecutor(4) as pool:
+        results = [result for _, result in replay_pages(archive.iter_pages(), parse, pool, window=3)]
+    assert results == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+
+
+@pytest.fixture
+def replay(tmp_path, monkeypatch):
+    """An archive of every fixture page, replayed inline into a fresh database; returns the emails sent"""
+    monkeypatch.chdir(tmp_path)
+    archive = PageArchive(str(tmp_path / 'archive'))
+    now = datetime.now()
+    for i, key in enumerate(SCRAPERS):
+        archive.store(key, 'new grad', 0, now + timedelta(seconds=i), fixture(key))
+    emails = []
+
+    class RecordingNotifier:
+        def send_email(self, recipient, jobs):
+            emails.append(jobs)
+            return True
+
+    monkeypatch.setattr(main, 'ARCHIVE_CONFIG', dict(main.ARCHIVE_CONFIG, path=archive.directory, replay_notify=True))
+    monkeypatch.setattr(main, 'SCRAPING_CONFIG', dict(main.SCRAPING_CONFIG, parse_workers=0))
+    monkeypatch.setattr(main, 'SNAPSHOT_CONFIG', dict(main.SNAPSHOT_CONFIG, path=''))
+    monkeypatch.setattr(main, 'build_email_notifier', RecordingNotifier)
+    monkeypatch.setattr(main, 'get_digest_policy', lambda: None)
+    return emails
+
+
+def test_replayed_jobs_already_stored_are_not_emailed_again(replay):
+    db = main.open_database()
+    stored = db.add_jobs(main.filter_jobs(get_scraper('linkedin').parse(fixture('linkedin'))))
+    assert stored
+
+    result = main.replay_archive()
+
+    emailed = {job.url for jobs in replay for job in jobs}
+    assert result['new_jobs'] == len(emailed) > 0
+    assert not emailed & {job.url for job in stored}
+    assert db.get_stats()['unnotified_jobs'] == len(stored)
+
+    replay.clear()
+    assert main.replay_archive()['new_jobs'] == 0
+    assert replay == []
+
+
+def test_replay_without_notify_stores_jobs_as_notified(replay):
+    main.ARCHIVE_CONFIG['replay_notify'] = False
+
+    result = main.replay_archive()
+
+    assert result['new_jobs'] > 0
+    assert replay == []
+    stats = main.open_database().get_stats()
+    assert stats['notified_jobs'] == stats['total_jobs'] == result['new_jobs']
+
+
+def test_replay_emails_respect_max_jobs_per_email(replay, monkeypatch):
+    monkeypatch.setattr(main, 'FILTER_CONFIG', dict(main.FILTER_CONFIG, max_jobs_per_email=10))
+
+    result = main.replay_archive()
+
+    assert result['new_jobs'] > 10
+    assert [len(jobs) for jobs in replay[:-1]] == [10] * (len(replay) - 1)
+    assert sum(len(jobs) for jobs in replay) == result['new_jobs']
@@ -0,0 +1,90 @@
+import pytest
+
+from circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker('Test', failure_threshold=2, probe_interval=60, max_probe_interval=200,
+                          clock=clock, probe_timeout=30)
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow()
+        breaker.record_failure('non-200 response')
+    assert breaker.state == OPEN
+
+
+def test_opens_after_threshold_and_probes_at_probe_time(breaker, clock):
+    open_breaker(breaker)
+    assert not breaker.available()
+    assert not breaker.allow()
+
+    clock.now = 60
+    assert breaker.available()
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probes_double_the_interval_up_to_the_maximum(breaker, clock):
+    open_breaker(breaker)
+    for interval in (120, 200, 200):
+        clock.now = breaker.next_probe
+        assert breaker.allow()
+        breaker.record_failure('timeout')
+        assert breaker.state == OPEN
+        assert breaker.next_probe == clock.now + interval
+
+
+def test_cancelled_probe_reopens_the_breaker(breaker, clock):
+    open_breaker(breaker)
+    clock.now = 60
+    assert breaker.allow()
+
+    breaker.abandon()
+
+    assert breaker.state == OPEN
+    clock.now = breaker.next_probe
+    assert breaker.allow()
+
+
+def test_probe_without_outcome_expires(breaker, clock):
+    open_breaker(breaker)
+    clock.now = 60
+    assert breaker.allow()
+
+    clock.now = 89
+    assert not breaker.available()
+    clock.now = 90
+    assert not breaker.available()
+    assert breaker.state == OPEN
+    clock.now = breaker.next_probe
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+
+
+def test_cancelled_request_while_closed_is_not_a_failure(breaker):
+    assert breaker.allow()
+    breaker.abandon()
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
@@ -0,0 +1,143 @@
+import json
+import os
+
+import pytest
+import schedule
+
+import main
+from config_reload import ConfigError, ConfigWatcher, merge, validate
+
+BASELINE = {
+    'JOB_KEYWORDS': ["new grad"],
+    'FILTER_CONFIG': {'exclude_keywords': ["senior"], 'min_jobs_for_email': 1},
+    'SCRAPING_CONFIG': {'check_interval_minutes': 30, 'request_delay_seconds': 1},
+}
+
+
+def write_json(path, sections):
+    with open(path, 'w') as f:
+        json.dump(sections, f)
+
+
+def test_partial_file_merges_over_startup_sections():
+    merged = merge(BASELINE, {'FILTER_CONFIG': {'exclude_keywords': ["lead"]}})
+
+    assert merged['FILTER_CONFIG'] == {'exclude_keywords': ["lead"], 'min_jobs_for_email': 1}
+    assert merged['SCRAPING_CONFIG'] == BASELINE['SCRAPING_CONFIG']
+    assert merged['JOB_KEYWORDS'] == ["new grad"]
+    # The baseline is copied, never modified
+    merged['SCRAPING_CONFIG']['check_interval_minutes'] = 5
+    assert BASELINE['SCRAPING_CONFIG']['check_interval_minutes'] == 30
+
+
+@pytest.mark.parametrize('sections', [
+    {'JOB_KEYWORDS': []},
+    {'JOB_KEYWORDS': "new grad"},
+    {'JOB_KEYWORDS': ["new grad", " "]},
+    {'FILTER_CONFIG': ["senior"]},
+])
+def test_validate_rejects_wrong_types(sections):
+    with pytest.raises(ConfigError):
+        validate(sections, BASELINE)
+
+
+def test_watcher_detects_mtime_and_size_changes(tmp_path):
+    path = str(tmp_path / 'config.json')
+    write_json(path, {'JOB_KEYWORDS': ["intern"]})
+    watcher = ConfigWatcher(path, BASELINE, loaded=True)
+    assert watcher.poll() is None
+
+    # Same size, newer mtime
+    write_json(path, {'JOB_KEYWORDS': ["senior"]})
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert watcher.poll()['JOB_KEYWORDS'] == ["senior"]
+    assert watcher.poll() is None
+
+    # Same mtime, different size
+    mtime = os.stat(path).st_mtime_ns
+    write_json(path, {'JOB_KEYWORDS': ["new grad", "intern"]})
+    os.utime(path, ns=(mtime, mtime))
+    assert watcher.poll()['JOB_KEYWORDS'] == ["new grad", "intern"]
+
+
+def test_watcher_picks_up_a_file_created_later(tmp_path):
+    path = str(tmp_path / 'config.json')
+    watcher = ConfigWatcher(path, BASELINE)
+    assert watcher.poll() is None
+
+    write_json(path, {'FILTER_CONFIG': {'min_jobs_for_email': 3}})
+    settings = watcher.poll()
+    assert settings['FILTER_CONFIG'] == {'exclude_keywords': ["senior"], 'min_jobs_for_email': 3}
+
+
+def test_broken_edit_leaves_running_settings_untouched(tmp_path, monkeypatch):
+    path = str(tmp_path / 'config.py')
+    with open(path, 'w') as f:
+        f.write('JOB_KEYWORDS = ["intern"]\n')
+    baseline = {name: getattr(main, name) for name in main.RELOADABLE_CONFIG}
+    monkeypatch.setattr(main, 'CONFIG_RELOAD', True)
+    monkeypatch.setattr(main, '_config_watcher', ConfigWatcher(path, baseline))
+    for name in main.RELOADABLE_CONFIG:
+        monkeypatch.setattr(main, name, getattr(main, name))
+
+    assert main.reload_config()
+    assert main.JOB_KEYWORDS == ["intern"]
+
+    with open(path, 'w') as f:
+        f.write('JOB_KEYWORDS = ["intern", "new grad"\n')
+    assert not main.reload_config()
+    with open(path, 'w') as f:
+        f.write('JOB_KEYWORDS = "new grad"\n')
+    assert not main.reload_config()
+    assert main.JOB_KEYWORDS == ["intern"]
+
+
+@pytest.fixture
+def digest_settings(monkeypatch):
+    monkeypatch.setattr(main, 'SCRAPING_CONFIG', dict(main.SCRAPING_CONFIG, check_interval_minutes=30))
+    monkeypatch.setattr(main, 'DIGEST_CONFIG', dict(main.DIGEST_CONFIG, max_delay_minutes=0,
+                                                    max_emails_per_hour=0))
+    monkeypatch.setattr(main, '_digest_policy', None)
+    monkeypatch.setattr(main, '_digest_settings', None)
+
+
+def test_schedule_changes_only_with_interval_or_batching(tmp_path, monkeypatch, digest_settings):
+    scheduler = schedule.Scheduler()
+    db_path = str(tmp_path / 'jobs.db')
+
+    def cycle():
+        pass
+
+    def jobs(tag):
+        return scheduler.get_jobs(tag)
+
+    main.schedule_cycles(scheduler, cycle, db_path=db_path)
+    first = jobs('cycle')
+    assert len(first) == 1 and first[0].interval == 30
+    assert jobs('digest') == []
+
+    # Unrelated change: the cycle keeps its place in the schedule
+    main.SCRAPING_CONFIG['request_delay_seconds'] = 5
+    main.schedule_cycles(scheduler, cycle, db_path=db_path)
+    assert jobs('cycle') == first and jobs('cycle')[0] is first[0]
+
+    main.SCRAPING_CONFIG['check_interval_minutes'] = 10
+    main.schedule_cycles(scheduler, cycle, db_path=db_path)
+    assert len(jobs('cycle')) == 1 and jobs('cycle')[0].interval == 10
+    rescheduled = jobs('cycle')[0]
+
+    main.DIGEST_CONFIG['max_delay_minutes'] = 15
+    main.schedule_cycles(scheduler, cycle, db_path=db_path)
+    digest = jobs('digest')
+    assert len(digest) == 1
+    assert jobs('cycle')[0] is rescheduled
+
+    main.DIGEST_CONFIG['max_batch_size'] = 20
+    main.schedule_cycles(scheduler, cycle, db_path=db_path)
+    assert jobs('digest')[0] is digest[0]
+
+    main.DIGEST_CONFIG['max_delay_minutes'] = 0
+    main.schedule_cycles(scheduler, cycle, db_path=db_path)
+    assert jobs('digest') == []
+    assert jobs('cycle')[0] is rescheduled
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+
+from digest import DigestPolicy
+from models import Job
+
+NOW = datetime(2026, 1, 5, 12, 0)
+
+
+def pending_jobs(count=1):
+    return [Job(f"Engineer {i}", url=f"https://example.com/jobs/{i}", scraped_at=NOW - timedelta(hours=2))
+            for i in range(count)]
+
+
+def test_reloaded_policy_keeps_the_hourly_cap():
+    previous = DigestPolicy(max_delay_minutes=0, max_emails_per_hour=1)
+    previous.record_send(NOW - timedelta(minutes=10))
+
+    policy = DigestPolicy(max_delay_minutes=30, max_emails_per_hour=1)
+    policy.carry_over(previous)
+
+    assert policy.decide(pending_jobs(), NOW) == (False, 'hourly cap')
+    assert policy.decide(pending_jobs(), NOW + timedelta(minutes=51)) == (True, 'latency')
+
+
+def test_failed_sends_back_off_until_a_send_succeeds():
+    policy = DigestPolicy(max_delay_minutes=30)
+    jobs = pending_jobs()
+
+    policy.record_failure(NOW)
+    assert policy.decide(jobs, NOW + timedelta(minutes=1)) == (False, 'backoff')
+    assert policy.decide(jobs, NOW + timedelta(minutes=2)) == (True, 'latency')
+
+    policy.record_failure(NOW + timedelta(minutes=2))
+    assert policy.decide(jobs, NOW + timedelta(minutes=5)) == (False, 'backoff')
+    assert policy.decide(jobs, NOW + timedelta(minutes=6)) == (True, 'latency')
+
+    policy.record_send(NOW + timedelta(minutes=6))
+    assert policy.decide(jobs, NOW + timedelta(minutes=6)) == (True, 'latency')
@@ -0,0 +1,119 @@
+import json
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import email_notifier
+from email_notifier import EmailNotifier
+from models import Job
+
+
+class SendGridStub:
+    """Local stand-in for the SendGrid mail/send API that counts connections and requests"""
+
+    def __init__(self):
+        self.connections = 0
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                stub.connections += 1
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                stub.requests.append((self.path, self.headers['Authorization'], json.loads(body)))
+                self.send_response(202)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/v3/mail/send"
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def sendgrid_stub(monkeypatch):
+    stub = SendGridStub()
+    # Set after email_notifier was imported: the URL is read when a client is created
+    monkeypatch.setenv('SENDGRID_API_URL', stub.url)
+    yield stub
+    for client in email_notifier._sendgrid_clients.values():
+        client.close()
+    email_notifier._sendgrid_clients.clear()
+    stub.stop()
+
+
+def make_jobs(count):
+    return [Job(f"Graduate Engineer {i}", "Acme", f"https://example.com/jobs/{i}", 'LinkedIn', datetime.now())
+            for i in range(count)]
+
+
+def test_sends_reuse_one_connection(sendgrid_stub):
+    notifier = EmailNotifier(email='sender@example.com', sendgrid_api_key='test-key')
+
+    for _ in range(3):
+        assert notifier.send_email('a@example.com, b@example.com', make_jobs(2))
+
+    assert len(sendgrid_stub.requests) == 3
+    assert sendgrid_stub.connections == 1
+    path, authorization, payload = sendgrid_stub.requests[0]
+    assert path == '/v3/mail/send'
+    assert authorization == 'Bearer test-key'
+    assert payload['personalizations'] == [{'to': [{'email': 'a@example.com'}]},
+                                           {'to': [{'email': 'b@example.com'}]}]
+    assert payload['from'] == {'email': 'sender@example.com'}
+
+
+def test_client_is_shared_per_key_and_url(sendgrid_stub):
+    client = email_notifier.get_sendgrid_client('test-key')
+    assert client.api_url == sendgrid_stub.url
+    assert email_notifier.get_sendgrid_client('test-key') is client
+    assert email_notifier.get_sendgrid_client('other-key') is not client
+
+
+def test_digest_is_sent_without_blocking_the_caller(monkeypatch):
+    import main
+    from database import JobDatabase
+    from storage import MemoryBackend
+
+    release = threading.Event()
+    sent = []
+
+    class SlowNotifier:
+        def send_email(self, recipient, jobs):
+            release.wait(5)
+            sent.append(len(jobs))
+            return True
+
+    monkeypatch.setattr(main, 'build_email_notifier', SlowNotifier)
+    monkeypatch.setattr(main, 'get_digest_policy', lambda: None)
+    monkeypatch.setattr(main, 'get_ranker', lambda: None)
+    db = JobDatabase(backend=MemoryBackend())
+    jobs = db.add_jobs(make_jobs(3))
+
+    assert main.deliver_digest(db, jobs)
+    assert sent == []
+    # The backlog is not read again while its jobs are still being sent
+    assert not main.deliver_digest(db)
+
+    release.set()
+    assert email_notifier.wait_for_sends(5)
+    assert sent == [3]
+    assert db.get_stats()['unnotified_jobs'] == 0
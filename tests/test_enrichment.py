@@ -0,0 +1,46 @@
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import health
+import metrics
+from enrichment import DetailCache, enrich_jobs
+from models import Job
+
+
+@pytest.fixture
+def expired_detail_pages():
+    """Local server answering 404 to every job detail page"""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_expired_detail_page_leaves_listing_health_alone(expired_detail_pages, monkeypatch):
+    monkeypatch.setattr(health, 'state', health.PipelineState())
+    monkeypatch.setattr('job_scraper.health_state', health.state)
+    metrics.enable()
+    listing_requests = metrics.FETCH_REQUESTS.value('LinkedIn', 404)
+    detail_requests = metrics.DETAIL_REQUESTS.value('LinkedIn', 404)
+    jobs = [Job('Graduate Engineer', 'Acme', f"{expired_detail_pages}/jobs/{i}", 'LinkedIn', datetime.now())
+            for i in range(2)]
+
+    assert enrich_jobs(jobs, request_delay=0, parse_workers=0, cache=DetailCache()) == 0
+
+    assert all(job.details is None for job in jobs)
+    assert health.state.status()['sources'] == {}
+    assert metrics.FETCH_REQUESTS.value('LinkedIn', 404) == listing_requests
+    assert metrics.DETAIL_REQUESTS.value('LinkedIn', 404) == detail_requests + 2
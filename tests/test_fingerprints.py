@@ -0,0 +1,32 @@
+from benchmarks.stubs import load_fixtures
+from job_scraper import SCRAPERS, SEEN_RUN
+
+
+def extract(key, seen=None):
+    return SCRAPERS[key].extract(load_fixtures()[key], frozenset(seen) if seen else None)
+
+
+def test_stops_after_a_run_of_seen_cards():
+    for key in SCRAPERS:
+        full = extract(key)
+        result = extract(key, full.card_ids[2:])
+        assert [row[2] for row in result.rows] == full.card_ids[:2]
+        assert result.skipped == len(full.card_ids) - 2
+
+
+def test_seen_card_above_new_ones_does_not_hide_them():
+    for key in SCRAPERS:
+        full = extract(key)
+        # A promoted card from the last fetch at the top, then new cards
+        result = extract(key, full.card_ids[:1])
+        assert [row[2] for row in result.rows] == full.card_ids[1:]
+        assert result.skipped == 1
+
+
+def test_short_run_of_seen_cards_is_skipped_not_stopped_at():
+    for key in SCRAPERS:
+        full = extract(key)
+        seen = full.card_ids[2:2 + SEEN_RUN - 1]
+        result = extract(key, seen)
+        assert [row[2] for row in result.rows] == [url for url in full.card_ids if url not in seen]
+        assert result.skipped == len(seen)
@@ -0,0 +1,41 @@
+import logging
+
+from log_config import RateLimitFilter
+
+
+def record(msg, *args, level=logging.ERROR):
+    return logging.LogRecord('job_scraper', level, __file__, 1, msg, args, None)
+
+
+def test_repeats_of_one_message_are_suppressed_after_burst():
+    limiter = RateLimitFilter(burst=2, period=60)
+    template = "Error scraping %s for keyword '%s': %s"
+    passed = [limiter.filter(record(template, 'LinkedIn', 'intern', TimeoutError('timed out'))) for _ in range(4)]
+    assert passed == [True, True, False, False]
+
+
+def test_same_template_for_other_sources_is_not_suppressed():
+    limiter = RateLimitFilter(burst=2, period=60)
+    template = "Error scraping %s for keyword '%s': %s"
+    for _ in range(5):
+        limiter.filter(record(template, 'LinkedIn', 'intern', 'HTTP 429'))
+    assert limiter.filter(record(template, 'Indeed', 'intern', 'HTTP 429'))
+    assert limiter.filter(record(template, 'LinkedIn', 'new grad', 'HTTP 429'))
+
+
+def test_suppressed_count_is_reported_after_the_period():
+    limiter = RateLimitFilter(burst=1, period=60)
+    limiter.filter(record("Circuit for %s opened", 'Naukri'))
+    assert not limiter.filter(record("Circuit for %s opened", 'Naukri'))
+    limiter.period = 0
+    again = record("Circuit for %s opened", 'Naukri')
+    assert limiter.filter(again)
+    assert again.suppressed == 1
+
+
+def test_tracked_messages_are_bounded():
+    limiter = RateLimitFilter(burst=1, period=60, max_keys=10)
+    for i in range(100):
+        assert limiter.filter(record("Job %s failed", i))
+    assert len(limiter._state) <= 10
+    assert limiter.filter(record("Info %s", 1, level=logging.INFO))
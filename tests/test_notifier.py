@@ -0,0 +1,90 @@
+import json
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from models import Job
+from notifier import WebhookNotifier
+from storage import SQLiteBackend
+
+
+class WebhookStub:
+    """Local webhook that records each pushed job and whether it was already committed to db_path"""
+
+    def __init__(self, db_path, delay=0.0):
+        self.pushed = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                time.sleep(delay)
+                conn = sqlite3.connect(db_path)
+                stored = conn.execute('SELECT 1 FROM jobs WHERE url = ?', (payload['url'],)).fetchone()
+                conn.close()
+                stub.pushed.append((payload['url'], stored is not None))
+                self.send_response(204)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/hook"
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'jobs.db')
+
+
+def make_jobs(count):
+    return [Job(f"Graduate Engineer {i}", "Acme", f"https://example.com/jobs/{i}", 'LinkedIn')
+            for i in range(count)]
+
+
+def test_only_committed_jobs_are_pushed(db_path):
+    backend = SQLiteBackend(db_path, timeout=0.1)
+    stub = WebhookStub(db_path)
+    notifier = WebhookNotifier(stub.url)
+    try:
+        lock = sqlite3.connect(db_path)
+        lock.execute('BEGIN IMMEDIATE')
+        with pytest.raises(sqlite3.OperationalError):
+            backend.add_jobs(make_jobs(2), on_new=notifier.notify_job)
+        lock.rollback()
+        lock.close()
+        notifier.flush(5)
+        assert stub.pushed == []
+
+        new_jobs = backend.add_jobs(make_jobs(3), on_new=notifier.notify_job)
+        notifier.flush(5)
+        assert len(new_jobs) == 3
+        assert sorted(stub.pushed) == [(job.url, True) for job in sorted(new_jobs, key=lambda job: job.url)]
+    finally:
+        notifier.close()
+        stub.stop()
+
+
+def test_close_drains_the_queue(db_path):
+    backend = SQLiteBackend(db_path)
+    stub = WebhookStub(db_path, delay=0.05)
+    notifier = WebhookNotifier(stub.url)
+    try:
+        backend.add_jobs(make_jobs(5), on_new=notifier.notify_job)
+        notifier.close()
+        assert len(stub.pushed) == 5
+        assert notifier._worker is not None and not notifier._worker.is_alive()
+    finally:
+        stub.stop()
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+
+from database import JobDatabase
+from job_scraper import LinkedInScraper, NaukriScraper
+from query_planner import QueryPlanner
+
+
+def planner_with_history(runs, **kwargs):
+    """Planner over a memory database holding `runs` searches of each {keyword: urls}"""
+    db = JobDatabase(backend='memory')
+    now = datetime.now()
+    for results in runs:
+        db.backend.record_query_results(
+            {(NaukriScraper.key, keyword): urls for keyword, urls in results.items()},
+            run_at=now - timedelta(hours=1),
+        )
+    return QueryPlanner(db, **kwargs)
+
+
+def test_overlapping_keywords_keep_one_searched():
+    shared = [f"https://example.com/grad/{i}" for i in range(10)]
+    results = {
+        'new grad': shared,
+        'graduate': shared,
+        'intern': [f"https://example.com/intern/{i}" for i in range(5)],
+    }
+    planner = planner_with_history([results] * 3)
+
+    plan = planner.plan_source(NaukriScraper, ['new grad', 'graduate', 'intern'])
+
+    assert sorted(plan) == ['intern', 'new grad']
+
+
+def test_keyword_covered_by_a_larger_one_is_down_scheduled():
+    broad = [f"https://example.com/jobs/{i}" for i in range(10)]
+    results = {'fresher': broad, 'trainee': broad[:4]}
+    planner = planner_with_history([results] * 3)
+
+    assert planner.plan_source(NaukriScraper, ['fresher', 'trainee']) == ['fresher']
+
+
+def test_down_scheduled_keyword_is_probed_after_probe_interval():
+    shared = [f"https://example.com/grad/{i}" for i in range(10)]
+    planner = planner_with_history([{'new grad': shared, 'graduate': shared}] * 3, probe_hours=0.5)
+
+    assert sorted(planner.plan_source(NaukriScraper, ['new grad', 'graduate'])) == ['graduate', 'new grad']
+
+
+def test_cover_prefers_earlier_keyword_on_ties():
+    urls = {'a': {1, 2}, 'b': {1, 2}, 'c': {3}, 'd': set()}
+    assert QueryPlanner.cover(urls) == ['a', 'c']
+    assert QueryPlanner.cover(urls, covered={1, 2, 3}) == []
+
+
+def test_learning_keywords_are_searched_alone():
+    planner = planner_with_history([{'new grad': ['https://example.com/1']}])
+    assert planner.plan_source(LinkedInScraper, ['new grad', 'graduate']) == ['new grad', 'graduate']
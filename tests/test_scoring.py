@@ -0,0 +1,37 @@
+import numpy as np
+
+import database
+from database import JobDatabase
+from models import Job
+from scoring import RelevanceScorer
+from storage import MemoryBackend
+
+KEYWORDS = ["new grad", "software engineer", "entry level"]
+TITLES = [
+    "New Grad Software Engineer", "Senior Staff Engineer", "Entry Level Data Analyst",
+    "Software Engineer II", "Marketing Manager", "New Grad Product Designer",
+    "Entry Level Software Engineer", "Principal Architect", "Graduate Engineer",
+    "Software Engineer, New Grad 2025", "Sales Associate", "Junior Software Developer",
+]
+
+
+def test_scores_with_corpus_frequencies_match_one_batch():
+    scorer = RelevanceScorer(KEYWORDS)
+    halves = [TITLES[:5], TITLES[5:]]
+    df = sum(scorer.document_frequencies(half) for half in halves)
+
+    scores = np.concatenate([scorer.score(half, df, len(TITLES)) for half in halves])
+
+    assert np.allclose(scores, scorer.score(TITLES))
+
+
+def test_paged_ranking_matches_ranking_the_whole_backlog(monkeypatch):
+    monkeypatch.setattr(database, 'UNNOTIFIED_PAGE', 3)
+    scorer = RelevanceScorer(KEYWORDS)
+    db = JobDatabase(backend=MemoryBackend(), scorer=scorer)
+    db.add_jobs([Job(title, url=f"https://example.com/jobs/{i}", source='LinkedIn')
+                 for i, title in enumerate(TITLES)])
+
+    expected = scorer.rank(db.backend.get_unnotified_jobs())[:3]
+
+    assert [job.id for job in db.get_unnotified_jobs(limit=3)] == [job.id for job in expected]
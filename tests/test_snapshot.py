@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+import snapshot
+from snapshot import MAGIC, Snapshot, open_snapshot, url_hash, write_snapshot
+
+URLS = [f"https://example.com/jobs/{i}" for i in range(200)]
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    yield str(tmp_path / 'seen.snap')
+    for cached in snapshot._snapshots.values():
+        cached.close()
+    snapshot._snapshots.clear()
+
+
+def write_urls(path, urls, notified=()):
+    return write_snapshot(path, [(url_hash(url), url in notified) for url in urls])
+
+
+def test_round_trip_merges_duplicates(snapshot_path):
+    notified = set(URLS[::3])
+    entries = [(url_hash(url), url in notified) for url in URLS]
+    # A duplicate is notified if any copy is
+    entries.append((url_hash(URLS[1]), True))
+
+    assert write_snapshot(snapshot_path, entries) == len(URLS)
+    snap = Snapshot(snapshot_path)
+    try:
+        assert len(snap) == len(URLS)
+        items = list(snap.items())
+        assert [value for value, _ in items] == sorted(url_hash(url) for url in URLS)
+        assert dict(items) == {url_hash(url): url in notified or url == URLS[1] for url in URLS}
+    finally:
+        snap.close()
+
+
+def test_membership_and_notified_lookups(snapshot_path):
+    write_urls(snapshot_path, URLS[:100], notified=URLS[:10])
+    snap = Snapshot(snapshot_path)
+    try:
+        assert all(url in snap for url in URLS[:100])
+        assert not any(url in snap for url in URLS[100:])
+        assert snap.is_notified(URLS[0])
+        assert not snap.is_notified(URLS[50])
+        assert not snap.is_notified(URLS[150])
+    finally:
+        snap.close()
+
+
+def test_empty_snapshot(snapshot_path):
+    write_urls(snapshot_path, [])
+    snap = Snapshot(snapshot_path)
+    try:
+        assert len(snap) == 0
+        assert URLS[0] not in snap
+    finally:
+        snap.close()
+
+
+def test_bad_magic_is_rejected(snapshot_path):
+    write_urls(snapshot_path, URLS)
+    with open(snapshot_path, 'r+b') as f:
+        f.write(b'NOTASNAP')
+
+    with pytest.raises(ValueError, match='not a job snapshot'):
+        Snapshot(snapshot_path)
+    assert open_snapshot(snapshot_path) is None
+
+
+def test_truncated_file_is_rejected(snapshot_path):
+    write_urls(snapshot_path, URLS)
+    with open(snapshot_path, 'r+b') as f:
+        f.truncate(os.path.getsize(snapshot_path) - 5)
+
+    with pytest.raises(ValueError, match='truncated'):
+        Snapshot(snapshot_path)
+    assert open_snapshot(snapshot_path) is None
+
+
+def test_short_header_is_rejected(snapshot_path):
+    with open(snapshot_path, 'wb') as f:
+        f.write(MAGIC)
+
+    assert open_snapshot(snapshot_path) is None
+
+
+def test_cache_is_shared_and_reloaded_when_the_file_is_replaced(snapshot_path, tmp_path):
+    write_urls(snapshot_path, URLS[:10])
+    first = open_snapshot(snapshot_path)
+    assert open_snapshot(snapshot_path) is first
+
+    # Replaced by another process: a new file renamed over the old one
+    other = str(tmp_path / 'other.snap')
+    write_urls(other, URLS[:20])
+    os.replace(other, snapshot_path)
+
+    second = open_snapshot(snapshot_path)
+    assert second is not first
+    assert len(second) == 20
+    assert URLS[15] in second
+
+
+def test_missing_file_is_none(snapshot_path):
+    assert open_snapshot(snapshot_path) is None
@@ -0,0 +1,49 @@
+import storage
+from models import Job
+from storage import AppendLogBackend, MemoryBackend
+
+
+def make_jobs(count, start=0):
+    return [Job(title=f"Job {i}", url=f"https://example.com/jobs/{i}", source='LinkedIn')
+            for i in range(start, start + count)]
+
+
+def test_unnotified_pages_are_newest_first_and_skip_notified():
+    backend = MemoryBackend()
+    jobs = backend.add_jobs(make_jobs(10))
+    backend.mark_notified_many([jobs[8].id, jobs[3].id])
+
+    first = backend.get_unnotified_jobs(limit=4)
+    second = backend.get_unnotified_jobs(limit=4, before_id=first[-1].id)
+
+    assert [job.id for job in first] == [10, 8, 7, 6]
+    assert [job.id for job in second] == [5, 3, 2, 1]
+    assert [job.id for job in backend.get_unnotified_jobs()] == [10, 8, 7, 6, 5, 3, 2, 1]
+
+
+def test_duplicates_are_not_modified():
+    backend = MemoryBackend()
+    backend.add_jobs(make_jobs(1))
+    duplicate = Job(title="Job 0", url="https://example.com/jobs/0", source='LinkedIn', id=42, notified=True)
+
+    assert backend.add_jobs([duplicate]) == []
+    assert duplicate.id == 42
+    assert duplicate.notified is True
+
+
+def test_log_is_compacted_once_it_grows(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, 'LOG_COMPACT_SLACK', 10)
+    path = str(tmp_path / 'jobs.jsonl')
+    backend = AppendLogBackend(path)
+    jobs = backend.add_jobs(make_jobs(5))
+    for job in jobs * 4:
+        backend.mark_notified_many([job.id])
+    backend.close()
+
+    with open(path) as f:
+        records = sum(1 for _ in f)
+    reopened = AppendLogBackend(path)
+    reopened.close()
+
+    assert records <= 2 * 5 + 10
+    assert reopened.get_stats()['notified_jobs'] == 5
@@ -0,0 +1,95 @@
+import sqlite3
+
+import pytest
+
+from work_queue import WorkQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return WorkQueue(str(tmp_path / 'jobs.db'), lease_seconds=120, max_attempts=2)
+
+
+def expire_leases(queue):
+    conn = sqlite3.connect(queue.db_path)
+    conn.execute("UPDATE work_tasks SET lease_expires = '2000-01-01T00:00:00' WHERE state = 'leased'")
+    conn.commit()
+    conn.close()
+
+
+def test_each_task_is_leased_once(queue):
+    assert queue.enqueue('c1', [('linkedin', 'new grad', 0), ('indeed', 'new grad', 0)]) == 2
+    # Still pending: not queued again by the next cycle
+    assert queue.enqueue('c2', [('linkedin', 'new grad', 0)]) == 0
+
+    first = queue.lease('w1')
+    second = queue.lease('w2')
+    assert {first.source, second.source} == {'linkedin', 'indeed'}
+    assert queue.lease('w3') is None
+    assert queue.complete(first, 'w1', new_jobs=3)
+    assert queue.cycle_status('c1') == {'done': 1, 'leased': 1}
+
+
+def test_expired_lease_is_leased_again(queue):
+    queue.enqueue('c1', [('linkedin', 'new grad', 0)])
+    task = queue.lease('w1')
+    assert queue.lease('w2') is None
+
+    expire_leases(queue)
+    retried = queue.lease('w2')
+
+    assert retried.id == task.id
+    assert retried.attempts == 2
+    # The first worker lost its lease, so its late result is not recorded
+    assert not queue.complete(task, 'w1')
+    assert queue.complete(retried, 'w2')
+    assert queue.cycle_status('c1') == {'done': 1}
+
+
+def test_failures_are_retried_up_to_max_attempts(queue):
+    queue.enqueue('c1', [('linkedin', 'new grad', 0)])
+
+    task = queue.lease('w1')
+    assert queue.fail(task, 'w1', 'timeout')
+    assert queue.cycle_status('c1') == {'pending': 1}
+
+    task = queue.lease('w1')
+    assert task.attempts == 2
+    assert queue.fail(task, 'w1', 'timeout')
+    assert queue.cycle_status('c1') == {'failed': 1}
+    assert queue.lease('w1') is None
+
+
+def test_lease_expiring_on_last_attempt_fails_the_task(queue):
+    queue.enqueue('c1', [('linkedin', 'new grad', 0)])
+    queue.fail(queue.lease('w1'), 'w1', 'timeout')
+    queue.lease('w1')
+
+    expire_leases(queue)
+
+    assert queue.lease('w2') is None
+    assert queue.cycle_status('c1') == {'failed': 1}
+
+
+def test_lease_filters_by_source(queue):
+    queue.enqueue('c1', [('linkedin', 'new grad', 0), ('indeed', 'new grad', 0)])
+    assert queue.lease('w1', ['indeed']).source == 'indeed'
+    assert queue.lease('w1', ['indeed']) is None
+
+
+def test_prune_removes_only_finished_tasks_older_than_the_cutoff(queue):
+    queue.enqueue('c1', [('linkedin', 'old done', 0), ('linkedin', 'new done', 0), ('linkedin', 'old pending', 0)])
+    for worker in ('w1', 'w2'):
+        task = queue.lease(worker)
+        queue.complete(task, worker)
+    conn = sqlite3.connect(queue.db_path)
+    # created_at is UTC (CURRENT_TIMESTAMP)
+    conn.execute("UPDATE work_tasks SET created_at = datetime('now', '-8 days') WHERE keyword LIKE 'old%'")
+    conn.execute("UPDATE work_tasks SET created_at = datetime('now', '-6 days') WHERE keyword = 'new done'")
+    conn.commit()
+
+    queue.prune(older_than_days=7)
+
+    remaining = [row[0] for row in conn.execute('SELECT keyword FROM work_tasks ORDER BY id')]
+    conn.close()
+    assert remaining == ['new done', 'old pending']
@@ -0,0 +1,181 @@
+"""
+Shared work queue for running several scraper processes
+
+A coordinator enqueues one task per (source, keyword, page) each cycle and
+workers lease them from a table in a shared SQLite file (jobs.db by
+default, so the same file also dedups the jobs they store). A lease is
+taken in an IMMEDIATE transaction, so two workers never get the same
+task; if a worker dies, its lease expires and the task is handed out
+again, up to max_attempts times.
+"""
+
+import sqlite3
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Task(NamedTuple):
+    """One leased unit of work"""
+    id: int
+    cycle_id: str
+    source: str
+    keyword: Optional[str]
+    page: int
+    attempts: int
+
+
+class WorkQueue:
+    """Leased (source, keyword, page) tasks stored in SQLite"""
+
+    def __init__(self, db_path: str = "jobs.db", lease_seconds: float = 120, max_attempts: int = 3,
+                 timeout: float = 30):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.init_queue()
+
+    def connect(self) -> sqlite3.Connection:
+        # Autocommit mode, so transactions are opened explicitly with BEGIN IMMEDIATE
+        return sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+
+    def init_queue(self):
+        """Create the task table; WAL lets workers read while another one writes"""
+        conn = self.connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS work_tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                cycle_id TEXT NOT NULL,
+                source TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                page INTEGER NOT NULL DEFAULT 0,
+                state TEXT NOT NULL DEFAULT 'pending',
+                lease_owner TEXT,
+                lease_expires TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                new_jobs INTEGER,
+                error TEXT,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_work_tasks_state ON work_tasks(state, source)')
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_work_tasks_cycle ON work_tasks(cycle_id)')
+        conn.close()
+
+    def enqueue(self, cycle_id: str, tasks: Iterable[Tuple[str, Optional[str], int]]) -> int:
+        """Add (source, keyword, page) tasks for a cycle
+
+        A task that is still pending or leased from an earlier cycle is not
+        added again. Returns the number of tasks added.
+        """
+        conn = self.connect()
+        added = 0
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for source, keyword, page in tasks:
+                cursor = conn.execute('''
+                    INSERT INTO work_tasks (cycle_id, source, keyword, page)
+                    SELECT ?, ?, ?, ?
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM work_tasks
+                        WHERE source = ? AND keyword = ? AND page = ? AND state IN ('pending', 'leased')
+                    )
+                ''', (cycle_id, source, keyword or '', page, source, keyword or '', page))
+                added += cursor.rowcount
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+        return added
+
+    def lease(self, worker_id: str, sources: List[str] = None) -> Optional[Task]:
+        """Atomically take the oldest available task (optionally only for some sources)"""
+        now = datetime.now()
+        expires = now + timedelta(seconds=self.lease_seconds)
+        source_filter = ''
+        params: list = [now.isoformat(), self.max_attempts]
+        if sources:
+            source_filter = f"AND source IN ({','.join('?' * len(sources))})"
+            params.extend(sources)
+
+        conn = self.connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            # Leases that ran out on their last attempt are given up
+            conn.execute('''
+                UPDATE work_tasks SET state = 'failed', error = 'lease expired'
+                WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?
+            ''', (now.isoformat(), self.max_attempts))
+            row = conn.execute(f'''
+                SELECT id, cycle_id, source, keyword, page, attempts FROM work_tasks
+                WHERE (state = 'pending' OR (state = 'leased' AND lease_expires < ?))
+                  AND attempts < ? {source_filter}
+                ORDER BY id LIMIT 1
+            ''', params).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            task_id, cycle_id, source, keyword, page, attempts = row
+            conn.execute('''
+                UPDATE work_tasks SET state = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1
+                WHERE id = ?
+            ''', (worker_id, expires.isoformat(), task_id))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+        return Task(task_id, cycle_id, source, keyword or None, page, attempts + 1)
+
+    def complete(self, task: Task, worker_id: str, new_jobs: int = 0) -> bool:
+        """Mark a task done. Returns False if the lease had already passed to another worker"""
+        return self._finish(task, worker_id, 'done', new_jobs=new_jobs)
+
+    def fail(self, task: Task, worker_id: str, error: str = '') -> bool:
+        """Give a task back; it is retried until it has been attempted max_attempts times"""
+        state = 'failed' if task.attempts >= self.max_attempts else 'pending'
+        return self._finish(task, worker_id, state, error=error)
+
+    def _finish(self, task: Task, worker_id: str, state: str, new_jobs: int = None, error: str = None) -> bool:
+        conn = self.connect()
+        try:
+            cursor = conn.execute('''
+                UPDATE work_tasks SET state = ?, new_jobs = ?, error = ?, lease_owner = NULL, lease_expires = NULL
+                WHERE id = ? AND state = 'leased' AND lease_owner = ?
+            ''', (state, new_jobs, error, task.id, worker_id))
+            finished = cursor.rowcount == 1
+        finally:
+            conn.close()
+        if not finished:
+            logger.warning("Lease on task %d (%s '%s') was lost before it finished", task.id, task.source, task.keyword)
+        return finished
+
+    def cycle_status(self, cycle_id: str) -> Dict[str, int]:
+        """Number of a cycle's tasks in each state (pending, leased, done, failed)"""
+        conn = self.connect()
+        try:
+            rows = conn.execute(
+                'SELECT state, COUNT(*) FROM work_tasks WHERE cycle_id = ? GROUP BY state', (cycle_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return dict(rows)
+
+    def prune(self, older_than_days: int = 7):
+        """Delete finished tasks older than older_than_days"""
+        # created_at is CURRENT_TIMESTAMP (UTC), so the cutoff is computed by SQLite too
+        conn = self.connect()
+        try:
+            conn.execute(
+                "DELETE FROM work_tasks WHERE state IN ('done', 'failed') AND created_at < datetime('now', ?)",
+                (f'-{older_than_days} days',)
+            )
+        finally:
+            conn.close()